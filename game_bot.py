@@ -5,23 +5,21 @@ import os
 import json
 import sys
 import traceback
-import builtins # To patch input and print
-from collections import deque, Counter 
-import re
+from collections import Counter
 
 # Assuming tower_of_chance.py is in the same directory
 from tower_of_chance import TowerOfChance, Fore, Style # Import necessary components
 
 LOG_FILE = "bot_log.txt"
-MAX_RECENT_PRINTS = 20 # How many recent print lines to keep for context
 
 class GameTesterBot:
-    def __init__(self, game_instance, log_file_path=LOG_FILE):
+    def __init__(self, game_instance, log_file_path=LOG_FILE, echo=True):
         self.game = game_instance
         self.log_file = open(log_file_path, "w", encoding="utf-8")
-        self.original_input = builtins.input
-        self.original_print = builtins.print
-        self.recent_prints = deque(maxlen=MAX_RECENT_PRINTS)
+        # Print the game's screens and the bot's log; turn off when running many bots at once
+        self.echo = echo
+        # Each bot has its own random stream, so bots in parallel don't share one
+        self.rng = random.Random()
         self.unhandled_prompts = []
         self.exceptions_found = 0
         self.current_turn = 0 
@@ -38,325 +36,198 @@ class GameTesterBot:
         ]
 
         # For Challenge Editor state
-        self.bot_context = "in_game_loop" # "in_game_loop", "challenge_editor"
-        self.editor_state = "idle" 
-        # "idle", "selecting_type", "selecting_challenge_from_list", 
-        # "editing_fields_name", "editing_fields_desc", "editing_fields_diff", 
-        # "exiting_current_type_editor"
         self.current_editing_type_key = None # e.g., "luck", "skill"
         self.has_completed_one_edit_cycle_in_editor = False
+        self.game_started = False
+
+        # The game describes every prompt with a stable id (see ports.py),
+        # so answering one is a single lookup
+        self.handlers = {
+            "continue": self.answer_blank,
+            "reflexes": self.answer_blank,
+            "cosmic_harmony": self.answer_blank,
+            "title_menu": self.answer_title_menu,
+            "main_menu": self.answer_main_menu,
+            "character_name": self.answer_character_name,
+            "character_class": self.answer_any,
+            "skill_point": self.answer_skill_point,
+            "color_theme": self.answer_any,
+            "load_name": self.answer_load_name,
+            "coin_flip": self.answer_any,
+            "memory_sequence": self.answer_shown_sequence,
+            "riddle": self.answer_riddle,
+            "treasure_hunt": self.answer_treasure_hunt,
+            "treasure_chest": self.answer_any,
+            "dragons_gambit": self.answer_any,
+            "titans_challenge": self.answer_any,
+            "companion": self.answer_any,
+            "branching_path": self.answer_any,
+            "hidden_floor": self.answer_any,
+            "word_scramble": self.answer_word_scramble,
+            "number_guess": self.answer_any,
+            "rock_paper_scissors": self.answer_any,
+            "simon_says": self.answer_shown_sequence,
+            "settings_menu": self.answer_any,
+            "animation_speed": self.answer_animation_speed,
+            "difficulty": self.answer_any,
+            "mini_game_chance": self.answer_mini_game_chance,
+            "boss_frequency": self.answer_frequency,
+            "hidden_floor_frequency": self.answer_frequency,
+            "challenge_editor": self.answer_challenge_editor,
+            "challenge_type_editor": self.answer_challenge_type_editor,
+            "challenge_name": self.answer_challenge_name,
+            "challenge_description": self.answer_challenge_description,
+            "challenge_difficulty": self.answer_challenge_difficulty
+        }
 
 
     def log(self, message):
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         full_message = f"[{timestamp}] BOT: {message}"
-        self.original_print(full_message) 
+        if self.echo:
+            print(full_message)
         self.log_file.write(full_message + "\n")
         self.log_file.flush()
 
-    def _patched_print(self, *args, **kwargs):
-        sep = kwargs.get('sep', ' ')
-        message = sep.join(map(str, args))
-        
-        plain_message = re.sub(r'\x1b\[[0-9;]*[mK]', '', message)
-        if plain_message.strip(): 
-            self.recent_prints.append(plain_message.strip())
-            
-        self.original_print(*args, **kwargs)
+    # The bot is the game's output and input port (see ports.py)
 
-    def _patched_input(self, prompt=""):
-        # Strip color codes from the prompt itself for reliable matching
-        plain_prompt_for_matching = re.sub(r'\x1b\[[0-9;]*[mK]', '', prompt)
-        prompt_strip = plain_prompt_for_matching.strip()
-        
-        self.log(f"GAME_INPUT_PROMPT (raw): {prompt.strip()}")
-        # Log what bot uses for logic, after stripping color codes
-        self.log(f"GAME_INPUT_PROMPT (parsed for bot): {prompt_strip}") 
-        
-        # Add the clean prompt to recent_prints for context parsing
-        # This ensures recent_prints contains what the bot "sees" for prompts too.
-        if prompt_strip: # Avoid adding empty prompts
-            self.recent_prints.append(f"PROMPT: {prompt_strip}")
-
-        response = None
-        prompt_lower = prompt_strip.lower()
-
-        # --- Main Game Loop Action ---
-        if "enter your choice (1-10):" == prompt_lower: # Exact match for main game loop prompt
-            self.current_turn += 1
-            self.bot_context = "in_game_loop" 
-            if self.editor_state != "idle": # Reset editor state if we are back to main loop
-                self.log("BOT: Detected main game loop, resetting editor state.")
-                self.editor_state = "idle"
-                self.current_editing_type_key = None
-                self.has_completed_one_edit_cycle_in_editor = False
-
-            if self.turns_to_run_session > 0 and self.current_turn > self.turns_to_run_session:
-                response = self.game_loop_quit_choice
-                self.log(f"BOT: MainLoop - Reached max turns ({self.turns_to_run_session}). Quitting with '{response}'.")
-            else:
-                rand_val = random.random()
-                if rand_val < 0.70: # 70% chance to climb
-                    response = "1"
-                elif rand_val < 0.75: # 5% chance for inventory/stats
-                    response = "2"
-                elif rand_val < 0.80: # 5% chance for challenge editor
-                    response = "8"
-                    self.bot_context = "challenge_editor" 
-                    self.editor_state = "idle" 
-                    self.has_completed_one_edit_cycle_in_editor = False 
-                elif rand_val < 0.85: # 5% chance to save
-                    response = "9"
-                else: # Remaining 15% for other safe options
-                    response = random.choice(["3", "4", "5", "6", "7"])
-                self.log(f"BOT: MainLoop - Turn {self.current_turn}. Chosen action: '{response}'.")
-        
-        # --- Challenge Editor Specific Logic ---
-        # This block should come BEFORE generic menu navigation
-        if response is None and self.bot_context == "challenge_editor":
-            self.log(f"BOT: Editor - Current state: {self.editor_state}, Prompt: '{prompt_lower}'")
-
-            if self.editor_state == "idle" and "select challenge type to edit" in prompt_lower:
-                if not self.has_completed_one_edit_cycle_in_editor:
-                    response = "1" # Select first type
-                    try:
-                        self.current_editing_type_key = list(self.game.challenges.keys())[0]
-                    except IndexError: # Should not happen if challenges exist
-                        self.log("BOT: Editor - ERROR! No challenge types found in game.challenges.")
-                        self.bot_context = "in_game_loop" # Bail out
-                        response = "10" # Try to quit game if editor is broken
-                    self.editor_state = "selecting_challenge_from_list"
-                    self.log(f"BOT: Editor - State: idle -> selecting_challenge_from_list. Chose type 1 ({self.current_editing_type_key}).")
-                else: # We've done an edit cycle, now exit editor
-                    num_types = len(self.game.challenges.keys())
-                    response = str(num_types + 1) # Option to "Return to Main Menu"
-                    self.log(f"BOT: Editor - Attempting to exit editor via option {response}.")
-                    self.bot_context = "in_game_loop" # Fully exited editor flow
-                    self.editor_state = "idle" 
-                    self.has_completed_one_edit_cycle_in_editor = False 
-
-            elif self.editor_state == "selecting_challenge_from_list" and "enter your choice:" == prompt_lower and \
-                 self.current_editing_type_key and \
-                 any(f"editing {self.current_editing_type_key.lower()} challenges" in p.lower() for p in list(self.recent_prints)[-5:]):
-                response = "1" # Select first challenge in the list
-                self.editor_state = "editing_fields_name"
-                self.log(f"BOT: Editor - State: selecting_challenge_from_list -> editing_fields_name. Chose challenge 1 from type {self.current_editing_type_key}.")
-
-            elif self.editor_state == "editing_fields_name" and "enter new name" in prompt_lower:
-                response = f"BotName{random.randint(1,9)}"
-                self.editor_state = "editing_fields_desc"
-                self.log("BOT: Editor - State: editing_fields_name -> editing_fields_desc.")
-            elif self.editor_state == "editing_fields_desc" and "enter new description" in prompt_lower:
-                response = "Bot edited description."
-                self.editor_state = "editing_fields_diff"
-                self.log("BOT: Editor - State: editing_fields_desc -> editing_fields_diff.")
-            elif self.editor_state == "editing_fields_diff" and "enter new difficulty" in prompt_lower:
-                response = str(random.randint(1, 15))
-                self.editor_state = "exiting_current_type_editor" # Next prompt will be "Press Enter", then challenge list
-                self.has_completed_one_edit_cycle_in_editor = True 
-                self.log("BOT: Editor - State: editing_fields_diff -> exiting_current_type_editor.")
-
-            elif self.editor_state == "exiting_current_type_editor" and "enter your choice:" == prompt_lower and \
-                 self.current_editing_type_key and \
-                 any(f"editing {self.current_editing_type_key.lower()} challenges" in p.lower() for p in list(self.recent_prints)[-5:]):
-                # We are back at the list of challenges for the current type. Choose "Save and Return".
-                num_listed_challenges = 0
-                relevant_prints_for_menu_count = []
-                for p_text_idx in range(len(self.recent_prints) - 2, -1, -1):
-                    p_text = self.recent_prints[p_text_idx].lower()
-                    if f"editing {self.current_editing_type_key.lower()} challenges" in p_text: break
-                    if "press enter to continue" in p_text: continue # Skip this common line
-                    relevant_prints_for_menu_count.insert(0, p_text)
-                
-                for p_text in relevant_prints_for_menu_count:
-                    if re.match(r"^\s*\d+\.\s*.+\(difficulty: \d+\)", p_text):
-                        num_listed_challenges += 1
-                    elif "add new challenge" in p_text: break 
-                
-                if num_listed_challenges > 0:
-                    response = str(num_listed_challenges + 2) 
-                    self.log(f"BOT: Editor - Counted {num_listed_challenges} challenges. Trying 'Save and Return' for type with option {response}.")
-                else: 
-                    response = "3" # Fallback: assumes 1 challenge listed + Add New + Save and Return
-                    self.log(f"BOT: Editor - Failed to count challenges for type, guessing 'Save and Return' as option {response}.")
-                
-                self.editor_state = "idle" 
-                self.current_editing_type_key = None 
-                # The `has_completed_one_edit_cycle_in_editor` is true, so next "select type" prompt will exit.
-
-        # --- Character Creation ---
-        if response is None:
-            if "enter your adventurer's name:" in prompt_lower:
-                response = f"Bot{random.randint(100,999)}"
-                self._char_skill_choice_counter = 0 
-            elif "select your class (1-5):" in prompt_lower:
-                if not response: 
-                    response = str(random.randint(1, 5))
-            elif "which skill to improve? (1-4):" in prompt_lower:
-                response = str((self._char_skill_choice_counter % 4) + 1)
-                self._char_skill_choice_counter += 1
-
-        # --- Riddle Solver ---
-        if response is None and "your answer:" == prompt_lower and \
-           any("riddle:" in p.lower() for p in list(self.recent_prints)[-4:]): # Check last few prints for "riddle:" context
-            riddle_question_text = None
-            for i in range(len(self.recent_prints) - 2, -1, -1): 
-                text_line = self.recent_prints[i]
-                if "riddle:" in text_line.lower():
-                    riddle_question_text = text_line.split("Riddle:", 1)[-1].split("riddle:", 1)[-1].strip()
-                    break
-            
-            if riddle_question_text:
-                for r_obj in self._known_riddles:
-                    if r_obj["q"].lower() == riddle_question_text.lower():
-                        response = r_obj["a"]
-                        self.log(f"BOT: Riddle - Found answer '{response}' for riddle '{riddle_question_text}'.")
-                        break
-                if not response:
-                    self.log(f"BOT: Riddle - No known answer for riddle: '{riddle_question_text}'. Using fallback.")
-                    response = "a guess" 
-            else:
-                self.log("BOT: Riddle - Could not extract riddle question from recent prints. Using fallback.")
-                response = "a guess"
-
-        # --- Other Challenge Specific Inputs (Memory, Scramble, etc.) ---
-        if response is None:
-            if "heads or tails? (h/t)" in prompt_lower:
-                response = random.choice(["h", "t"])
-            elif "press enter to" in prompt_lower or \
-                 "meditate on the correct order" in prompt_lower:
-                response = "" 
-            elif "enter the sequence (symbols separated by spaces):" in prompt_lower: 
-                parsed_sequence = None
-                try:
-                    memo_prompt_idx = -1
-                    for i in range(len(self.recent_prints) -1, -1, -1):
-                        if "memorize this sequence:" in self.recent_prints[i].lower():
-                            memo_prompt_idx = i
-                            break
-                    if memo_prompt_idx != -1 and memo_prompt_idx + 1 < len(self.recent_prints):
-                        potential_sequence = self.recent_prints[memo_prompt_idx + 1]
-                        if re.match(r'^([★♦♥♠♣▲■●]\s?)+$', potential_sequence.strip()):
-                            parsed_sequence = potential_sequence.strip()
-                            self.log(f"Bot attempting to use memorized sequence: '{parsed_sequence}'")
-                except Exception as e:
-                    self.log(f"Error parsing memory sequence: {e}")
-                if parsed_sequence: response = parsed_sequence
-                else: response = "★ ♦ ♥ ♠"; self.log("Memory sequence parsing failed, using fallback.")
-
-            elif "where is the treasure hidden?" in prompt_lower:
-                response = random.choice(["chest", "box", "a chest"])
-            elif "choose chest 1, 2, or 3:" in prompt_lower:
-                response = str(random.randint(1, 3))
-            elif "will you use your wits (w) or speed (s)?" in prompt_lower:
-                response = random.choice(["w", "s"])
-            elif "which do you choose? (s/w/c):" in prompt_lower: 
-                response = random.choice(["s", "w", "c"])
-
-        # --- Yes/No Prompts ---
-        if response is None and "(y/n)" in prompt_lower:
-            response = random.choice(["y", "n"])
-
-        # --- Mini-Games ---
-        if response is None:
-            if any("unscramble the following word:" in p.lower() for p in list(self.recent_prints)[-3:]) and "your answer:" in prompt_lower:
-                word_to_unscramble = None
-                try:
-                    unscramble_prompt_idx = -1
-                    for i in range(len(self.recent_prints) -1, -1, -1):
-                        if "unscramble the following word:" in self.recent_prints[i].lower():
-                            unscramble_prompt_idx = i
-                            break
-                    if unscramble_prompt_idx != -1 and unscramble_prompt_idx + 1 < len(self.recent_prints):
-                        potential_word = self.recent_prints[unscramble_prompt_idx + 1].strip()
-                        if re.match(r'^[a-zA-Z]+$', potential_word): 
-                            word_to_unscramble = potential_word
-                except Exception as e:
-                    self.log(f"Error parsing scrambled word: {e}")
-
-                if word_to_unscramble:
-                    self.log(f"Bot found scrambled word: {word_to_unscramble}")
-                    known_words = ["tower", "chance", "adventure", "challenge", "destiny", "fortune", "journey", "quest", "skill", "luck", "player", "level", "floor"]
-                    scrambled_counts = Counter(word_to_unscramble.lower())
-                    for kw in known_words:
-                        if Counter(kw) == scrambled_counts:
-                            response = kw
-                            self.log(f"Bot attempting to answer with anagram: {response}")
-                            break
-                if not response: response = "tower" 
-
-            elif "guess " in prompt_lower and ":" in prompt_lower and \
-                 any("i'm thinking of a number" in p.lower() for p in list(self.recent_prints)[-5:]): 
-                range_match = re.search(r'between 1 and (\d+)', "".join(self.recent_prints).lower())
-                max_num_guess = 10 
-                if range_match:
-                    try: max_num_guess = int(range_match.group(1))
-                    except ValueError: self.log(f"Could not parse max number for guessing game, using default {max_num_guess}")
-                response = str(random.randint(1, max_num_guess))
-            elif "choose rock, paper, or scissors (r/p/s):" in prompt_lower:
-                response = random.choice(["r", "p", "s"])
-            elif "enter the sequence (space-separated colors):" in prompt_lower and \
-                 any("simon says" in p.lower() for p in list(self.recent_prints)[-10:]): 
-                response = "red green blue yellow" 
-
-        # --- Settings Editor (Game Settings, not Challenge Editor) ---
-        if response is None:
-            if "enter animation speed" in prompt_lower:
-                response = f"{random.uniform(0.01, 0.05):.2f}"
-            elif "enter mini-game chance" in prompt_lower:
-                response = f"{random.uniform(0.1, 0.3):.1f}"
-            elif "enter boss frequency" in prompt_lower or "enter hidden floor frequency" in prompt_lower:
-                response = str(random.randint(5,15))
-        
-        # --- Generic Menu Navigation (if not handled by more specific logic like editor or main loop) ---
-        if response is None:
-            if "enter your choice" in prompt_lower or \
-               "select a theme" in prompt_lower or \
-               "which path will you take" in prompt_lower or \
-               "select difficulty" in prompt_lower: # Removed "select challenge type to edit" as it's handled above
-                match = re.search(r'\((\d+)-(\d+)\)', prompt_lower)
-                if not match and "1-" in prompt_lower: 
-                    match_simple = re.search(r'1-(\d+)', prompt_lower)
-                    if match_simple:
-                        class MockMatch:
-                            def __init__(self, g1, g2): self.g1, self.g2 = g1, g2
-                            def group(self, i): return self.g1 if i == 1 else self.g2
-                        match = MockMatch("1", match_simple.group(1))
-                if match:
-                    try:
-                        min_val, max_val = int(match.group(1)), int(match.group(2))
-                        if min_val <= max_val: response = str(random.randint(min_val, max_val))
-                    except (ValueError, AttributeError): pass 
-                elif "1-3" in prompt_lower: response = str(random.randint(1,3))
-                elif "1-4" in prompt_lower: response = str(random.randint(1,4))
-                elif "1-5" in prompt_lower: response = str(random.randint(1,5))
-                # "1-10" is usually main game loop, handled earlier.
-
-        # --- Fallback for unhandled prompts ---
-        if response is None:
-            self.log(f"WARNING: Unhandled prompt: '{prompt_strip}'")
-            self.unhandled_prompts.append(prompt_strip)
-            if "choice" in prompt_lower or "select" in prompt_lower:
-                response = "1" # Default to "1" if it seems like a menu
-            elif "continue" in prompt_lower:
-                 response = "" 
-            else:
-                response = "" 
-            self.log(f"BOT: Fallback response '{response}' for unhandled prompt.")
+    def isatty(self):
+        return False
+
+    def write(self, message):
+        if self.echo:
+            sys.stdout.write(message)
 
-        self.log(f"BOT_RESPONSE: '{response}' for prompt '{prompt_strip}'")
+    def read(self, prompt="", descriptor=None):
+        prompt_id = descriptor["id"]
+        self.log(f"GAME_INPUT_PROMPT ({prompt_id}): {descriptor['prompt']}")
+
+        handler = self.handlers.get(prompt_id)
+        if handler is not None:
+            response = handler(descriptor)
+        else:
+            # A prompt the bot doesn't know yet; any accepted answer keeps the game going
+            self.log(f"WARNING: Unhandled prompt id '{prompt_id}': '{descriptor['prompt']}'")
+            self.unhandled_prompts.append(f"{prompt_id}: {descriptor['prompt']}")
+            response = descriptor["choices"][0] if descriptor["choices"] else ""
+
+        self.log(f"BOT_RESPONSE: '{response}' for prompt '{prompt_id}'")
+        return response
+
+    # --- Prompt handlers, by prompt id ---
+
+    def answer_blank(self, descriptor):
+        return ""
+
+    def answer_any(self, descriptor):
+        return self.rng.choice(descriptor["choices"])
+
+    def answer_title_menu(self, descriptor):
+        # Start one game; when the title screen comes back the game is over
+        if self.game_started:
+            return "3"
+        self.game_started = True
+        return "1"
+
+    def answer_main_menu(self, descriptor):
+        self.current_turn += 1
+        if self.turns_to_run_session > 0 and self.current_turn > self.turns_to_run_session:
+            response = self.game_loop_quit_choice
+            self.log(f"BOT: MainLoop - Reached max turns ({self.turns_to_run_session}). Quitting with '{response}'.")
+            return response
+
+        rand_val = self.rng.random()
+        if rand_val < 0.70: # 70% chance to climb
+            response = "1"
+        elif rand_val < 0.75: # 5% chance for inventory/stats
+            response = "2"
+        elif rand_val < 0.80: # 5% chance for challenge editor
+            response = "8"
+        elif rand_val < 0.85: # 5% chance to save
+            response = "9"
+        else: # Remaining 15% for other safe options
+            response = self.rng.choice(["3", "4", "5", "6", "7"])
+        self.log(f"BOT: MainLoop - Turn {self.current_turn}. Chosen action: '{response}'.")
         return response
 
-    def _setup_patches(self):
-        builtins.input = self._patched_input
-        builtins.print = self._patched_print
+    def answer_character_name(self, descriptor):
+        self._char_skill_choice_counter = 0
+        return f"Bot{self.rng.randint(100,999)}"
+
+    def answer_load_name(self, descriptor):
+        return self.game.player.get("name") or "Bot"
+
+    def answer_skill_point(self, descriptor):
+        response = descriptor["choices"][self._char_skill_choice_counter % len(descriptor["choices"])]
+        self._char_skill_choice_counter += 1
+        return response
+
+    def answer_riddle(self, descriptor):
+        question = descriptor["context"]["question"]
+        for r_obj in self._known_riddles:
+            if r_obj["q"].lower() == question.lower():
+                self.log(f"BOT: Riddle - Found answer '{r_obj['a']}' for riddle '{question}'.")
+                return r_obj["a"]
+        self.log(f"BOT: Riddle - No known answer for riddle: '{question}'. Using fallback.")
+        return "a guess"
+
+    def answer_shown_sequence(self, descriptor):
+        # Memory Test and Simon Says: repeat what was shown
+        return " ".join(descriptor["context"]["shown"])
+
+    def answer_treasure_hunt(self, descriptor):
+        return self.rng.choice(["chest", "box", "a chest"])
+
+    def answer_word_scramble(self, descriptor):
+        scrambled_counts = Counter(descriptor["context"]["scrambled"].lower())
+        known_words = ["tower", "chance", "adventure", "challenge", "destiny", "fortune", "journey", "quest", "skill", "luck", "player", "level", "floor"]
+        for kw in known_words:
+            if Counter(kw) == scrambled_counts:
+                self.log(f"Bot attempting to answer with anagram: {kw}")
+                return kw
+        return "tower"
+
+    def answer_animation_speed(self, descriptor):
+        return f"{self.rng.uniform(0.01, 0.05):.2f}"
+
+    def answer_mini_game_chance(self, descriptor):
+        return f"{self.rng.uniform(0.1, 0.3):.1f}"
+
+    def answer_frequency(self, descriptor):
+        return str(self.rng.randint(5,15))
+
+    # Challenge editor: edit the first challenge of one type, then save and leave
+
+    def answer_challenge_editor(self, descriptor):
+        self.has_completed_one_edit_cycle_in_editor = False
+        self.current_editing_type_key = descriptor["context"]["challenge_types"][0]
+        self.log(f"BOT: Editor - Chose type 1 ({self.current_editing_type_key}).")
+        return "1"
+
+    def answer_challenge_type_editor(self, descriptor):
+        if self.has_completed_one_edit_cycle_in_editor or descriptor["context"]["add"] == "1":
+            self.log(f"BOT: Editor - 'Save and Return' with option {descriptor['context']['back']}.")
+            return descriptor["context"]["back"]
+        return "1"
+
+    def answer_challenge_name(self, descriptor):
+        return f"BotName{self.rng.randint(1,9)}"
+
+    def answer_challenge_description(self, descriptor):
+        return "Bot edited description."
+
+    def answer_challenge_difficulty(self, descriptor):
+        self.has_completed_one_edit_cycle_in_editor = True
+        return str(self.rng.randint(1, 15))
+
+    def _attach(self):
+        self.game.set_ports(input_port=self, output_port=self)
 
-    def _restore_patches(self):
-        builtins.input = self.original_input
-        builtins.print = self.original_print
+    def _detach(self):
+        self.game.set_ports()
 
     def run_test_session(self, num_turns=0): # Default num_turns to 0 for "all levels"
-        self._setup_patches()
+        self._attach()
         if num_turns == 0:
             self.log("Starting test session to go through all levels (or until game ends).")
             self.turns_to_run_session = float('inf') # Effectively infinite for this purpose
@@ -369,10 +240,9 @@ class GameTesterBot:
         self.exceptions_found = 0
         self._char_skill_choice_counter = 0 
         
-        self.bot_context = "in_game_loop"
-        self.editor_state = "idle"
         self.current_editing_type_key = None
         self.has_completed_one_edit_cycle_in_editor = False
+        self.game_started = False
 
 
         try:
@@ -402,7 +272,7 @@ class GameTesterBot:
             self.exceptions_found += 1
             if hasattr(self.game, 'player') and self.game.player:
                 try:
-                    player_state_dump = json.dumps(self.game.player, indent=2)
+                    player_state_dump = json.dumps(self.game.player, indent=2, default=list) # Floor sets dump as lists
                     self.log(f"Player state at time of error:\n{player_state_dump}")
                 except Exception as dump_e:
                     self.log(f"Could not dump player state: {dump_e}")
@@ -410,7 +280,7 @@ class GameTesterBot:
                 self.log("Player object not available or not initialized at time of error.")
 
         finally:
-            self._restore_patches()
+            self._detach()
             self.log("Test session finished.")
             self.log(f"Total unhandled prompts: {len(self.unhandled_prompts)}")
             if self.unhandled_prompts:
@@ -424,6 +294,8 @@ class GameTesterBot:
 if __name__ == "__main__":
     print("Initializing game for bot testing...")
     game_instance = TowerOfChance() 
+    # The bot reads faster than any player, so skip the dramatic pauses
+    game_instance.clock.mode = "instant"
     
     log_file_abs_path = os.path.abspath(LOG_FILE)
     print(f"Initializing bot. Log will be at: {log_file_abs_path}")
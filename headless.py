@@ -0,0 +1,248 @@
+"""
+Headless engine for Tower of Chance - runs floors without input(), print() or sleep()
+"""
+import random
+import time
+
+from tower_of_chance import TowerOfChance, prompt_descriptor
+
+
+def _skip(*args, **kwargs):
+    pass
+
+
+class DecisionProvider:
+    """Answers the prompts a player would normally type into the game.
+
+    `decide` receives the prompt's descriptor (see `prompt_descriptor`) and
+    the lines the game printed since the previous prompt, and returns the
+    string the player would enter. Providers that never look at `output`
+    set `reads_output` to False, and the engine stops collecting it.
+    """
+
+    reads_output = True
+
+    def decide(self, descriptor, output):
+        raise NotImplementedError
+
+
+class RandomDecisionProvider(DecisionProvider):
+    """Plays like a casual player: picks any valid option at random"""
+
+    reads_output = False
+
+    def __init__(self, rng=None, character_class=None):
+        self.rng = rng or random.Random()
+        # Index into CHARACTER_CLASSES, or None to pick a class at random
+        self.character_class = character_class
+        # Prompts that need more than a random choice, by prompt id
+        self.handlers = {
+            "character_name": lambda descriptor: "Headless",
+            "character_class": self.choose_class,
+            "treasure_hunt": lambda descriptor: "chest",
+            "companion": lambda descriptor: "y",
+            "hidden_floor": lambda descriptor: "y"
+        }
+
+    def choose_class(self, descriptor):
+        if self.character_class is not None:
+            return str(self.character_class + 1)
+        return self.rng.choice(descriptor["choices"])
+
+    def decide(self, descriptor, output):
+        handler = self.handlers.get(descriptor["id"])
+        if handler is not None:
+            return handler(descriptor)
+        if descriptor["choices"]:
+            return self.rng.choice(descriptor["choices"])
+        # Everything else is "Press Enter", reflexes or a free-text answer
+        return ""
+
+
+class HeadlessTowerOfChance(TowerOfChance):
+    """TowerOfChance that never touches the terminal.
+
+    Output is collected instead of printed, pauses and screen clears are
+    skipped, and every prompt is answered by a DecisionProvider. Each call
+    to `climb` runs one floor and returns a structured floor result.
+
+    Every floor still runs the game's own code: measured at about 21,000
+    floors, or about 130 climbs of a 100-floor tower, a second on one
+    core. That is far short of tens of thousands of climbs a second; for
+    those use vector_sim (about 7,000 climbs a second per core), spread
+    over cores with parallel_runner's vector engine.
+    """
+
+    def __init__(self, decision_provider=None, seed=None):
+        super().__init__(seed)
+
+        # The default player answers from its own stream of the session seed
+        self.decision_provider = decision_provider or RandomDecisionProvider(random.Random(f"{self.seed}:decisions"))
+        self.output = []
+        self.keep_output = self.decision_provider.reads_output
+        self.floor_result = None
+        self.completed = False
+
+        if not self.keep_output:
+            # Nobody reads the screens, so don't draw them
+            for name in ("print_colored", "print_plain", "animate_text", "print_ascii_art",
+                         "display_environment", "show_active_effects", "show_companions"):
+                setattr(self, name, _skip)
+
+    # --- Terminal replacements ---
+
+    def print_colored(self, text, color=None, background=None):
+        if self.keep_output:
+            self.output.append(text)
+
+    def print_plain(self, text=""):
+        if self.keep_output:
+            self.output.append(text)
+
+    def animate_text(self, text, color=None, delay=None):
+        if self.keep_output:
+            self.output.append(text)
+
+    # A simulation keeps the config it started with rather than checking
+    # the file for changes on every lookup
+    _config = None
+
+    def load_config(self):
+        if self._config is None:
+            self._config = super().load_config()
+        return self._config
+
+    def pause(self, seconds):
+        pass
+
+    def clear_screen(self):
+        pass
+
+    def play_sound(self, sound_type):
+        pass
+
+    def get_input(self, prompt="", prompt_id="continue", choices=None, **context):
+        # No screen to flush or keep track of
+        self.prompt_shown_at = time.time()
+        return (yield prompt, prompt_descriptor(prompt, prompt_id, choices, context))
+
+    # --- Floor result recording ---
+
+    def _record(self, challenge_type, challenge, modifier, success):
+        result = self.floor_result
+        if result is None:
+            return
+        if result["kind"] == "boss":
+            result["stages"].append({
+                "challenge_type": challenge_type,
+                "challenge": challenge["name"],
+                "success": success
+            })
+        else:
+            result["challenge_type"] = challenge_type
+            result["challenge"] = challenge["name"]
+            result["modifier"] = modifier
+
+    def run_luck_challenge(self, challenge, modifier=0):
+        success = yield from super().run_luck_challenge(challenge, modifier)
+        self._record("luck", challenge, modifier, success)
+        return success
+
+    def run_skill_challenge(self, challenge, modifier=0):
+        success = yield from super().run_skill_challenge(challenge, modifier)
+        self._record("skill", challenge, modifier, success)
+        return success
+
+    def run_mixed_challenge(self, challenge, modifier=0):
+        success = yield from super().run_mixed_challenge(challenge, modifier)
+        self._record("mixed", challenge, modifier, success)
+        return success
+
+    def run_legendary_challenge(self, challenge, modifier=0):
+        success = yield from super().run_legendary_challenge(challenge, modifier)
+        self._record("legendary", challenge, modifier, success)
+        return success
+
+    def run_boss_challenge(self):
+        if self.floor_result is not None:
+            self.floor_result["kind"] = "boss"
+        return (yield from super().run_boss_challenge())
+
+    def check_for_hidden_floor(self):
+        found = yield from super().check_for_hidden_floor()
+        if found and self.floor_result is not None:
+            self.floor_result["kind"] = "hidden"
+        return found
+
+    def run_mini_game(self):
+        won = yield from super().run_mini_game()
+        if self.floor_result is not None:
+            self.floor_result["mini_game"] = won
+        return won
+
+    # --- Driving the tower ---
+
+    def play(self, flow):
+        """Run a flow to the end, answering each prompt from the decision provider"""
+        try:
+            prompt = next(flow)
+            decide = self.decision_provider.decide
+            if not self.keep_output:
+                while True:
+                    prompt = flow.send(decide(prompt[1], self.output))
+            while True:
+                answer = decide(prompt[1], self.output)
+                self.output = []
+                prompt = flow.send(answer)
+        except StopIteration as done:
+            return done.value
+
+    def new_character(self):
+        """Start a fresh adventurer, created through the normal character creation prompts"""
+        self.reset_state()
+        self.completed = False
+        self.play(self.create_character())
+
+    def climb(self):
+        """Attempt the next floor and return what happened as a dict"""
+        self.floor_result = {
+            "floor": self.player["level"],
+            "kind": "challenge",
+            "challenge_type": None,
+            "challenge": None,
+            "modifier": 0,
+            "stages": [],
+            "mini_game": None,
+            "success": False
+        }
+        self.floor_result["success"] = self.play(self.climb_floor())
+        if self.player["level"] >= self.tower_height:
+            self.completed = True
+        result = self.floor_result
+        self.floor_result = None
+        return result
+
+    def run_climb(self, max_attempts=1000, keep_floors=True):
+        """Climb with a new character until the tower is completed or attempts run out"""
+        self.new_character()
+
+        floors = []
+        attempts = 0
+        while not self.completed and self.player["level"] < self.tower_height and attempts < max_attempts:
+            attempts += 1
+            if keep_floors:
+                floors.append(self.climb())
+            else:
+                # No floor results to build when nobody keeps them
+                self.play(self.climb_floor())
+
+        return {
+            "class": self.player["class"],
+            "completed": self.completed or self.player["level"] >= self.tower_height,
+            "attempts": attempts,
+            "level": self.player["level"],
+            "max_level": self.player["max_level"],
+            "skills": dict(self.player["skills"]),
+            "stats": dict(self.stats),
+            "floors": floors
+        }
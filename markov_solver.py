@@ -0,0 +1,194 @@
+"""
+Markov-chain solver for Tower of Chance climbs
+
+Each floor attempt either clears the floor or leaves the climber where they
+are, so a climb is a chain over floors with a single "advance" probability
+per floor. The probability is computed exactly from the same tables the
+vectorized simulator uses: weather and time of day per floor, challenge
+type and challenge picks, branching paths, boss floors and hidden floors.
+
+Skills are held fixed (or given per floor) and buffs, debuffs and
+mini-game rewards are left out, which is what keeps the model a chain.
+Expected attempts, variance and the whole completion distribution then
+come from a forward pass over the floors in milliseconds.
+"""
+import itertools
+import math
+
+from tower_of_chance import CHARACTER_CLASSES, COMPANIONS, LEGENDARY_FLOOR
+from vector_sim import np, ClimbSimulator, FAMILY_WIDTH, SKILLS, success_probability
+
+
+class MarkovSolver:
+    """Exact floor-to-floor model of a climb"""
+
+    def __init__(self, game=None, policy=None, seed=None):
+        # ClimbSimulator raises a helpful ImportError if NumPy is missing.
+        # `seed` picks the session, and with it the weather on every floor.
+        self.model = ClimbSimulator(game=game, policy=policy, seed=seed)
+        self.policy = self.model.policy
+        self.tower_height = self.model.tower_height
+
+    # --- Per-floor success chances ---
+
+    def _type_chances(self, levels, skills, modifier, challenge_type):
+        """Chance of passing a challenge of one type on each floor, over the challenges it may pick"""
+        model = self.model
+        n = len(levels)
+        kind_probs = np.diff(model.kind_cdf[challenge_type, levels], axis=1, prepend=0.0)
+        kinds = np.broadcast_to(model.type_kinds[challenge_type], (n, FAMILY_WIDTH))
+        chances = success_probability(kinds.ravel(), np.repeat(skills, FAMILY_WIDTH, axis=0),
+                                      np.repeat(modifier, FAMILY_WIDTH), self.policy)
+        return (kind_probs * chances.reshape(n, FAMILY_WIDTH)).sum(axis=1)
+
+    def _path_outcomes(self):
+        """(probability, forced type odds, difficulty) for every branching path outcome"""
+        model = self.model
+        weights = np.asarray(self.policy["path_weights"], dtype=float)
+        basic = np.zeros(len(model.types))
+        basic[model.path_types] = 1 / len(model.path_types)
+        legendary = np.zeros(len(model.types))
+        legendary[model.legendary_type] = 1
+        luck = np.zeros(len(model.types))
+        luck[model.luck_type] = 1
+
+        outcomes = []
+        # The special path is only on offer 30% of the time
+        for offered, p_offer in ((False, 0.7), (True, 0.3)):
+            w = weights.copy()
+            if not offered:
+                w[3] = 0
+            if not w.sum():
+                continue
+            w = w / w.sum()
+            for path, difficulty in enumerate((0, 2, -1)):
+                outcomes.append((p_offer * w[path], basic, difficulty))
+            # Portal, Companion's Trail and Ancient Shrine are equally likely
+            for forced, difficulty in ((legendary, 1), (basic, 0), (luck, 0)):
+                outcomes.append((p_offer * w[3] / 3, forced, difficulty))
+        return outcomes
+
+    def floor_success(self, skills, companions=()):
+        """Chance of clearing each floor in one attempt, indexed by floor number.
+
+        `skills` is one skill vector (SKILLS order) or one per floor, shape
+        (tower_height + 1, 4).
+        """
+        model = self.model
+        height = self.tower_height
+        levels = np.arange(1, height)
+        skills = np.broadcast_to(np.asarray(skills, dtype=float), (height + 1, len(SKILLS)))[levels]
+        held = np.array([c["name"] in companions for c in COMPANIONS])
+        companion_bonus = (model.companion_bonus * held).sum(axis=1)
+
+        # Chance per challenge type and path difficulty, for every floor at once
+        by_type = {}
+
+        def type_chances(t, difficulty):
+            if (t, difficulty) not in by_type:
+                modifier = model.environment[levels, t] + companion_bonus[t] + difficulty
+                by_type[t, difficulty] = self._type_chances(levels, skills, modifier, t)
+            return by_type[t, difficulty]
+
+        # Plain floors pick a weighted type, legendary included from LEGENDARY_FLOOR
+        type_probs = model.type_probs[(levels >= LEGENDARY_FLOOR).astype(int)]
+        chance = sum(type_probs[:, t] * type_chances(t, 0) for t in np.flatnonzero(model.type_probs.any(axis=0)))
+
+        # Branching paths force the type and difficulty on checkpoint floors
+        branching = np.zeros(len(levels))
+        for p, forced, difficulty in self._path_outcomes():
+            for t in np.flatnonzero(forced):
+                branching += p * forced[t] * type_chances(t, difficulty)
+        chance = np.where(levels % model.checkpoint_frequency == 0, branching, chance)
+
+        # A hidden floor that is found and explored is cleared outright
+        wisdom = skills[:, SKILLS.index("wisdom")]
+        found = np.clip(0.2 + wisdom * 0.05, 0, 1) * self.policy["explore_hidden"]
+        chance = np.where(levels % model.hidden_floor_frequency == 0, found + (1 - found) * chance, chance)
+
+        # Bosses fight every stage at modifier 0 and all three must be passed
+        boss = np.ones(len(levels))
+        for kinds, cdf in model.boss_stages:
+            stage = success_probability(np.tile(kinds, len(levels)), np.repeat(skills, len(kinds), axis=0),
+                                        0, self.policy).reshape(len(levels), len(kinds))
+            boss *= stage @ np.diff(cdf, prepend=0.0)
+        chance = np.where(levels % model.boss_frequency == 0, boss, chance)
+
+        success = np.zeros(height + 1)
+        success[levels] = chance
+        return success
+
+    # --- Climb length ---
+
+    def completion_distribution(self, success, max_attempts):
+        """P(tower completed within k attempts) for k = 0..max_attempts.
+
+        The transition matrix only has a diagonal (stay) and a
+        sub-diagonal (advance), so each step is two vector operations.
+        """
+        height = self.tower_height
+        stay = 1 - success[1:height]
+        advance = success[1:height]
+
+        # state[i] is the chance of standing on floor i + 1; the last slot is the top
+        state = np.zeros(height)
+        state[0] = 1.0
+        cdf = np.zeros(max_attempts + 1)
+        for k in range(1, max_attempts + 1):
+            moved = state[:-1] * advance
+            state[:-1] *= stay
+            state[1:] += moved
+            cdf[k] = state[-1]
+        return cdf
+
+    def solve(self, skills, companions=(), max_attempts=1000):
+        """Expected attempts, variance and completion distribution for one skill profile"""
+        success = self.floor_success(skills, companions)
+        floors = success[1:self.tower_height]
+        if (floors <= 0).any():
+            expected = variance = math.inf
+        else:
+            # Attempts on each floor are geometric and independent
+            expected = float((1 / floors).sum())
+            variance = float(((1 - floors) / floors ** 2).sum())
+        return {
+            "floor_success": success,
+            "expected_attempts": expected,
+            "variance": variance,
+            "std": math.sqrt(variance),
+            "completion_cdf": self.completion_distribution(success, max_attempts)
+        }
+
+    def solve_class(self, character_class, companions=(), max_attempts=1000):
+        """Solve for a character class, averaging over every way to spend the three free skill points"""
+        if isinstance(character_class, int):
+            character_class = CHARACTER_CLASSES[character_class]
+        base = np.array([character_class["skills"][s] for s in SKILLS], dtype=float)
+
+        profiles = []
+        for points in itertools.combinations_with_replacement(range(len(SKILLS)), 3):
+            counts = np.bincount(points, minlength=len(SKILLS))
+            weight = math.factorial(3) / np.prod([math.factorial(c) for c in counts]) / len(SKILLS) ** 3
+            profiles.append((weight, self.solve(base + counts, companions, max_attempts)))
+
+        # Mixture over starting profiles (law of total variance)
+        expected = float(sum(w * r["expected_attempts"] for w, r in profiles))
+        variance = float(sum(w * (r["variance"] + (r["expected_attempts"] - expected) ** 2) for w, r in profiles))
+        return {
+            "class": character_class["name"],
+            "floor_success": sum(w * r["floor_success"] for w, r in profiles),
+            "expected_attempts": expected,
+            "variance": variance,
+            "std": math.sqrt(variance),
+            "completion_cdf": sum(w * r["completion_cdf"] for w, r in profiles)
+        }
+
+    def solve_all(self, companions=(), max_attempts=1000):
+        """solve_class for every character class, keyed by class name"""
+        return {c["name"]: self.solve_class(c, companions, max_attempts) for c in CHARACTER_CLASSES}
+
+
+def completion_probability(result, attempts):
+    """P(reaching the top within `attempts` floor attempts) from a solve result"""
+    cdf = result["completion_cdf"]
+    return float(cdf[min(attempts, len(cdf) - 1)])
@@ -0,0 +1,90 @@
+"""
+Pacing for Tower of Chance - every dramatic pause and text animation waits on one clock
+
+The clock's mode decides how long those waits really are:
+  realtime     wait as long as the game asks
+  accelerated  wait `speedup` times less
+  skip         wait as asked, but pressing Enter skips the rest of the waits until the next prompt
+  instant      never wait (bots, simulations, tests)
+"""
+import math
+import os
+import select
+import sys
+import time
+
+PACING_MODES = ["realtime", "accelerated", "skip", "instant"]
+
+# Each write of an animated line covers at least this many seconds, so a line
+# goes out in a few writes rather than one per character
+ANIMATION_FRAME = 0.1
+
+
+def wait_for_key(timeout):
+    """Wait up to `timeout` seconds for a key press; True (and the key is used up) if there was one"""
+    if os.name == "nt":
+        import msvcrt
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if msvcrt.kbhit():
+                msvcrt.getwch()
+                return True
+            time.sleep(0.01)
+        return False
+
+    # Piped input is always readable, and it holds answers rather than key presses
+    if not sys.stdin.isatty():
+        time.sleep(timeout)
+        return False
+    ready, _, _ = select.select([sys.stdin], [], [], timeout)
+    if ready:
+        sys.stdin.readline()
+        return True
+    return False
+
+
+class PacingClock:
+    """Central clock for game delays"""
+
+    def __init__(self, mode="realtime", speedup=4.0, wait_for_key=wait_for_key, delay=None):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode {mode!r}, expected one of {PACING_MODES}")
+        self.mode = mode
+        self.speedup = speedup
+        # Returns True if a key was pressed within the timeout; without one, "skip" waits like "realtime"
+        self.wait_for_key = wait_for_key
+        # Takes over the waits of a game that must not block (one on a server's event loop)
+        self.delay = delay
+        # Set once the player skips, until the game next asks for input
+        self.skipping = False
+
+    def scale(self, seconds):
+        """How long a delay of `seconds` really lasts in this mode"""
+        if self.mode == "instant" or self.skipping:
+            return 0.0
+        if self.mode == "accelerated":
+            return seconds / self.speedup
+        return seconds
+
+    def sleep(self, seconds):
+        """Wait out a delay, scaled for the mode"""
+        seconds = self.scale(seconds)
+        if seconds <= 0:
+            return
+        if self.mode == "skip" and self.wait_for_key is not None:
+            self.skipping = self.wait_for_key(seconds)
+        elif self.delay is not None:
+            self.delay(seconds)
+        else:
+            time.sleep(seconds)
+
+    def chunk_size(self, delay, length):
+        """Characters per write when animating `length` characters `delay` seconds apart"""
+        delay = self.scale(delay)
+        if delay <= 0:
+            return max(length, 1)
+        return max(1, math.ceil(ANIMATION_FRAME / delay))
+
+    def resume(self):
+        """Go back to full delays after a skip"""
+        self.skipping = False
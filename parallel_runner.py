@@ -0,0 +1,181 @@
+"""
+Parallel climb runner for Tower of Chance
+
+Spreads independent climbs over a process pool. Climbs are split into
+batches; every batch gets its own seed derived from the run seed, so the
+merged results only depend on the seed and batch size - never on how many
+workers ran them or in which order they finished.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tower_of_chance import CHARACTER_CLASSES
+from headless import HeadlessTowerOfChance, RandomDecisionProvider
+
+ENGINES = ["headless", "vector"]
+
+# Climbs per batch unless given. It never depends on the worker count, since
+# the batches decide the seeds and so the results
+DEFAULT_BATCH_SIZES = {"headless": 25, "vector": 10000}
+
+
+def batch_seeds(seed, batches):
+    """One independent, reproducible seed per batch, derived from the run seed"""
+    master = random.Random(seed)
+    return [master.getrandbits(64) for _ in range(batches)]
+
+
+def empty_summary(tower_height, stat_names):
+    """Counters for a set of climbs: self.stats totals plus per-floor histograms"""
+    return {
+        "climbs": 0,
+        "completed": 0,
+        # Floor attempts over all climbs, and over completed climbs only
+        "attempts": 0,
+        "completed_attempts": 0,
+        "stats": {stat: 0 for stat in stat_names},
+        # Indexed by floor number; index 0 is unused
+        "floor_passes": [0] * (tower_height + 1),
+        "floor_fails": [0] * (tower_height + 1)
+    }
+
+
+def merge_summaries(summaries):
+    """Add up batch summaries into one"""
+    summaries = list(summaries)
+    merged = empty_summary(len(summaries[0]["floor_passes"]) - 1, summaries[0]["stats"])
+    for summary in summaries:
+        for key in ("climbs", "completed", "attempts", "completed_attempts"):
+            merged[key] += summary[key]
+        for stat, value in summary["stats"].items():
+            merged["stats"][stat] = merged["stats"].get(stat, 0) + value
+        for key in ("floor_passes", "floor_fails"):
+            merged[key] = [a + b for a, b in zip(merged[key], summary[key])]
+    return merged
+
+
+def run_headless_batch(seed, climbs, max_attempts=1000, character_class=None):
+    """Run climbs one at a time with HeadlessTowerOfChance"""
+    game = HeadlessTowerOfChance(RandomDecisionProvider(random.Random(f"{seed}:decisions"), character_class),
+                                 seed=seed)
+    summary = empty_summary(game.tower_height, game.stats)
+
+    for _ in range(climbs):
+        climb = game.run_climb(max_attempts=max_attempts)
+        summary["climbs"] += 1
+        summary["attempts"] += climb["attempts"]
+        if climb["completed"]:
+            summary["completed"] += 1
+            summary["completed_attempts"] += climb["attempts"]
+        for stat, value in climb["stats"].items():
+            summary["stats"][stat] += value
+        for floor in climb["floors"]:
+            key = "floor_passes" if floor["success"] else "floor_fails"
+            if floor["floor"] <= game.tower_height:
+                summary[key][floor["floor"]] += 1
+    return summary
+
+
+def run_vector_batch(seed, climbs, max_attempts=1000, character_class=None):
+    """Run climbs as one NumPy population with vector_sim.ClimbSimulator"""
+    from vector_sim import ClimbSimulator
+
+    classes = CHARACTER_CLASSES if character_class is None else [CHARACTER_CLASSES[character_class]]
+    simulator = ClimbSimulator(seed=seed)
+    # Split the climbs exactly; the first classes take the remainder
+    share, extra = divmod(climbs, len(classes))
+    counts = [share + (i < extra) for i in range(len(classes))]
+    results = simulator.run(climbers_per_class=counts, classes=classes, max_attempts=max_attempts)
+
+    summary = empty_summary(simulator.tower_height, simulator.game.stats)
+    summary["attempts"] = int(simulator.attempts.sum())
+    summary["completed_attempts"] = int(simulator.attempts[simulator.level >= simulator.tower_height].sum())
+    for result in results.values():
+        summary["climbs"] += result["climbers"]
+        summary["completed"] += result["completed"]
+        for stat, value in result["stats"].items():
+            summary["stats"][stat] += value
+        # Simulator histograms cover floors 1..tower_height-1
+        for i, (attempts, passes) in enumerate(zip(result["floor_attempts"], result["floor_passes"])):
+            summary["floor_passes"][i + 1] += int(passes)
+            summary["floor_fails"][i + 1] += int(attempts - passes)
+    if summary["climbs"] != climbs:
+        raise RuntimeError(f"Vector batch ran {summary['climbs']} climbs instead of {climbs}")
+    return summary
+
+
+BATCH_RUNNERS = {"headless": run_headless_batch, "vector": run_vector_batch}
+
+
+def _run_batch(args):
+    engine, seed, climbs, max_attempts, character_class = args
+    return BATCH_RUNNERS[engine](seed, climbs, max_attempts, character_class)
+
+
+def run_parallel(climbs, seed=None, workers=None, batch_size=None, engine="headless",
+                 character_class=None, max_attempts=1000):
+    """Run `climbs` independent climbs across a process pool and merge the results"""
+    if engine not in BATCH_RUNNERS:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+
+    workers = workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    batch_size = batch_size or DEFAULT_BATCH_SIZES[engine]
+
+    sizes = [batch_size] * (climbs // batch_size)
+    if climbs % batch_size:
+        sizes.append(climbs % batch_size)
+    tasks = [(engine, batch_seed, size, max_attempts, character_class)
+             for batch_seed, size in zip(batch_seeds(seed, len(sizes)), sizes)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        summaries = [_run_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(_run_batch, tasks))
+    elapsed = time.perf_counter() - start
+
+    merged = merge_summaries(summaries)
+    merged.update({
+        "seed": seed,
+        "engine": engine,
+        "workers": workers,
+        "batches": len(tasks),
+        "elapsed": elapsed,
+        "climbs_per_second": merged["climbs"] / elapsed if elapsed else 0.0,
+        "floors_per_second": merged["attempts"] / elapsed if elapsed else 0.0
+    })
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Tower of Chance climbs across all cores")
+    parser.add_argument("climbs", type=int, help="number of climbs to simulate")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="climbs per batch; defaults to " +
+                             ", ".join(f"{size} for {engine}" for engine, size in DEFAULT_BATCH_SIZES.items()))
+    parser.add_argument("--engine", choices=ENGINES, default="headless")
+    parser.add_argument("--max-attempts", type=int, default=1000)
+    args = parser.parse_args()
+
+    result = run_parallel(args.climbs, seed=args.seed, workers=args.workers, batch_size=args.batch_size,
+                          engine=args.engine, max_attempts=args.max_attempts)
+
+    print(f"Seed {result['seed']} - {result['climbs']} climbs on {result['workers']} workers "
+          f"in {result['elapsed']:.2f}s")
+    print(f"Throughput: {result['climbs_per_second'] * 60:,.0f} climbs/min, "
+          f"{result['floors_per_second']:,.0f} floors/s")
+    print(f"Completed: {result['completed']}/{result['climbs']}")
+    for stat, value in result["stats"].items():
+        print(f"  {stat}: {value}")
+
+
+if __name__ == "__main__":
+    main()
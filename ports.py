@@ -0,0 +1,142 @@
+"""
+Input and output ports for Tower of Chance
+
+A game reads the player's answers from its input port and writes everything
+it shows to its output port. The defaults are the terminal; bots, servers
+and tests pass their own, so many games can run side by side in one
+process without patching builtins.
+
+An input port has `read(prompt, descriptor)`, which shows the prompt and
+returns the answer. The descriptor is the prompt for machines: a dict with
+a stable "id", the accepted "choices" (None for free text), the plain
+"prompt" text and a "context" dict of what the prompt is about, so bots can
+look up a handler by id instead of parsing the wording. An input port may
+also have `wait_for_key(timeout)` for skip pacing.
+An output port has `write(text)` and `isatty()`. Bells are written from
+the game's sound thread, so `write` may be called from another thread, but
+the game never makes two calls to it at once. It may also have a
+`size` of (columns, lines), and `observe(kind, data)` to be told what
+happens in the game ("floor", "environment", "effects", "challenge",
+"result") as plain data rather than screen text. A port that sends prompts out
+after the game has moved on, such as a network session sleeping out the
+pauses before it, has `prompt_sent_at()` to say when the pending prompt
+actually went out, so timed challenges measure the player and not the wait.
+A port that must not block sets `defer_flushes`, and the game then hands
+waits for its saves to the caller (see tower_of_chance.SaveFlush).
+"""
+import json
+import sys
+import threading
+
+from pacing import wait_for_key
+from render import ANSI_ESCAPE
+
+
+def serialized(write):
+    """`write` for several threads: the calls go through one at a time"""
+    lock = threading.RLock()
+
+    def locked(text):
+        with lock:
+            write(text)
+
+    return locked
+
+
+class ConsoleInput:
+    """Answers typed at the terminal"""
+
+    def read(self, prompt="", descriptor=None):
+        return input(prompt)
+
+    def wait_for_key(self, timeout):
+        return wait_for_key(timeout)
+
+
+class ConsoleOutput:
+    """The terminal"""
+
+    def write(self, text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def isatty(self):
+        return sys.stdout.isatty()
+
+
+class CallbackInput:
+    """Answers from a function of the prompt and its descriptor"""
+
+    def __init__(self, answer):
+        self.answer = answer
+
+    def read(self, prompt="", descriptor=None):
+        return self.answer(prompt, descriptor)
+
+
+class CallbackOutput:
+    """Output handed to a function, such as a list's append"""
+
+    def __init__(self, write, interactive=False):
+        self._write = write
+        self.interactive = interactive
+
+    def write(self, text):
+        self._write(text)
+
+    def isatty(self):
+        return self.interactive
+
+
+class JsonLinesPort:
+    """Both ports as JSON lines, for programs that drive the game.
+
+    Everything the game shows goes out as one JSON object per line with a
+    "type": the observations, the prompts (their descriptors) and the
+    screen text, without escape sequences. Each answer comes back as one
+    JSON line, either a string or an object with an "answer".
+    """
+
+    def __init__(self, stdin=None, stdout=None):
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        # Screen text waiting to go out as one message, ahead of the next observation or prompt
+        self.text = []
+
+    def send(self, message):
+        self.send_text()
+        self.stdout.write(json.dumps(message) + "\n")
+
+    def send_text(self):
+        """Send the screen text still waiting, such as the last words before the game ends"""
+        if self.text:
+            text = ANSI_ESCAPE.sub("", "".join(self.text)).replace("\a", "")
+            self.text = []
+            if text.strip():
+                self.stdout.write(json.dumps({"type": "text", "text": text}) + "\n")
+
+    def isatty(self):
+        return False
+
+    def write(self, text):
+        self.text.append(text)
+
+    def observe(self, kind, data):
+        self.send({"type": kind, **data})
+
+    def read(self, prompt="", descriptor=None):
+        self.send({"type": "prompt", **descriptor})
+        while True:
+            # The driver only answers once it has seen the prompt
+            self.stdout.flush()
+            line = self.stdin.readline()
+            if not line:
+                raise EOFError("No more answers")
+            try:
+                action = json.loads(line)
+            except ValueError as e:
+                self.send({"type": "error", "message": f"Invalid JSON: {e}"})
+                continue
+            if isinstance(action, dict):
+                action = action.get("answer", "")
+            return str(action)
@@ -0,0 +1,130 @@
+"""
+Terminal rendering for Tower of Chance
+
+Screens are composed line by line into a frame and written to the terminal
+in one go, instead of one print per line. That keeps remote terminals and
+multiplexers from flickering while a screen is half drawn.
+
+The renderer also keeps a model of what is on the terminal. Clearing the
+screen is done with ANSI escapes, and the first frame after a clear only
+rewrites the rows that differ from the screen it replaces.
+"""
+import re
+import shutil
+import sys
+from contextlib import contextmanager
+
+from colorama import Style
+
+# Cursor to the top left, then erase the whole screen
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+
+def visible_width(text):
+    """Columns a line takes up on the terminal, ignoring escape sequences"""
+    return len(ANSI_ESCAPE.sub("", text))
+
+
+class Renderer:
+    """Collects the lines of a screen and writes them with a single call.
+
+    Outside of a `frame()` every line is written straight away. Inside one,
+    lines are buffered until the outermost frame ends or `flush` is called,
+    which the game does before it waits for input or pauses.
+
+    `clear()` doesn't write anything by itself; the next write starts the new
+    screen. When the old and new screens both fit on the terminal, only the
+    changed rows are rewritten. Otherwise (or when output isn't a terminal)
+    the screen is erased and redrawn in full.
+    """
+
+    def __init__(self, write=None, diff=None, size=None):
+        # Goes through print so anything that patches it still sees the output
+        self.write = write or (lambda text: print(text, end="", flush=True))
+        self.diff = sys.stdout.isatty() if diff is None else diff
+        # (columns, lines) of the terminal, when it isn't the one we run in
+        self.size = size
+        self.lines = []
+        self.depth = 0
+
+        # Rows on the terminal since the last clear, the last one being where
+        # the cursor is. None until the first clear, as the game doesn't know
+        # what was on the terminal before it started.
+        self.screen = None
+        self.previous = None
+        self.cleared = False
+
+    def line(self, text="", color=""):
+        """Add a line; colored lines are reset at their end so colors never bleed into the next one"""
+        if color:
+            text = f"{color}{text}{Style.RESET_ALL}"
+        self.lines.append(text)
+        if not self.depth:
+            self.flush()
+
+    @contextmanager
+    def frame(self):
+        """Buffer everything drawn inside the block and write it as one frame"""
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.flush()
+
+    def flush(self):
+        """Write whatever has been drawn so far, starting the new screen if one is due"""
+        if self.lines:
+            text = "\n".join(self.lines) + "\n"
+            self.lines = []
+            self.text(text)
+        elif self.cleared:
+            self.text("")
+
+    def text(self, text):
+        """Write raw text, such as part of a line, after anything already drawn"""
+        if self.lines:
+            self.flush()
+        if self.cleared:
+            text = self._redraw(text)
+        else:
+            self.track(text)
+        self.write(text)
+
+    def clear(self):
+        """Start a new screen with the next write"""
+        self.flush()
+        if not self.cleared:
+            self.previous = self.screen
+            self.cleared = True
+        self.screen = [""]
+
+    def track(self, text):
+        """Note text that reached the terminal some other way, such as an echoed answer"""
+        # Only a diffed redraw looks at the model
+        if self.diff and self.screen is not None:
+            rows = text.split("\n")
+            self.screen[-1] += rows[0]
+            self.screen.extend(rows[1:])
+
+    def _fits(self, rows):
+        columns, lines = self.size or shutil.get_terminal_size()
+        return len(rows) < lines and all(visible_width(row) < columns for row in rows)
+
+    def _redraw(self, text):
+        """Escape sequences that turn the previous screen into `text`"""
+        previous, self.previous, self.cleared = self.previous, None, False
+        self.track(text)
+        rows = text.split("\n")
+        if not self.diff or previous is None or not self._fits(previous) or not self._fits(rows):
+            return CLEAR_SCREEN + text
+
+        # Rewrite the rows that changed, then erase whatever the old screen had below
+        parts = []
+        for row, line in enumerate(rows[:-1]):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        parts.append(f"\x1b[{len(rows)};1H\x1b[J{rows[-1]}")
+        return "".join(parts)
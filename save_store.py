@@ -0,0 +1,398 @@
+"""
+Save storage for Tower of Chance - where saves live and how they get there
+"""
+import atexit
+import gzip
+import json
+import lzma
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+SAVE_BACKENDS = ["file", "sqlite"]
+SAVE_COMPRESSIONS = ["none", "gzip", "lzma"]
+
+# Leading bytes that identify a compressed save
+GZIP_MAGIC = b"\x1f\x8b"
+LZMA_MAGIC = b"\xfd7zXZ\x00"
+
+# Player names become file names, so they are kept to characters that are safe in one
+SAVE_NAME = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
+
+def valid_save_name(name):
+    """Whether a player name can be saved under"""
+    return isinstance(name, str) and SAVE_NAME.fullmatch(name) is not None
+
+
+def check_save_name(name):
+    """Raise ValueError for a name that can't be saved under"""
+    if not valid_save_name(name):
+        raise ValueError(f"Invalid player name {name!r}: use 1-32 letters, digits, '_' or '-'")
+
+
+def pack_save(text, compression="none"):
+    """Save text as the bytes to store, optionally compressed"""
+    if compression not in SAVE_COMPRESSIONS:
+        raise ValueError(f"Unknown save compression {compression!r}, expected one of {SAVE_COMPRESSIONS}")
+    data = text.encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(data, mtime=0)
+    if compression == "lzma":
+        return lzma.compress(data)
+    return data
+
+
+def unpack_save(data):
+    """Save text from stored bytes, whichever compression they use"""
+    if isinstance(data, str):
+        return data
+    if data.startswith(GZIP_MAGIC):
+        data = gzip.decompress(data)
+    elif data.startswith(LZMA_MAGIC):
+        data = lzma.decompress(data)
+    return data.decode("utf-8")
+
+
+class FileSaveStore:
+    """One JSON file per player in a saves directory"""
+
+    def __init__(self, directory="saves"):
+        self.directory = directory
+        # Identifies the store when sharing a writer between games
+        self.location = os.path.abspath(directory)
+
+    def path(self, name):
+        check_save_name(name)
+        path = os.path.join(self.directory, f"{name}_save.json")
+        # Whatever the name, the save stays in the saves directory
+        if os.path.dirname(os.path.abspath(path)) != self.location:
+            raise ValueError(f"Save for {name!r} would be outside {self.directory!r}")
+        return path
+
+    def read(self, name):
+        """Stored save for a player; raises FileNotFoundError if there is none"""
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def write_many(self, saves):
+        """Write a batch of {name: (data, summary)} saves atomically, as one group commit.
+
+        Each save goes to a temp file that is fsynced and then renamed over
+        the old save, so a crash leaves either the old or the new save and
+        never a truncated one. The directory is fsynced once per batch.
+        """
+        # Create saves directory if it doesn't exist
+        os.makedirs(self.directory, exist_ok=True)
+        for name, (data, summary) in saves.items():
+            path = self.path(name)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}_save.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        self._sync_directory()
+
+    def _sync_directory(self):
+        """Make the renames durable (not possible on Windows, where rename is already safe enough)"""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+    def top_players(self, limit=10):
+        """Highest climbers as (name, class, max_level); reads every save"""
+        players = []
+        for filename in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if not filename.endswith("_save.json") or not valid_save_name(filename[:-len("_save.json")]):
+                continue
+            try:
+                save_data = json.loads(unpack_save(self.read(filename[:-len("_save.json")])))
+            except (OSError, ValueError):
+                continue
+            player = save_data.get("player", save_data)
+            players.append((player.get("name", ""), player.get("class", ""), player.get("max_level", 0)))
+        players.sort(key=lambda p: p[2], reverse=True)
+        return players[:limit]
+
+
+class SQLiteSaveStore:
+    """All saves in one SQLite database, for large numbers of players.
+
+    The database runs in WAL mode so readers never block the writer, and
+    sessions borrow connections from a small pool. Name, class and
+    max_level are kept in indexed columns next to the save itself, so
+    loading a player and the leaderboard are both index lookups.
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS saves (
+               name TEXT PRIMARY KEY,
+               class TEXT,
+               level INTEGER,
+               max_level INTEGER,
+               data BLOB NOT NULL,
+               updated_at REAL NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS saves_max_level ON saves (max_level DESC)",
+        "CREATE INDEX IF NOT EXISTS saves_class ON saves (class, max_level DESC)"
+    ]
+
+    # Fixed statement texts, so sqlite3's statement cache prepares each once per connection
+    READ_SQL = "SELECT data FROM saves WHERE name = ?"
+    WRITE_SQL = """INSERT INTO saves (name, class, level, max_level, data, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (name) DO UPDATE SET
+                       class = excluded.class, level = excluded.level, max_level = excluded.max_level,
+                       data = excluded.data, updated_at = excluded.updated_at"""
+    TOP_SQL = "SELECT name, class, max_level FROM saves ORDER BY max_level DESC LIMIT ?"
+    TOP_BY_CLASS_SQL = "SELECT name, class, max_level FROM saves WHERE class = ? ORDER BY max_level DESC LIMIT ?"
+
+    def __init__(self, path=os.path.join("saves", "tower_of_chance.db"), pool_size=4):
+        self.path = path
+        self.location = os.path.abspath(path)
+        directory = os.path.dirname(self.location)
+        os.makedirs(directory, exist_ok=True)
+
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.location, check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync is still crash-safe; only the last commits can be lost on power failure
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection; commits on success, rolls back on error"""
+        connection = self._pool.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._pool.put(connection)
+
+    def read(self, name):
+        """Stored save for a player; raises FileNotFoundError if there is none"""
+        check_save_name(name)
+        with self._connection() as connection:
+            row = connection.execute(self.READ_SQL, (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No save for {name!r}")
+        return row[0]
+
+    def write_many(self, saves):
+        """Write a batch of {name: (data, summary)} saves in a single transaction"""
+        for name in saves:
+            check_save_name(name)
+        now = time.time()
+        rows = [(name, summary.get("class"), summary.get("level"), summary.get("max_level"), data, now)
+                for name, (data, summary) in saves.items()]
+        with self._connection() as connection:
+            connection.executemany(self.WRITE_SQL, rows)
+
+    def top_players(self, limit=10, character_class=None):
+        """Highest climbers as (name, class, max_level), optionally for one class"""
+        with self._connection() as connection:
+            if character_class is None:
+                return connection.execute(self.TOP_SQL, (limit,)).fetchall()
+            return connection.execute(self.TOP_BY_CLASS_SQL, (character_class, limit)).fetchall()
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get().close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_save_store(backend="file", directory="saves"):
+    """Save store for a backend name ("file" or "sqlite"), shared per location"""
+    if backend not in SAVE_BACKENDS:
+        raise ValueError(f"Unknown save backend {backend!r}, expected one of {SAVE_BACKENDS}")
+    key = (backend, os.path.abspath(directory))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if backend == "sqlite":
+                store = SQLiteSaveStore(os.path.join(directory, "tower_of_chance.db"))
+            else:
+                store = FileSaveStore(directory)
+            _stores[key] = store
+        return store
+
+
+class SaveWriter:
+    """Writes saves to a store on a background thread.
+
+    Saves submitted for the same player before the next write replace each
+    other, so a burst of changes costs a single write. Nothing waits more
+    than `flush_interval` seconds, and `flush` (also run at exit) writes
+    everything still pending before returning.
+
+    Games sharing a writer (see `shared`) have their saves written together
+    in one batch, so the store's sync cost is paid once per interval rather
+    than once per player and floor. When a batch fails, its saves are
+    written one by one so only the saves that fail are held back; those
+    are retried with the next batch, and their errors are kept per player
+    for that player's `flush` to report.
+    """
+
+    _writers = {}
+    _writers_lock = threading.Lock()
+
+    def __init__(self, store, flush_interval=2.0):
+        self.store = store
+        self.flush_interval = flush_interval
+        # Last write error for each player whose save is still failing
+        self.errors = {}
+
+        self._pending = {}
+        self._first_pending = None
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        # Write attempts so far, so a flush can wait for the one that covers its saves
+        self._attempts = 0
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @classmethod
+    def shared(cls, store, flush_interval=2.0):
+        """Writer shared by every game in this process that saves to the same place"""
+        with cls._writers_lock:
+            writer = cls._writers.get(store.location)
+            if writer is None:
+                writer = cls._writers[store.location] = cls(store, flush_interval)
+            return writer
+
+    def submit(self, name, data, summary=None):
+        """Queue a save; it replaces any save for the same player that is still pending.
+
+        `summary` holds the class, level and max_level that stores may index.
+        """
+        check_save_name(name)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SaveWriter is closed")
+            self._pending[name] = (data, summary or {})
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SaveWriter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            # Only the first save of a batch wakes the writer; waking it for
+            # the rest would just hand it the GIL to wait out the same deadline
+            if self._first_pending is None:
+                self._first_pending = time.monotonic()
+                self._condition.notify_all()
+
+    def flush(self, name=None):
+        """Write everything pending now and wait for it.
+
+        With a `name`, re-raises the error if that player's save could not
+        be written; it stays queued and is retried with the next batch.
+        """
+        with self._condition:
+            # The batch being written, if any, and then one for what is pending
+            target = self._attempts + self._writing + bool(self._pending)
+            if self._pending:
+                self._flush_requested = True
+                self._condition.notify_all()
+            while self._attempts < target:
+                self._condition.wait()
+            error = self.errors.get(name) if name is not None else None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            if self._thread is not None and self._thread is not threading.current_thread():
+                self._thread.join()
+
+    def _write(self, batch):
+        """Write a batch; returns the saves that failed, with their errors"""
+        try:
+            self.store.write_many(batch)
+            return {}
+        except Exception:
+            if len(batch) == 1:
+                raise
+        # Find out which saves are at fault, so the others still get written
+        failed = {}
+        for name, save in batch.items():
+            try:
+                self.store.write_many({name: save})
+            except Exception as e:
+                failed[name] = (save, e)
+        return failed
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._pending and not self._closed:
+                    condition.wait()
+                if not self._pending:
+                    return
+
+                # Let more changes pile up until the oldest one is due
+                deadline = self._first_pending + self.flush_interval
+                while not self._flush_requested and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+
+                batch, self._pending = self._pending, {}
+                self._first_pending = None
+                self._flush_requested = False
+                self._writing = True
+
+            try:
+                failed = self._write(batch)
+            except Exception as e:
+                # Keep the thread alive; the save's owner hears about it on flush
+                name, save = next(iter(batch.items()))
+                failed = {name: (save, e)}
+            with condition:
+                for name in batch:
+                    if name not in failed:
+                        self.errors.pop(name, None)
+                for name, (save, error) in failed.items():
+                    self.errors[name] = error
+                    # Retry with the next batch, unless a newer save replaced it; there is no next batch once closed
+                    if not self._closed and name not in self._pending:
+                        self._pending[name] = save
+                        if self._first_pending is None:
+                            self._first_pending = time.monotonic()
+                self._writing = False
+                self._attempts += 1
+                condition.notify_all()
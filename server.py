@@ -0,0 +1,220 @@
+"""
+Network play for Tower of Chance - one game session per TCP connection
+
+Start a server with `python server.py --port 4000` and connect with telnet
+or `nc localhost 4000`.
+
+Everything runs on one asyncio event loop, with no thread per session. A
+session advances its game one prompt at a time with start() and step():
+while the game runs, its output and pauses collect in the session's outbox,
+and the session then writes them out, waiting for the client to drain and
+sleeping out each pause, before it reads the player's next line. Waiting
+for a save to reach the disk happens on a worker thread the session awaits,
+so one player's save never holds up the others. A client that stops reading
+holds up its own game rather than filling the server's memory, and an idle
+session is just a suspended coroutine.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from sound import LoopSoundQueue
+from tower_of_chance import SaveFlush, TowerOfChance
+
+log = logging.getLogger(__name__)
+
+# Bytes a client may leave unread before its session waits for it
+WRITE_HIGH_WATER = 64 * 1024
+
+# Telnet clients don't report their size
+TERMINAL_SIZE = (80, 24)
+
+
+class GameSession:
+    """One connected player: a game the event loop advances as lines arrive.
+
+    The session is the game's output port; answers go in through step().
+    """
+
+    # Telnet clients don't report their size, so assume the classic terminal
+    size = TERMINAL_SIZE
+    # Saves are waited for off the event loop, see flush_saves()
+    defer_flushes = True
+
+    def __init__(self, server, reader, writer, seed):
+        self.reader = reader
+        self.writer = writer
+        # Text (bytes) and pauses (seconds) waiting to go out, in order
+        self.outbox = []
+        # When the last prompt went out, for timed challenges
+        self.sent_at = time.time()
+        # Players must not change the server's settings or challenges for everyone else
+        self.game = TowerOfChance(seed=seed, input_port=self, output_port=self, editors=False)
+        # Bells ring from a task on the loop rather than a thread per session
+        self.game.sound = LoopSoundQueue(server.loop, self.game.sound.enabled, self.game.clock,
+                                         write=self.ring)
+
+    # --- Ports ---
+
+    def isatty(self):
+        return True
+
+    def read(self, prompt="", descriptor=None):
+        raise RuntimeError("Network games are advanced with step(), not read from")
+
+    def write(self, text):
+        self.outbox.append(text.replace("\n", "\r\n").encode("utf-8"))
+
+    def delay(self, seconds):
+        """Pause for dramatic effect once the output before it has gone out"""
+        self.outbox.append(seconds)
+
+    def prompt_sent_at(self):
+        """When the pending prompt reached the client, after the pauses before it"""
+        return self.sent_at
+
+    def ring(self, text):
+        """Send a bell straight away, even while the game waits for input"""
+        if not self.writer.is_closing():
+            self.writer.write(text.encode("utf-8"))
+
+    # --- Event loop side ---
+
+    async def run(self):
+        """Play until the player quits or disconnects"""
+        try:
+            prompt = self.game.start("title")
+            while prompt is not None:
+                if isinstance(prompt, SaveFlush):
+                    prompt = self.game.step(await self.flush_saves(prompt.name))
+                    continue
+                self.write(prompt[0])
+                await self.send()
+                line = await self.receive()
+                if line is None:
+                    return
+                prompt = self.game.step(line)
+            await self.send()
+        except ConnectionError:
+            pass
+        except Exception:
+            # A broken game ends its own session, never the server or the other players
+            log.exception("Game session failed")
+            self.outbox = []
+            self.ring("\r\nSomething went wrong in the tower, so this session has ended.\r\n")
+        finally:
+            self.game.sound.close()
+            self.writer.close()
+
+    async def send(self):
+        """Write out the outbox, waiting for the client to keep up and sleeping out pauses"""
+        outbox, self.outbox = self.outbox, []
+        for item in outbox:
+            if self.writer.is_closing():
+                raise ConnectionResetError("client disconnected")
+            if isinstance(item, bytes):
+                self.writer.write(item)
+            else:
+                await self.writer.drain()
+                await asyncio.sleep(item)
+        await self.writer.drain()
+        self.sent_at = time.time()
+
+    async def flush_saves(self, name):
+        """Wait for the game's pending saves on a worker thread; returns the save error for `name`"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.game.save_writer.flush, name)
+        except Exception as e:
+            return e
+        return None
+
+    async def receive(self):
+        """Next line from the client, or None once it has gone"""
+        try:
+            line = await self.reader.readline()
+        except (ConnectionError, ValueError):
+            return None
+        if not line:
+            return None
+        return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def close(self):
+        """Hang up; the session finishes as soon as its read or write sees it"""
+        self.writer.close()
+
+
+class TowerServer:
+    """asyncio TCP server hosting a game session per connection"""
+
+    def __init__(self, host="127.0.0.1", port=4000, seed=None, max_sessions=1000):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        # Every session gets its own seed, reproducible from the server's
+        self.seeds = random.Random(seed) if seed is not None else random.SystemRandom()
+        self.sessions = set()
+        self.loop = None
+        self.server = None
+
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                                 backlog=1024)
+        # Port 0 picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"The tower is full, please try again later.\r\n")
+            await writer.drain()
+            writer.close()
+            return
+
+        session = GameSession(self, reader, writer, self.seeds.getrandbits(64))
+        self.sessions.add(session)
+        try:
+            await session.run()
+        finally:
+            self.sessions.discard(session)
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        for session in list(self.sessions):
+            session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Tower of Chance for players connecting over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    server = TowerServer(args.host, args.port, args.seed, args.max_sessions)
+
+    async def serve():
+        await server.start()
+        print(f"Tower of Chance listening on {server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
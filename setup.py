@@ -26,6 +26,10 @@ setup(
     install_requires=[
         "colorama>=0.4.4",
     ],
+    extras_require={
+        # vector_sim.py and the vector engine of parallel_runner.py
+        "sim": ["numpy>=1.17"],
+    },
     entry_points={
         "console_scripts": [
             "tower-of-chance=tower_of_chance:main",
@@ -0,0 +1,148 @@
+"""
+Sound effects for Tower of Chance - terminal bells played on a background thread
+
+The game only queues a sound and moves on; a worker thread rings the bells
+with their pauses in between. When sounds back up, a sound that is already
+waiting isn't queued again, and anything beyond `max_pending` is dropped.
+Games played on an asyncio event loop use LoopSoundQueue, which rings the
+bells from a task on the loop instead of a thread.
+"""
+import asyncio
+import collections
+import queue
+import sys
+import threading
+import time
+
+# Pause (in seconds) before each bell of a sound
+SOUNDS = {
+    "success": (0.0,),
+    "failure": (0.1, 0.1),
+    "achievement": (0.0, 0.2),
+    "boss": (0.0, 0.2, 0.2)
+}
+
+
+class SoundQueue:
+    """Fire-and-forget sound effects"""
+
+    def __init__(self, enabled=True, clock=None, max_pending=4, write=None):
+        self.enabled = enabled
+        # Pauses between bells follow the game's pacing, if given
+        self.clock = clock
+        self.write = write or self._bell
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def play(self, sound_type):
+        """Queue a sound; returns at once, whether or not the sound will be played"""
+        if not self.enabled or sound_type not in SOUNDS:
+            return
+        with self._lock:
+            if self._closed or sound_type in self._pending:
+                return
+            try:
+                self._queue.put_nowait(sound_type)
+            except queue.Full:
+                return
+            self._pending.add(sound_type)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SoundQueue", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Stop the worker once the sound it is playing has finished; sounds that haven't started are dropped"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            if thread is None:
+                return
+            # Make room for the sentinel that wakes the worker
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._pending.clear()
+            self._queue.put_nowait(None)
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self):
+        while True:
+            sound_type = self._queue.get()
+            if sound_type is None or self._closed:
+                return
+            with self._lock:
+                self._pending.discard(sound_type)
+            for pause in SOUNDS[sound_type]:
+                if self.clock is not None:
+                    pause = self.clock.scale(pause)
+                if pause > 0:
+                    time.sleep(pause)
+                try:
+                    self.write("\a")
+                except Exception:
+                    # Nowhere to play it any more (a closed connection, say)
+                    return
+
+    @staticmethod
+    def _bell(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+class LoopSoundQueue:
+    """Fire-and-forget sound effects for a game on an asyncio event loop.
+
+    Same interface as SoundQueue; `play` must be called on the loop's thread.
+    """
+
+    def __init__(self, loop, enabled=True, clock=None, max_pending=4, write=None):
+        self.loop = loop
+        self.enabled = enabled
+        self.clock = clock
+        self.write = write or SoundQueue._bell
+        self.max_pending = max_pending
+
+        self._queue = collections.deque()
+        self._task = None
+        self._closed = False
+
+    def play(self, sound_type):
+        """Queue a sound; returns at once, whether or not the sound will be played"""
+        if not self.enabled or self._closed or sound_type not in SOUNDS:
+            return
+        if sound_type in self._queue or len(self._queue) >= self.max_pending:
+            return
+        self._queue.append(sound_type)
+        if self._task is None:
+            self._task = self.loop.create_task(self._run())
+
+    def close(self):
+        """Stop playing; sounds that haven't started yet are dropped"""
+        self._closed = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        try:
+            while self._queue:
+                sound_type = self._queue.popleft()
+                for pause in SOUNDS[sound_type]:
+                    if self.clock is not None:
+                        pause = self.clock.scale(pause)
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                    try:
+                        self.write("\a")
+                    except Exception:
+                        # Nowhere to play it any more (a closed connection, say)
+                        return
+        finally:
+            self._task = None
@@ -0,0 +1,25 @@
+"""
+Shared fixtures for the Tower of Chance tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# The game is a set of top-level modules in the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tower_of_chance import DEFAULT_CONFIG, thaw_config  # noqa: E402
+
+
+@pytest.fixture
+def game_dir(tmp_path, monkeypatch):
+    """Run in an empty directory with a config for fast, quiet games"""
+    config = thaw_config(DEFAULT_CONFIG)
+    config["game_settings"]["pacing"] = "instant"
+    config["game_settings"]["sound_effects"] = False
+    (tmp_path / "tower_config.json").write_text(json.dumps(config, indent=2))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
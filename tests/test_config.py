@@ -0,0 +1,88 @@
+"""
+Tests for validating tower_config.json
+"""
+import json
+import os
+
+import pytest
+
+from tower_of_chance import (DEFAULT_CONFIG, ConfigStore, challenge_type_samplers, thaw_config,
+                             validate_config)
+
+WEIGHTS = ["luck_challenge_weight", "skill_challenge_weight", "mixed_challenge_weight",
+           "legendary_challenge_weight"]
+
+
+def test_negative_weight_falls_back_to_default():
+    config = thaw_config(DEFAULT_CONFIG)
+    config["challenge_settings"]["skill_challenge_weight"] = -1
+    config["challenge_settings"]["luck_challenge_weight"] = 3
+    with pytest.warns(UserWarning, match="skill_challenge_weight"):
+        settings = validate_config(config)["challenge_settings"]
+    assert settings["skill_challenge_weight"] == DEFAULT_CONFIG["challenge_settings"]["skill_challenge_weight"]
+    assert settings["luck_challenge_weight"] == 3
+
+
+def test_all_zero_weights_below_the_legendary_floor_fall_back():
+    config = thaw_config(DEFAULT_CONFIG)
+    for key in WEIGHTS:
+        config["challenge_settings"][key] = 0
+    with pytest.warns(UserWarning, match="no challenge type"):
+        settings = validate_config(config)["challenge_settings"]
+    for key in WEIGHTS[:-1]:
+        assert settings[key] == DEFAULT_CONFIG["challenge_settings"][key]
+    # Legendary challenges may be switched off on their own
+    assert settings["legendary_challenge_weight"] == 0
+
+    # Both gates can still be sampled
+    challenge_type_samplers(["luck", "skill", "mixed", "legendary"], settings)
+
+
+def write_config(path, **game_settings):
+    config = thaw_config(DEFAULT_CONFIG)
+    config["game_settings"].update(game_settings)
+    path.write_text(json.dumps(config))
+
+
+def test_config_is_reread_once_the_file_changes(tmp_path):
+    path = tmp_path / "tower_config.json"
+    write_config(path, tower_height=40)
+    store = ConfigStore(str(path))
+    config = store.get()
+    assert config["game_settings"]["tower_height"] == 40
+    assert store.get() is config
+
+    # Same size and mtime: the cached config is still served
+    stat = os.stat(path)
+    write_config(path, tower_height=50)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert store.get() is config
+
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.get()["game_settings"]["tower_height"] == 50
+
+
+def test_config_is_read_only(tmp_path):
+    path = tmp_path / "tower_config.json"
+    write_config(path, extra_floors=[1, 2])
+    config = ConfigStore(str(path)).get()
+    with pytest.raises(TypeError):
+        config["game_settings"]["tower_height"] = 5
+    with pytest.raises(TypeError):
+        config["game_settings"] = {}
+    assert config["game_settings"]["extra_floors"] == (1, 2)
+    # thaw_config gives an editable copy
+    editable = thaw_config(config)
+    editable["game_settings"]["tower_height"] = 5
+    assert config["game_settings"]["tower_height"] == DEFAULT_CONFIG["game_settings"]["tower_height"]
+
+
+def test_invalid_config_value_falls_back_with_a_warning(tmp_path):
+    path = tmp_path / "tower_config.json"
+    write_config(path, tower_height="tall", pacing="warp")
+    with pytest.warns(UserWarning) as caught:
+        config = ConfigStore(str(path)).get()
+    messages = " ".join(str(warning.message) for warning in caught)
+    assert "tower_height" in messages and "pacing" in messages
+    assert config["game_settings"]["tower_height"] == DEFAULT_CONFIG["game_settings"]["tower_height"]
+    assert config["game_settings"]["pacing"] == DEFAULT_CONFIG["game_settings"]["pacing"]
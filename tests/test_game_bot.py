@@ -0,0 +1,22 @@
+"""
+Tests for game_bot.py
+"""
+import threading
+
+from game_bot import GameTesterBot
+from tower_of_chance import TowerOfChance
+
+
+def test_bots_in_threads_do_not_disturb_each_other(game_dir):
+    bots = [GameTesterBot(TowerOfChance(seed=i), str(game_dir / f"bot_{i}.txt"), echo=False) for i in range(6)]
+    for i, bot in enumerate(bots):
+        bot.rng.seed(i)
+    threads = [threading.Thread(target=bot.run_test_session, args=(150,)) for bot in bots]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert [bot.exceptions_found for bot in bots] == [0] * len(bots)
+    assert [bot.unhandled_prompts for bot in bots] == [[]] * len(bots)
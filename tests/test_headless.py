@@ -0,0 +1,44 @@
+"""
+Tests for the headless engine
+"""
+import random
+
+from headless import HeadlessTowerOfChance, RandomDecisionProvider
+
+
+class ReadingDecisionProvider(RandomDecisionProvider):
+    """Random player that asks for the game's output, like a provider that parses it"""
+
+    reads_output = True
+
+    def __init__(self, rng=None, character_class=None):
+        super().__init__(rng, character_class)
+        self.seen = []
+
+    def decide(self, descriptor, output):
+        self.seen.extend(output)
+        return super().decide(descriptor, output)
+
+
+def climb(provider_class, seed=1):
+    game = HeadlessTowerOfChance(provider_class(random.Random(seed)), seed=seed)
+    return game.run_climb()
+
+
+def test_same_seed_same_climb(game_dir):
+    first = climb(RandomDecisionProvider)
+    assert first == climb(RandomDecisionProvider)
+    assert first["attempts"] == len(first["floors"])
+    assert first["completed"] == (first["level"] >= 100)
+
+
+def test_collecting_output_does_not_change_the_climb(game_dir):
+    assert climb(RandomDecisionProvider) == climb(ReadingDecisionProvider)
+
+
+def test_output_reaches_providers_that_read_it(game_dir):
+    provider = ReadingDecisionProvider(random.Random(2))
+    game = HeadlessTowerOfChance(provider, seed=2)
+    game.new_character()
+    game.climb()
+    assert any("===" in line for line in provider.seen)
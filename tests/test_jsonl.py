@@ -0,0 +1,109 @@
+"""
+Tests for the JSON lines interface (tower_of_chance.py --jsonl)
+"""
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from save_store import FileSaveStore, unpack_save
+
+GAME = os.path.join(ROOT, "tower_of_chance.py")
+
+
+def start(game_dir, seed=7):
+    return subprocess.Popen([sys.executable, GAME, "--jsonl", "--seed", str(seed)], cwd=str(game_dir),
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+
+def run(game_dir, answers, seed=7):
+    """Send every answer up front and return the messages the game wrote"""
+    process = start(game_dir, seed)
+    out, _ = process.communicate("".join(answer + "\n" for answer in answers), timeout=60)
+    assert process.returncode == 0
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def prompt_ids(messages):
+    return [message["id"] for message in messages if message["type"] == "prompt"]
+
+
+def test_new_game_and_quit(game_dir):
+    answers = ['"1"', '"Ann"', '{"answer": "1"}', '"1"', '"1"', '"1"', '"1"', '"10"']
+    messages = run(game_dir, answers)
+    assert prompt_ids(messages) == ["title_menu", "character_name", "character_class", "skill_point",
+                                    "skill_point", "skill_point", "color_theme", "main_menu"]
+    main_menu = [m for m in messages if m["type"] == "prompt"][-1]
+    # No settings or challenge editors for programs driving the game
+    assert main_menu["choices"] == ["1", "2", "3", "4", "5", "6", "9", "10"]
+    assert main_menu["context"] == {"level": 1, "tower_height": 100}
+
+    text = "".join(m["text"] for m in messages if m["type"] == "text")
+    assert "Thanks for playing" in text
+    assert "\x1b" not in text and "\a" not in text
+
+
+def test_invalid_json_is_reported_and_asked_again(game_dir):
+    messages = run(game_dir, ["not json", '"3"'])
+    assert [m["type"] for m in messages][-3:] == ["prompt", "error", "text"]
+    assert prompt_ids(messages) == ["title_menu"]
+
+
+def test_end_of_input_ends_the_game(game_dir):
+    messages = run(game_dir, ['"1"'])
+    assert prompt_ids(messages) == ["title_menu", "character_name"]
+
+
+def test_climbing_reports_floors_and_results(game_dir):
+    process = start(game_dir)
+    answers = {"character_name": "Ann"}
+    menus = 0
+    observed = []
+    for line in process.stdout:
+        message = json.loads(line)
+        observed.append(message)
+        if message["type"] != "prompt":
+            continue
+        if message["id"] == "main_menu":
+            menus += 1
+            answer = "1" if menus == 1 else "10"
+        else:
+            answer = answers.get(message["id"], (message["choices"] or [""])[0])
+        process.stdin.write(json.dumps({"answer": answer}) + "\n")
+        process.stdin.flush()
+    assert process.wait(timeout=60) == 0
+
+    kinds = [message["type"] for message in observed]
+    assert "floor" in kinds and "result" in kinds
+    floor = observed[kinds.index("floor")]
+    result = observed[kinds.index("result")]
+    assert floor["level"] == 1
+    assert result["level"] == (2 if result["success"] else 1)
+
+
+def test_finished_tower_is_saved(game_dir):
+    config = json.loads((game_dir / "tower_config.json").read_text())
+    config["game_settings"]["tower_height"] = 2
+    (game_dir / "tower_config.json").write_text(json.dumps(config))
+
+    process = start(game_dir)
+    answers = {"character_name": "Ann", "main_menu": "1"}
+    titles = 0
+    for line in process.stdout:
+        message = json.loads(line)
+        if message["type"] != "prompt":
+            continue
+        if message["id"] == "title_menu":
+            # New game first, then quit once the tower is done
+            titles += 1
+            answer = "1" if titles == 1 else "3"
+        else:
+            answer = answers.get(message["id"], (message["choices"] or [""])[0])
+        process.stdin.write(json.dumps({"answer": answer}) + "\n")
+        process.stdin.flush()
+    assert process.wait(timeout=60) == 0
+    assert titles == 2
+
+    save = json.loads(unpack_save(FileSaveStore(str(game_dir / "saves")).read("Ann")))
+    assert save["player"]["level"] == 2
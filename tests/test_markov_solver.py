@@ -0,0 +1,54 @@
+"""
+Tests for markov_solver.py
+"""
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+
+np = pytest.importorskip("numpy")
+
+from markov_solver import MarkovSolver, completion_probability  # noqa: E402
+from vector_sim import ClimbSimulator  # noqa: E402
+
+
+@pytest.fixture
+def small_tower(game_dir):
+    """A 10-floor tower with the challenges the game ships with"""
+    config = json.loads((game_dir / "tower_config.json").read_text())
+    config["game_settings"]["tower_height"] = 10
+    (game_dir / "tower_config.json").write_text(json.dumps(config))
+    shutil.copy(os.path.join(ROOT, "challenges.json"), game_dir)
+    return game_dir
+
+
+def test_expected_attempts_match_the_simulator(small_tower):
+    solved = MarkovSolver(seed=1).solve_all()
+    simulated = ClimbSimulator(seed=1).run(climbers_per_class=4000)
+    for name, result in solved.items():
+        # The solver leaves out buffs, debuffs and rewards, which roughly cancel out
+        assert result["expected_attempts"] == pytest.approx(simulated[name]["mean_attempts"], rel=0.1), name
+
+
+def test_completion_distribution_agrees_with_the_expectation(small_tower):
+    solver = MarkovSolver(seed=1)
+    result = solver.solve([2, 2, 2, 2], max_attempts=2000)
+    cdf = result["completion_cdf"]
+    # No attempt can finish before every floor is cleared once
+    assert completion_probability(result, solver.tower_height - 2) == 0
+    assert completion_probability(result, 2000) == pytest.approx(1)
+    # E[attempts] is the sum of P(not done yet) over attempts
+    assert (1 - cdf).sum() == pytest.approx(result["expected_attempts"], rel=1e-6)
+
+
+def test_solve_all_is_deterministic(small_tower):
+    first = MarkovSolver(seed=5).solve_all()
+    again = MarkovSolver(seed=5).solve_all()
+    assert first.keys() == again.keys()
+    for name in first:
+        assert first[name]["expected_attempts"] == again[name]["expected_attempts"]
+        np.testing.assert_array_equal(first[name]["completion_cdf"], again[name]["completion_cdf"])
+        np.testing.assert_array_equal(first[name]["floor_success"], again[name]["floor_success"])
@@ -0,0 +1,69 @@
+"""
+Tests for pacing.py
+"""
+import json
+
+import pytest
+
+from pacing import PacingClock
+from tower_of_chance import TowerOfChance
+
+
+def clock(mode, speedup=4.0, keys=()):
+    """Clock whose waits are recorded instead of slept; `keys` answers each wait for a key"""
+    delays = []
+    keys = list(keys)
+    waits = []
+
+    def wait_for_key(timeout):
+        waits.append(timeout)
+        return keys.pop(0) if keys else False
+
+    return PacingClock(mode, speedup, wait_for_key, delays.append), delays, waits
+
+
+def test_realtime_waits_as_asked():
+    pacing, delays, _ = clock("realtime")
+    pacing.sleep(1.5)
+    pacing.sleep(0.2)
+    assert delays == [1.5, 0.2]
+
+
+@pytest.mark.parametrize("speedup", [2.0, 4.0, 10.0])
+def test_accelerated_divides_waits_by_the_speedup(speedup):
+    pacing, delays, _ = clock("accelerated", speedup)
+    pacing.sleep(2.0)
+    assert delays == [pytest.approx(2.0 / speedup)]
+
+
+def test_instant_never_waits():
+    pacing, delays, waits = clock("instant", keys=[True])
+    pacing.sleep(3.0)
+    assert delays == [] and waits == []
+    assert pacing.chunk_size(0.05, 40) == 40
+
+
+def test_skip_waits_for_a_key_and_skips_until_the_next_prompt():
+    pacing, delays, waits = clock("skip", keys=[False, True])
+    pacing.sleep(1.0)
+    # Enter during this wait skips the rest of them
+    pacing.sleep(0.5)
+    pacing.sleep(2.0)
+    assert waits == [1.0, 0.5]
+    assert delays == []
+
+    pacing.resume()
+    pacing.sleep(0.7)
+    assert waits == [1.0, 0.5, 0.7]
+
+
+def test_game_clock_follows_the_pacing_settings(game_dir):
+    config = json.loads((game_dir / "tower_config.json").read_text())
+    config["game_settings"].update(pacing="accelerated", pacing_speedup=2.5)
+    (game_dir / "tower_config.json").write_text(json.dumps(config))
+    game = TowerOfChance(seed=1)
+    delays = []
+    game.clock.delay = delays.append
+    game.pause(5)
+    assert game.clock.mode == "accelerated"
+    assert delays == [pytest.approx(2.0)]
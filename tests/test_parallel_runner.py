@@ -0,0 +1,41 @@
+"""
+Tests for parallel_runner.py
+"""
+import pytest
+
+from parallel_runner import run_parallel, run_vector_batch
+
+TOTALS = ("climbs", "completed", "attempts", "completed_attempts", "stats", "floor_passes", "floor_fails")
+
+
+def totals(result):
+    return {key: result[key] for key in TOTALS}
+
+
+def test_same_totals_with_any_number_of_workers(game_dir):
+    one = run_parallel(6, seed=3, workers=1, batch_size=2)
+    two = run_parallel(6, seed=3, workers=2, batch_size=2)
+    assert one["climbs"] == 6
+    assert totals(one) == totals(two)
+
+
+def test_default_batch_size_does_not_depend_on_workers(game_dir):
+    one = run_parallel(30, seed=3, workers=1, max_attempts=1)
+    four = run_parallel(30, seed=3, workers=4, max_attempts=1)
+    assert one["batches"] == four["batches"]
+    assert totals(one) == totals(four)
+
+
+@pytest.mark.parametrize("climbs", [1, 4, 5, 7, 23])
+def test_vector_batch_runs_exactly_the_requested_climbs(game_dir, climbs):
+    pytest.importorskip("numpy")
+    summary = run_vector_batch(seed=1, climbs=climbs, max_attempts=50)
+    assert summary["climbs"] == climbs
+
+
+def test_vector_totals_with_any_number_of_workers(game_dir):
+    pytest.importorskip("numpy")
+    one = run_parallel(23, seed=5, workers=1, batch_size=10, engine="vector", max_attempts=300)
+    two = run_parallel(23, seed=5, workers=2, batch_size=10, engine="vector", max_attempts=300)
+    assert one["climbs"] == 23
+    assert totals(one) == totals(two)
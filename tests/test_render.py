@@ -0,0 +1,53 @@
+"""
+Tests for render.py
+"""
+from render import CLEAR_SCREEN, Renderer
+
+
+def test_frame_is_written_in_one_call():
+    writes = []
+    renderer = Renderer(writes.append, diff=False)
+    with renderer.frame():
+        renderer.line("Floor 3")
+        with renderer.frame():
+            renderer.line("Weather: Sunny")
+        renderer.line("Time: Day")
+        # Nothing goes out until the outermost frame ends
+        assert writes == []
+    assert writes == ["Floor 3\nWeather: Sunny\nTime: Day\n"]
+
+
+def test_lines_outside_a_frame_go_out_straight_away():
+    writes = []
+    renderer = Renderer(writes.append, diff=False)
+    renderer.line("one")
+    renderer.line("two")
+    assert writes == ["one\n", "two\n"]
+
+
+def draw(renderer, lines):
+    renderer.clear()
+    with renderer.frame():
+        for line in lines:
+            renderer.line(line)
+
+
+def test_next_screen_rewrites_only_the_changed_row():
+    writes = []
+    renderer = Renderer(writes.append, diff=True, size=(80, 24))
+    draw(renderer, ["Tower", "Floor 3", "Sunny"])
+    # Nothing is known about the terminal before the first clear
+    assert writes == [CLEAR_SCREEN + "Tower\nFloor 3\nSunny\n"]
+
+    draw(renderer, ["Tower", "Floor 4", "Sunny"])
+    # Row 2 is rewritten and cleared to its end, then the cursor goes below the screen
+    assert writes[1] == "\x1b[2;1HFloor 4\x1b[K\x1b[4;1H\x1b[J"
+
+
+def test_screen_taller_than_the_terminal_is_redrawn_in_full():
+    writes = []
+    renderer = Renderer(writes.append, diff=True, size=(80, 5))
+    draw(renderer, ["Tower", "Floor 3"])
+    tall = [f"Row {i}" for i in range(10)]
+    draw(renderer, tall)
+    assert writes[1] == CLEAR_SCREEN + "\n".join(tall) + "\n"
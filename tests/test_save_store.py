@@ -0,0 +1,91 @@
+"""
+Tests for save_store.py
+"""
+import pytest
+
+from save_store import FileSaveStore, SQLiteSaveStore, SaveWriter, pack_save, unpack_save
+
+SAVE_TEXT = '{"format":2,"player":{"name":"Ann","max_level":5}}'
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        yield FileSaveStore(str(tmp_path / "saves"))
+    else:
+        store = SQLiteSaveStore(str(tmp_path / "saves.db"))
+        yield store
+        store.close()
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "lzma"])
+def test_round_trip(store, compression):
+    summary = {"class": "Wise Sage", "level": 4, "max_level": 5}
+    store.write_many({"Ann": (pack_save(SAVE_TEXT, compression), summary)})
+    assert unpack_save(store.read("Ann")) == SAVE_TEXT
+
+
+def test_later_save_replaces_earlier(store):
+    store.write_many({"Ann": (pack_save("old"), {})})
+    store.write_many({"Ann": (pack_save(SAVE_TEXT), {}), "Bob": (pack_save("bob"), {})})
+    assert unpack_save(store.read("Ann")) == SAVE_TEXT
+    assert unpack_save(store.read("Bob")) == "bob"
+
+
+def test_missing_save(store):
+    with pytest.raises(FileNotFoundError):
+        store.read("Nobody")
+
+
+class FlakyStore:
+    """Store that fails to write the players in `broken`"""
+
+    location = "flaky"
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.saved = {}
+
+    def write_many(self, saves):
+        for name in saves:
+            if name in self.broken:
+                raise OSError(f"cannot write {name}")
+        self.saved.update((name, data) for name, (data, summary) in saves.items())
+
+
+def test_writer_keeps_failed_saves_for_their_player():
+    store = FlakyStore(broken={"Bad"})
+    writer = SaveWriter(store, flush_interval=0.01)
+    try:
+        writer.submit("Good", b"good")
+        writer.submit("Bad", b"bad")
+        # One player's failure neither loses nor fails the other's save
+        writer.flush("Good")
+        assert store.saved == {"Good": b"good"}
+        with pytest.raises(OSError):
+            writer.flush("Bad")
+
+        # The failed save is kept and retried
+        store.broken.clear()
+        writer.flush("Bad")
+        assert store.saved == {"Good": b"good", "Bad": b"bad"}
+        assert writer.errors == {}
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize("name", ["../escape", "/tmp/escape", "a/b", "..", "a b", "", "x" * 33, None])
+def test_rejects_names_that_are_not_safe_file_names(store, name):
+    with pytest.raises(ValueError):
+        store.write_many({name: (pack_save(SAVE_TEXT), {})})
+    with pytest.raises(ValueError):
+        store.read(name)
+
+
+def test_file_store_writes_only_inside_its_directory(tmp_path):
+    saves = tmp_path / "saves"
+    store = FileSaveStore(str(saves))
+    with pytest.raises(ValueError):
+        store.write_many({"../escape": (pack_save(SAVE_TEXT), {})})
+    assert [path.name for path in tmp_path.iterdir()] in ([], ["saves"])
+    assert not saves.exists() or not any(saves.iterdir())
@@ -0,0 +1,131 @@
+"""
+Tests for server.py, played over real TCP connections
+"""
+import asyncio
+import json
+import threading
+import time
+
+from save_store import FileSaveStore
+from server import TowerServer
+from tower_of_chance import TowerOfChance
+
+# Title menu, name, class, three skill points and a color theme
+NEW_GAME = ["1", "Ann", "1", "1", "1", "1", "1"]
+
+
+async def play(port, answers, timeout=30):
+    """Send every answer, then read until the server hangs up"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(f"{answer}\r\n" for answer in answers).encode())
+    await writer.drain()
+    try:
+        return (await asyncio.wait_for(reader.read(), timeout)).decode()
+    finally:
+        writer.close()
+
+
+def run_server(*games):
+    """Play each game's answers in turn on one server; returns the transcripts and open sessions"""
+    async def main():
+        server = TowerServer(port=0, seed=1)
+        await server.start()
+        try:
+            transcripts = [await play(server.port, answers) for answers in games]
+            return transcripts, len(server.sessions)
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_session_plays_and_quits(game_dir):
+    (transcript,), sessions = run_server(NEW_GAME + ["10"])
+    assert "Character created! Welcome, Ann" in transcript
+    assert "Thanks for playing" in transcript
+    assert "\r\n" in transcript
+    assert sessions == 0
+
+
+def test_session_survives_a_failed_save(game_dir, monkeypatch):
+    def fail(store, saves):
+        raise FileNotFoundError("saves directory is gone")
+
+    monkeypatch.setattr(FileSaveStore, "write_many", fail)
+    (transcript,), sessions = run_server(NEW_GAME + ["9", "", "10"])
+    assert "could not be saved" in transcript
+    assert "Thanks for playing" in transcript
+    assert sessions == 0
+
+
+def test_failing_game_ends_only_its_own_session(game_dir, monkeypatch):
+    def broken(game):
+        raise RuntimeError("broken inventory")
+
+    monkeypatch.setattr(TowerOfChance, "show_inventory", broken)
+    (failed, fine), sessions = run_server(NEW_GAME + ["2"], NEW_GAME + ["10"])
+    assert "this session has ended" in failed
+    assert "Thanks for playing" in fine
+    assert sessions == 0
+
+
+def test_editors_are_not_offered(game_dir):
+    (transcript,), _ = run_server(NEW_GAME + ["7", "8", "10"])
+    assert "Game settings" not in transcript
+    assert "Challenge editor" not in transcript
+    assert transcript.count("Invalid choice") == 2
+
+
+def test_reaction_time_counts_from_when_the_prompt_went_out(game_dir, monkeypatch):
+    config = json.loads((game_dir / "tower_config.json").read_text())
+    # The countdown pauses last well over a second, longer than any reaction threshold
+    config["game_settings"]["pacing"] = "accelerated"
+    config["game_settings"]["pacing_speedup"] = 1.5
+    (game_dir / "tower_config.json").write_text(json.dumps(config))
+
+    def reflexes(game):
+        won = yield from game.run_skill_challenge({"name": "Quick Reflexes", "description": ""})
+        game.print_plain(f"Reflexes won: {won}")
+
+    monkeypatch.setattr(TowerOfChance, "show_progress_visualization", reflexes)
+    (transcript,), _ = run_server(NEW_GAME + ["5", "", "10"])
+    assert "Reflexes won: True" in transcript
+
+
+def test_a_slow_save_does_not_hold_up_other_sessions(game_dir, monkeypatch):
+    writing = threading.Event()
+    release = threading.Event()
+    write_many = FileSaveStore.write_many
+    write_started = []
+
+    def slow(store, saves):
+        write_started.append(time.monotonic())
+        writing.set()
+        release.wait(3)
+        write_many(store, saves)
+
+    monkeypatch.setattr(FileSaveStore, "write_many", slow)
+
+    async def main():
+        server = TowerServer(port=0, seed=1)
+        await server.start()
+        try:
+            # Ann saves, and the write hangs
+            saving = asyncio.ensure_future(play(server.port, NEW_GAME + ["9", "", "10"]))
+            assert await asyncio.to_thread(writing.wait, 5)
+
+            # Bob still gets to the main menu in the meantime
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write("".join(f"{answer}\r\n" for answer in ["1", "Bob", "1", "1", "1", "1", "1"]).encode())
+            await asyncio.wait_for(reader.readuntil(b"What would you like to do?"), 10)
+            waited = time.monotonic() - write_started[0]
+            writer.close()
+
+            release.set()
+            return waited, await saving
+        finally:
+            server.close()
+
+    waited, transcript = asyncio.run(main())
+    assert waited < 2
+    assert "Game saved successfully!" in transcript
@@ -0,0 +1,68 @@
+"""
+Tests for sound.py
+"""
+import time
+
+from pacing import PacingClock
+from ports import CallbackOutput
+from sound import SOUNDS, SoundQueue
+from tower_of_chance import TowerOfChance
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_queued_bells_are_written():
+    bells = []
+    sound = SoundQueue(True, PacingClock("instant"), write=bells.append)
+    sound.play("boss")
+    sound.play("failure")
+    sound.play("no such sound")
+    expected = len(SOUNDS["boss"]) + len(SOUNDS["failure"])
+    wait_for(lambda: len(bells) == expected)
+    sound.close()
+    assert bells == ["\a"] * expected
+
+
+def test_close_joins_the_worker():
+    bells = []
+    sound = SoundQueue(True, PacingClock("realtime"), write=bells.append)
+    sound.play("boss")
+    thread = sound._thread
+    wait_for(lambda: bells)
+    sound.close()
+    assert not thread.is_alive()
+    # Nothing plays once closed
+    sound.play("success")
+    assert sound._thread is thread
+
+
+def test_disabled_sound_starts_no_worker():
+    sound = SoundQueue(False, write=lambda text: None)
+    sound.play("success")
+    sound.close()
+    assert sound._thread is None
+
+
+def test_bells_never_overlap_the_game_writing_to_its_port(game_dir):
+    active = []
+    overlaps = []
+
+    def write(text):
+        active.append(text)
+        if len(active) > 1:
+            overlaps.append(list(active))
+        time.sleep(0.001)
+        active.pop()
+
+    game = TowerOfChance(seed=1, output_port=CallbackOutput(write))
+    game.sound.enabled = True
+    for i in range(100):
+        game.play_sound(["success", "failure", "boss"][i % 3])
+        game.print_plain(f"line {i}")
+    game.sound.close()
+    assert overlaps == []
@@ -0,0 +1,300 @@
+"""
+Tests for the game itself (tower_of_chance.py)
+"""
+import copy
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from ports import CallbackOutput
+from save_store import FileSaveStore, unpack_save
+from tower_of_chance import ACHIEVEMENTS, SAVE_FORMAT, AchievementEngine, AliasSampler, ChallengeCatalog, EnvironmentSchedule, FloorSet, TowerOfChance, challenge_type_samplers
+
+
+def set_config(game_dir, section, **settings):
+    config = json.loads((game_dir / "tower_config.json").read_text())
+    config[section].update(settings)
+    (game_dir / "tower_config.json").write_text(json.dumps(config))
+
+
+def quiet_game(seed=1):
+    return TowerOfChance(seed=seed, output_port=CallbackOutput(lambda text: None))
+
+
+def finish(flow):
+    """Run a flow that asks for no input and return its result"""
+    try:
+        next(flow)
+    except StopIteration as done:
+        return done.value
+    raise AssertionError("the flow asked for input")
+
+
+def test_second_tower_in_a_session_starts_fresh(game_dir):
+    set_config(game_dir, "game_settings", tower_height=2)
+    game = quiet_game()
+    names = iter(["Ann", "Bob"])
+    titles = 0
+    second = None
+
+    prompt = game.start("title")
+    while prompt is not None:
+        descriptor = prompt[1]
+        if descriptor["id"] == "title_menu":
+            titles += 1
+            answer = "1" if titles <= 2 else "3"
+        elif descriptor["id"] == "character_name":
+            answer = next(names)
+        elif descriptor["id"] == "main_menu":
+            if game.player["name"] == "Bob" and second is None:
+                second = {"level": game.player["level"], "max_level": game.player["max_level"],
+                          "items": list(game.player["items"]),
+                          "achievements": list(game.player["achievements"]),
+                          "challenges_completed": game.stats["challenges_completed"]}
+            answer = "1"
+        else:
+            answer = (descriptor["choices"] or [""])[0]
+        prompt = game.step(answer)
+
+    # Ann reached the top, then Bob started a new tower from the first floor
+    assert titles == 3
+    assert second == {"level": 1, "max_level": 1, "items": [], "achievements": [], "challenges_completed": 0}
+
+
+# A player as the game saved it before the compact format: achievement
+# dicts, one entry per item and plain lists of floors
+OLD_PLAYER = {
+    "name": "Ann",
+    "class": "Wise Sage",
+    "level": 23,
+    "max_level": 27,
+    "items": ["Lucky Coin", "Lucky Coin", "Magic Scroll", "Lucky Coin"],
+    "companions": [],
+    "buffs": [{"name": "Victory Surge", "affects": "luck", "modifier": 1, "duration": 2}],
+    "debuffs": [],
+    "achievements": [ACHIEVEMENTS["level"][0], ACHIEVEMENTS["skill"][3]],
+    "hidden_floors_found": [5, 15],
+    "bosses_defeated": [10, 20],
+    "color_theme": "retro",
+    "skills": {"luck": 4, "strength": 2, "agility": 3, "wisdom": 10}
+}
+OLD_STATS = {
+    "challenges_completed": 30, "challenges_failed": 7, "luck_challenges": 12, "skill_challenges": 10,
+    "mixed_challenges": 15, "legendary_challenges": 0, "rewards_found": 4, "companions_met": 0,
+    "bosses_faced": 2, "hidden_floors": 2, "mini_games_played": 5, "mini_games_won": 2
+}
+
+
+def write_old_save(game_dir, save):
+    (game_dir / "saves").mkdir(exist_ok=True)
+    (game_dir / "saves" / "Ann_save.json").write_text(json.dumps(save))
+
+
+@pytest.mark.parametrize("shape", ["bare player", "player and stats", "player only"])
+def test_old_saves_load_and_resave_in_the_current_format(game_dir, shape):
+    if shape == "bare player":
+        save = copy.deepcopy(OLD_PLAYER)
+    elif shape == "player and stats":
+        save = {"player": copy.deepcopy(OLD_PLAYER), "stats": dict(OLD_STATS)}
+    else:
+        save = {"player": copy.deepcopy(OLD_PLAYER)}
+    write_old_save(game_dir, save)
+
+    game = quiet_game()
+    fresh_stats = dict(game.stats)
+    assert finish(game.load_game("Ann"))
+    expected = dict(OLD_PLAYER, hidden_floors_found=FloorSet([5, 15]), bosses_defeated=FloorSet([10, 20]))
+    assert game.player == expected
+    assert game.stats == (OLD_STATS if shape == "player and stats" else fresh_stats)
+
+    # Saving again writes the compact format, and it loads back the same
+    finish(game.save_game(silent=True))
+    game.save_writer.flush()
+    saved = json.loads(unpack_save(FileSaveStore(str(game_dir / "saves")).read("Ann")))
+    assert saved["format"] == SAVE_FORMAT
+    assert saved["player"]["achievements"] == ["novice", "wise"]
+    assert saved["player"]["items"] == [["Lucky Coin", 2], ["Magic Scroll", 1], ["Lucky Coin", 1]]
+
+    again = quiet_game()
+    assert finish(again.load_game("Ann"))
+    assert again.player == expected
+    assert again.stats == game.stats
+
+
+def test_floor_set_round_trips_through_its_bitmap():
+    floors = FloorSet([0, 3])
+    # Past the end of the bitmap so far, which grows to fit
+    floors.add(1000)
+    floors.append(3)
+    assert list(floors) == [0, 3, 1000] and len(floors) == 3
+    assert 0 in floors and 1000 in floors
+    assert 999 not in floors and 5000 not in floors and -1 not in floors
+
+    loaded = FloorSet.from_bitmap(floors.to_bitmap())
+    assert loaded == floors
+    assert list(loaded) == [0, 3, 1000] and len(loaded) == 3
+
+
+def test_floor_sets_survive_a_save_and_load(game_dir):
+    game = quiet_game()
+    game.player["name"] = "Ann"
+    game.player["hidden_floors_found"] = FloorSet([0, 5, 300])
+    game.player["bosses_defeated"].add(10)
+    finish(game.save_game(silent=True))
+
+    again = quiet_game()
+    assert finish(again.load_game("Ann"))
+    assert list(again.player["hidden_floors_found"]) == [0, 5, 300]
+    assert list(again.player["bosses_defeated"]) == [10]
+    assert 300 in again.player["hidden_floors_found"]
+
+
+def test_alias_sampler_draws_in_proportion_to_the_weights():
+    weights = [5, 1, 0, 2.5, 1.5]
+    sampler = AliasSampler("abcde", weights)
+    rng = random.Random(3)
+    draws = 100000
+    counts = Counter(sampler.draw(rng) for _ in range(draws))
+    for item, weight in zip("abcde", weights):
+        assert counts[item] / draws == pytest.approx(weight / sum(weights), abs=0.01), item
+    assert counts["c"] == 0
+
+
+def test_challenge_types_follow_the_configured_weights():
+    settings = {"luck_challenge_weight": 3.0, "skill_challenge_weight": 1.0,
+                "mixed_challenge_weight": 0.0, "legendary_challenge_weight": 4.0}
+    below, above = challenge_type_samplers(["luck", "skill", "mixed", "legendary"], settings)
+    rng = random.Random(5)
+    draws = 40000
+
+    counts = Counter(below.draw(rng) for _ in range(draws))
+    # No legendary challenges below the legendary floor
+    assert set(counts) == {"luck", "skill"}
+    assert counts["luck"] / draws == pytest.approx(0.75, abs=0.01)
+
+    counts = Counter(above.draw(rng) for _ in range(draws))
+    assert counts["legendary"] / draws == pytest.approx(0.5, abs=0.01)
+    assert counts["luck"] / draws == pytest.approx(0.375, abs=0.01)
+    assert counts["mixed"] == 0
+
+
+def ids(achievements):
+    return [achievement["id"] for achievement in achievements]
+
+
+def test_achievement_fires_once_when_its_threshold_is_crossed():
+    engine = AchievementEngine()
+    assert engine.check("level", 9) == []
+    assert ids(engine.check("level", 10)) == ["novice"]
+    assert engine.check("level", 10) == []
+    assert engine.check("level", 12) == []
+    # Dropping back and climbing past it again earns nothing new
+    assert engine.check("level", 8) == []
+    assert engine.check("level", 11) == []
+
+
+def test_jumping_over_thresholds_awards_all_of_them():
+    engine = AchievementEngine()
+    assert ids(engine.check("level", 60)) == ["novice", "apprentice", "adept"]
+    assert ids(engine.check("skill", 10, "wisdom")) == ["wise"]
+    assert engine.check("skill", 12, "luck") == [ACHIEVEMENTS["skill"][0]]
+
+
+def test_loaded_player_keeps_earned_achievements(game_dir):
+    write_old_save(game_dir, {"player": copy.deepcopy(OLD_PLAYER), "stats": dict(OLD_STATS)})
+    game = quiet_game()
+    # Whatever this game tracked before is replaced by the loaded player's achievements
+    game.player["level"] = 30
+    game.check_for_achievement("level")
+    assert ids(game.player["achievements"]) == ["novice", "apprentice"]
+    assert finish(game.load_game("Ann"))
+
+    # Novice was earned before the save; crossing floor 25 adds only apprentice
+    game.player["level"] = 26
+    game.check_for_achievement("level")
+    game.check_for_achievement("skill", ("wisdom", 11))
+    assert ids(game.player["achievements"]) == ["novice", "wise", "apprentice"]
+
+
+# Listed out of difficulty order on purpose
+CATALOG = {
+    "luck": [{"name": "Hard", "difficulty": 5}, {"name": "Easy", "difficulty": 1},
+             {"name": "Medium", "difficulty": 3}, {"name": "Also easy", "difficulty": 1}],
+    "skill": [{"name": "Expert", "difficulty": 4}, {"name": "Master", "difficulty": 6}]
+}
+
+
+def linear_scan(challenges, max_difficulty):
+    """How the game picked suitable challenges before the catalog"""
+    return [c for c in challenges if c["difficulty"] <= max_difficulty] or challenges
+
+
+@pytest.mark.parametrize("challenge_type", ["luck", "skill"])
+@pytest.mark.parametrize("max_difficulty", [0, 1, 2, 3, 5, 10])
+def test_catalog_picks_inside_the_difficulty_window(challenge_type, max_difficulty):
+    catalog = ChallengeCatalog(CATALOG)
+    expected = sorted(c["name"] for c in linear_scan(CATALOG[challenge_type], max_difficulty))
+    assert sorted(c["name"] for c in catalog.suitable(challenge_type, max_difficulty)) == expected
+
+    rng = random.Random(max_difficulty)
+    picked = {catalog.pick(challenge_type, max_difficulty, rng)["name"] for _ in range(200)}
+    # Every suitable challenge comes up, and nothing else does
+    assert sorted(picked) == expected
+
+
+def schedule_rows(schedule, floors):
+    return [(schedule.weather(floor)["name"], schedule.time_of_day(floor),
+             schedule.modifier(floor, "luck"), schedule.modifier(floor, "skill")) for floor in floors]
+
+
+def test_lazy_environment_schedule_matches_an_eager_one():
+    floors = range(0, 2000, 7)
+    eager = EnvironmentSchedule(42, 3, 5, floors=2000)
+    lazy = EnvironmentSchedule(42, 3, 5)
+
+    # Asking for a far floor first builds everything before it in order
+    far = lazy.weather(1999)["name"]
+    assert far == eager.weather(1999)["name"]
+    assert schedule_rows(lazy, floors) == schedule_rows(eager, floors)
+
+    # Growing a floor at a time gives the same schedule too
+    stepwise = EnvironmentSchedule(42, 3, 5)
+    assert schedule_rows(stepwise, range(2000)) == schedule_rows(eager, range(2000))
+    assert schedule_rows(EnvironmentSchedule(43, 3, 5), floors) != schedule_rows(eager, floors)
+
+
+class CountingWriter:
+    """Stands in for the SaveWriter and counts the saves handed to it"""
+
+    def __init__(self):
+        self.saves = []
+
+    def submit(self, name, data, summary=None):
+        self.saves.append(name)
+
+    def flush(self, name=None):
+        pass
+
+
+def test_auto_save_writes_only_after_a_change(game_dir):
+    game = quiet_game()
+    game.player["name"] = "Ann"
+    game.save_writer = writer = CountingWriter()
+    answers = iter(["2", "", "4", "", "2", ""])
+
+    # Looking at the inventory and achievements changes nothing
+    prompt = game.start("main_menu")
+    for answer in answers:
+        prompt = game.step(answer)
+    assert prompt[1]["id"] == "main_menu"
+    assert writer.saves == []
+
+    # A climb does, and is saved once however many menus follow
+    prompt = game.step("1")
+    while prompt[1]["id"] != "main_menu":
+        prompt = game.step((prompt[1]["choices"] or [""])[0])
+    for answer in ["2", "", "4", ""]:
+        prompt = game.step(answer)
+    assert writer.saves == ["Ann"]
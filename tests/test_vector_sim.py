@@ -0,0 +1,39 @@
+"""
+Tests for vector_sim.py against the game it simulates
+"""
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+
+pytest.importorskip("numpy")
+
+from parallel_runner import run_parallel  # noqa: E402
+from vector_sim import ClimbSimulator  # noqa: E402
+
+# Per-climb means that don't depend on the simulator's policy for player choices
+# (mini-games are won at the policy's rate)
+COMPARED = ("challenges_completed", "rewards_found", "bosses_faced", "companions_met", "hidden_floors")
+
+
+def per_climb(result):
+    means = {stat: result["stats"][stat] / result["climbs"] for stat in COMPARED}
+    means["attempts"] = result["attempts"] / result["climbs"]
+    return means
+
+
+def test_vector_stats_match_the_game(game_dir):
+    # Compare on the challenges the game ships with
+    shutil.copy(os.path.join(ROOT, "challenges.json"), game_dir)
+    game = per_climb(run_parallel(80, seed=3, workers=1, engine="headless", character_class=0))
+    vector = per_climb(run_parallel(4000, seed=3, workers=1, engine="vector", character_class=0))
+    for stat, expected in game.items():
+        assert vector[stat] == pytest.approx(expected, rel=0.2, abs=0.5), stat
+
+
+def test_climbers_per_class_can_differ_per_class(game_dir):
+    simulator = ClimbSimulator(seed=1)
+    results = simulator.run(climbers_per_class=[3, 0, 2, 1, 1], max_attempts=20)
+    assert [summary["climbers"] for summary in results.values()] == [3, 0, 2, 1, 1]
@@ -2,13 +2,29 @@
 """
 Tower of Chance - A colorful, modular game of luck and skill
 """
+import argparse
 import random
 import time
 import os
 import json
 import sys
+import tempfile
+import threading
+import base64
+import warnings
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
 from colorama import init, Fore, Back, Style
 
+from save_store import (SAVE_BACKENDS, SAVE_COMPRESSIONS, SaveWriter, open_save_store,
+                        pack_save, unpack_save, valid_save_name)
+from render import ANSI_ESCAPE, Renderer
+from pacing import PACING_MODES, PacingClock
+from sound import SoundQueue
+from ports import ConsoleInput, ConsoleOutput, JsonLinesPort, serialized
+
 # Initialize colorama
 init(autoreset=True)
 
@@ -138,35 +154,715 @@ ASCII_ART = {
     """
 }
 
+# Character classes offered during character creation
+CHARACTER_CLASSES = [
+    {"name": "Lucky Gambler", "description": "Born under a lucky star, you have a natural affinity for games of chance.", 
+     "skills": {"luck": 3, "strength": 1, "agility": 1, "wisdom": 1}},
+    {"name": "Mighty Warrior", "description": "Trained in the art of combat, your physical prowess is unmatched.", 
+     "skills": {"luck": 1, "strength": 3, "agility": 1, "wisdom": 1}},
+    {"name": "Swift Acrobat", "description": "Your nimble movements and quick reflexes keep you one step ahead.", 
+     "skills": {"luck": 1, "strength": 1, "agility": 3, "wisdom": 1}},
+    {"name": "Wise Sage", "description": "Years of study have granted you knowledge beyond your years.", 
+     "skills": {"luck": 1, "strength": 1, "agility": 1, "wisdom": 3}},
+    {"name": "Balanced Adventurer", "description": "A jack of all trades, you prefer a balanced approach to challenges.", 
+     "skills": {"luck": 2, "strength": 2, "agility": 1, "wisdom": 1}}
+]
+
+# Weather conditions the tower cycles through, and the challenge type each one affects
+WEATHERS = [
+    {"name": "Clear", "effect": "No special effects", "modifier": 0, "affects": None},
+    {"name": "Foggy", "effect": "Reduced visibility affects Wisdom challenges", "modifier": -1, "affects": "skill"},
+    {"name": "Stormy", "effect": "Lightning affects Luck challenges", "modifier": -1, "affects": "luck"},
+    {"name": "Windy", "effect": "Strong winds affect Agility challenges", "modifier": -1, "affects": "mixed"},
+    {"name": "Sunny", "effect": "Bright sun boosts all challenges", "modifier": 1, "affects": "all"},
+    {"name": "Moonlit", "effect": "Mystical moonlight boosts Luck challenges", "modifier": 1, "affects": "luck"}
+]
+
+# Time of day gives +1 to one challenge type
+TIMES_OF_DAY = ["day", "night"]
+TIME_OF_DAY_BONUS = {"day": "skill", "night": "luck"}
+
+# Companions that may offer to join the climb
+COMPANIONS = [
+    {"name": "Whiskers the Lucky Cat", "ability": "Improves luck challenges", "type": "luck", "modifier": 1},
+    {"name": "Brutus the Warrior", "ability": "Improves strength-based challenges", "type": "skill", "modifier": 1},
+    {"name": "Zephyr the Wind Spirit", "ability": "Improves agility challenges", "type": "skill", "modifier": 1},
+    {"name": "Athena the Owl", "ability": "Improves wisdom challenges", "type": "skill", "modifier": 1},
+    {"name": "Echo the Fairy", "ability": "Improves all challenges slightly", "type": "all", "modifier": 1},
+    {"name": "Shadow the Rogue", "ability": "Improves mixed challenges", "type": "mixed", "modifier": 1},
+    {"name": "Luna the Mystic", "ability": "Improves night-time challenges", "type": "all", "modifier": 1}
+]
+
+# Reward tiers, unlocked as the player climbs higher
+BASIC_REWARDS = [
+    "Lucky Coin (+1 Luck)",
+    "Strength Potion (+1 Strength)",
+    "Agility Boots (+1 Agility)",
+    "Wisdom Scroll (+1 Wisdom)",
+    "Health Potion (Restore health)",
+    "Magic Map (Reveal next challenge)"
+]
+
+ADVANCED_REWARDS = [
+    "Fortune's Charm (+2 Luck)",
+    "Giant's Elixir (+2 Strength)",
+    "Wind Walker Boots (+2 Agility)",
+    "Ancient Tome (+2 Wisdom)",
+    "Phoenix Feather (Automatic revival)",
+    "Oracle's Eye (Skip a challenge)"
+]
+
+LEGENDARY_REWARDS = [
+    "Destiny's Die (+3 to all stats)",
+    "Titan's Heart (Double strength for 3 floors)",
+    "Cosmic Insight (Automatic success on wisdom challenges)",
+    "Fate's Favor (Reroll any failed challenge once)"
+]
+
+# Achievements and the thresholds that unlock them
+ACHIEVEMENTS = {
+    "level": [
+        {"id": "novice", "name": "Novice Climber", "description": "Reach floor 10", "threshold": 10},
+        {"id": "apprentice", "name": "Apprentice Climber", "description": "Reach floor 25", "threshold": 25},
+        {"id": "adept", "name": "Adept Climber", "description": "Reach floor 50", "threshold": 50},
+        {"id": "master", "name": "Master Climber", "description": "Reach floor 75", "threshold": 75},
+        {"id": "grandmaster", "name": "Grandmaster Climber", "description": "Reach floor 100", "threshold": 100}
+    ],
+    "skill": [
+        {"id": "lucky", "name": "Child of Fortune", "description": "Reach 10 Luck", "skill": "luck", "threshold": 10},
+        {"id": "strong", "name": "Herculean Strength", "description": "Reach 10 Strength", "skill": "strength", "threshold": 10},
+        {"id": "agile", "name": "Lightning Reflexes", "description": "Reach 10 Agility", "skill": "agility", "threshold": 10},
+        {"id": "wise", "name": "Sage's Wisdom", "description": "Reach 10 Wisdom", "skill": "wisdom", "threshold": 10}
+    ],
+    "companions": [
+        {"id": "friend", "name": "Friendly Face", "description": "Recruit your first companion", "threshold": 1},
+        {"id": "party", "name": "Party Leader", "description": "Recruit 3 companions", "threshold": 3}
+    ],
+    "boss": [
+        {"id": "boss_slayer", "name": "Boss Slayer", "description": "Defeat your first boss", "threshold": 1},
+        {"id": "boss_master", "name": "Boss Master", "description": "Defeat 5 bosses", "threshold": 5}
+    ],
+    "hidden": [
+        {"id": "explorer", "name": "Explorer", "description": "Discover your first hidden floor", "threshold": 1},
+        {"id": "treasure_hunter", "name": "Treasure Hunter", "description": "Discover 3 hidden floors", "threshold": 3}
+    ]
+}
+
+
+def get_reward_pool(level):
+    """Rewards that can drop at the given floor"""
+    if level >= 40:
+        return LEGENDARY_REWARDS + ADVANCED_REWARDS
+    elif level >= 20:
+        return ADVANCED_REWARDS + BASIC_REWARDS
+    return BASIC_REWARDS
+
+
+def get_reward_bonus(reward):
+    """Skill increases granted by a reward, e.g. {"luck": 2}"""
+    if "+3" in reward:
+        amount = 3
+    elif "+2" in reward:
+        amount = 2
+    else:
+        amount = 1
+        
+    if "Luck" in reward:
+        return {"luck": amount}
+    elif "Strength" in reward:
+        return {"strength": amount}
+    elif "Agility" in reward:
+        return {"agility": amount}
+    elif "Wisdom" in reward:
+        return {"wisdom": amount}
+    elif "all stats" in reward:
+        return {"luck": 3, "strength": 3, "agility": 3, "wisdom": 3}
+    return {}
+
+# Legendary challenges are only offered from this floor up
+LEGENDARY_FLOOR = 20
+
+# Rows in the tower map, whatever the tower's height
+TOWER_MAP_ROWS = 20
+
+
+@lru_cache(maxsize=32)
+def render_tower(level, max_level, tower_height, theme, boss_frequency, legendary_floor_frequency,
+                 checkpoint_frequency):
+    """Lines of the tower map, memoized as they only change with the inputs.
+
+    `theme` is the color theme as a tuple of (role, color) pairs.
+    """
+    colors = dict(theme)
+    level_spacing = tower_height / TOWER_MAP_ROWS
+    lines = [f"{colors['title']}\n=== THE TOWER OF CHANCE ==={Style.RESET_ALL}"]
+
+    for i in range(TOWER_MAP_ROWS, 0, -1):
+        floor = int(i * level_spacing)
+
+        # Determine what to display at this level
+        if floor == level:
+            marker = f"{colors['success']}▶ YOU ARE HERE ◀{Style.RESET_ALL}"
+        elif floor == tower_height:
+            marker = f"{colors['legendary']}★ FINAL CHALLENGE ★{Style.RESET_ALL}"
+        elif floor % legendary_floor_frequency == 0:
+            marker = f"{colors['legendary']}★ LEGENDARY FLOOR ★{Style.RESET_ALL}"
+        elif floor % boss_frequency == 0:
+            marker = f"{colors['warning']}★ BOSS FLOOR ★{Style.RESET_ALL}"
+        elif floor % checkpoint_frequency == 0:
+            marker = f"{colors['highlight']}◆ CHECKPOINT ◆{Style.RESET_ALL}"
+        else:
+            marker = ""
+
+        # Create the tower level visualization
+        if floor == level:
+            level_str = f"{Back.GREEN}{Fore.BLACK} {floor:3d} {Style.RESET_ALL}"
+        elif floor <= max_level:
+            level_str = f"{colors['success']} {floor:3d} {Style.RESET_ALL}"
+        else:
+            level_str = f"{colors['info']} {floor:3d} {Style.RESET_ALL}"
+
+        # Draw the tower structure with appropriate width based on level
+        tower_width = 30 + (floor // 20)  # Tower gets wider at the base
+        tower_line = '║' + '═' * tower_width + '║'
+        lines.append(f"{level_str} {tower_line} {marker}")
+
+    # Draw tower base
+    lines.append(f"{colors['highlight']}╚{'═' * 32}╝{Style.RESET_ALL}")
+    lines.append("")
+    return tuple(lines)
+
+
+def prompt_descriptor(prompt="", prompt_id="continue", choices=None, context=None):
+    """Machine-readable version of a prompt: a stable id, the answers it accepts
+    (None for free text), its plain text and what the player needs to answer it"""
+    return {
+        "id": prompt_id,
+        "prompt": ANSI_ESCAPE.sub("", prompt).strip(),
+        "choices": choices,
+        "context": context or {}
+    }
+
+
+class SaveFlush:
+    """A flow's request to wait until the pending saves are written.
+
+    Games whose output port sets `defer_flushes` hand it out of start() and
+    step() like a prompt, so a caller on an event loop can wait elsewhere;
+    it then steps the game with the save error for `name`, or None.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+
+
+class AliasSampler:
+    """Walker's alias method: O(1) draws from a fixed weighted choice"""
+
+    def __init__(self, items, weights):
+        weights = [float(w) for w in weights]
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError(f"Cannot sample from weights {weights}")
+
+        n = len(weights)
+        self.items = list(items)
+        self.probabilities = [w / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        # Pair each under-full column with an over-full one
+        scaled = [p * n for p in self.probabilities]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.prob[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+
+    def draw(self, rng):
+        column = rng.randrange(len(self.items))
+        if rng.random() < self.prob[column]:
+            return self.items[column]
+        return self.items[self.alias[column]]
+
+
+def challenge_type_samplers(challenge_types, challenge_settings):
+    """Weighted type samplers (before LEGENDARY_FLOOR, from LEGENDARY_FLOOR up) from the *_challenge_weight settings"""
+    def sampler(types):
+        return AliasSampler(types, [challenge_settings.get(f"{t}_challenge_weight", 1.0) for t in types])
+
+    return (sampler([t for t in challenge_types if t != "legendary"]),
+            sampler(list(challenge_types)))
+
+
+class ChallengeCatalog:
+    """Challenges of every type, sorted by difficulty.
+
+    Challenges up to a difficulty form a prefix of each sorted list, so
+    finding the ones suitable for a floor is a bisect instead of a scan.
+    """
+
+    def __init__(self, challenges):
+        self.challenges = challenges
+        self._sorted = {challenge_type: sorted(entries, key=lambda c: c["difficulty"])
+                        for challenge_type, entries in challenges.items()}
+        self._difficulties = {challenge_type: [c["difficulty"] for c in entries]
+                              for challenge_type, entries in self._sorted.items()}
+
+    def suitable_count(self, challenge_type, max_difficulty):
+        """How many challenges of a type have difficulty <= max_difficulty"""
+        return bisect_right(self._difficulties[challenge_type], max_difficulty)
+
+    def suitable(self, challenge_type, max_difficulty):
+        """Challenges of a type up to max_difficulty, or all of them if none qualify"""
+        entries = self._sorted[challenge_type]
+        return entries[:self.suitable_count(challenge_type, max_difficulty)] or entries
+
+    def pick(self, challenge_type, max_difficulty, rng):
+        """Random challenge of a type up to max_difficulty (any of the type if none qualify)"""
+        entries = self._sorted[challenge_type]
+        count = self.suitable_count(challenge_type, max_difficulty) or len(entries)
+        return entries[rng.randrange(count)]
+
+
+# Version of the compact save layout written by serialize_save
+SAVE_FORMAT = 2
+
+
+class FloorSet:
+    """Set of floor numbers stored as a bitmap, one bit per floor.
+
+    Membership is O(1) however tall the tower is. `append` is kept so the
+    set can stand in for the floor lists older code builds up.
+    """
+
+    def __init__(self, floors=()):
+        self._bits = bytearray()
+        self._count = 0
+        for floor in floors:
+            self.add(floor)
+
+    def add(self, floor):
+        index, mask = floor >> 3, 1 << (floor & 7)
+        if index >= len(self._bits):
+            self._bits.extend(bytes(index + 1 - len(self._bits)))
+        if not self._bits[index] & mask:
+            self._bits[index] |= mask
+            self._count += 1
+
+    append = add
+
+    def __contains__(self, floor):
+        index = floor >> 3
+        return 0 <= index < len(self._bits) and bool(self._bits[index] & (1 << (floor & 7)))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index, byte in enumerate(self._bits):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield index * 8 + bit
+
+    def __eq__(self, other):
+        if isinstance(other, FloorSet):
+            return self._bits.rstrip(b"\x00") == other._bits.rstrip(b"\x00")
+        return NotImplemented
+
+    def __repr__(self):
+        return f"FloorSet({list(self)})"
+
+    def to_bitmap(self):
+        """Base64 bitmap (bit n set for floor n), as stored in saves"""
+        return base64.b64encode(bytes(self._bits)).decode("ascii")
+
+    @classmethod
+    def from_bitmap(cls, encoded):
+        floors = cls()
+        floors._bits = bytearray(base64.b64decode(encoded))
+        floors._count = sum(bin(byte).count("1") for byte in floors._bits)
+        return floors
+
+
+def stack_items(items):
+    """Items as [name, count] stacks of consecutive repeats, so unstacking keeps their order"""
+    stacks = []
+    for item in items:
+        if stacks and stacks[-1][0] == item:
+            stacks[-1][1] += 1
+        else:
+            stacks.append([item, 1])
+    return stacks
+
+
+def unstack_items(stacks):
+    """Flat item list from [name, count] stacks"""
+    return [item for item, count in stacks for _ in range(count)]
+
+
+# Extra achievements, same layout as ACHIEVEMENTS
+ACHIEVEMENTS_FILE = "achievements.json"
+
+
+def load_achievement_definitions(path=ACHIEVEMENTS_FILE):
+    """Built-in achievements plus any defined in the achievements data file"""
+    definitions = {category: list(achievements) for category, achievements in ACHIEVEMENTS.items()}
+    try:
+        with open(path, "r") as f:
+            extra = json.load(f)
+    except FileNotFoundError:
+        return definitions
+    for category, achievements in extra.items():
+        definitions.setdefault(category, []).extend(achievements)
+    return definitions
+
+
+class AchievementEngine:
+    """Tracks which achievements a player has earned.
+
+    Definitions are indexed once by threshold, per category (and per skill
+    for skill achievements). A check is a bisect over the thresholds plus a
+    look at the achievements crossed since the previous check, so its cost
+    does not grow with the number of achievements defined.
+    """
+
+    def __init__(self, definitions=None):
+        self.definitions = ACHIEVEMENTS if definitions is None else definitions
+        self._index = {}
+        for category, achievements in self.definitions.items():
+            for achievement in achievements:
+                self._index.setdefault((category, achievement.get("skill")), []).append(achievement)
+        for achievements in self._index.values():
+            achievements.sort(key=lambda a: a["threshold"])
+        self._thresholds = {key: [a["threshold"] for a in achievements]
+                            for key, achievements in self._index.items()}
+        self._by_id = {a["id"]: a for achievements in self.definitions.values() for a in achievements}
+        self.reset()
+
+    def definition(self, achievement_id):
+        """Achievement with an id; ids no longer defined get a bare placeholder"""
+        return self._by_id.get(achievement_id) or {"id": achievement_id, "name": achievement_id, "description": ""}
+
+    def reset(self, earned=()):
+        """Start tracking a player who already holds the `earned` achievements"""
+        self.earned = {achievement["id"] for achievement in earned}
+        # How many thresholds of each index have already been checked
+        self._checked = dict.fromkeys(self._index, 0)
+
+    def check(self, category, value, skill=None):
+        """Achievements newly earned now that a category (or skill) has reached `value`"""
+        key = (category, skill)
+        thresholds = self._thresholds.get(key)
+        if thresholds is None:
+            return []
+
+        reached = bisect_right(thresholds, value)
+        checked = self._checked[key]
+        if reached <= checked:
+            return []
+        self._checked[key] = reached
+
+        new = [a for a in self._index[key][checked:reached] if a["id"] not in self.earned]
+        self.earned.update(a["id"] for a in new)
+        return new
+
+
+CONFIG_FILE = "tower_config.json"
+
+# Configuration written when tower_config.json does not exist
+DEFAULT_CONFIG = {
+    "game_settings": {
+        "tower_height": 100,
+        "auto_save": True,
+        "sound_effects": True,
+        "default_color_theme": "default",
+        "animation_speed": 0.03,
+        # "realtime", "accelerated", "skip" (Enter skips ahead) or "instant"
+        "pacing": "realtime",
+        # How many times faster "accelerated" pacing runs
+        "pacing_speedup": 4.0,
+        "difficulty": "normal",
+        # Longest a change waits before the background writer saves it
+        "save_flush_interval": 2.0,
+        # "file" (one JSON file per player) or "sqlite" (one database)
+        "save_backend": "file",
+        # "none", "gzip" or "lzma"
+        "save_compression": "none"
+    },
+    "challenge_settings": {
+        "luck_challenge_weight": 1.0,
+        "skill_challenge_weight": 1.0,
+        "mixed_challenge_weight": 1.0,
+        "legendary_challenge_weight": 0.5,
+        "boss_frequency": 10,
+        "hidden_floor_frequency": 7,
+        # Branching paths (and checkpoints on the tower map) every this many floors
+        "checkpoint_frequency": 5,
+        # Floors marked as legendary on the tower map
+        "legendary_floor_frequency": 20,
+        "mini_game_chance": 0.15
+    },
+    "reward_settings": {
+        "basic_reward_chance": 0.3,
+        "advanced_reward_threshold": 20,
+        "legendary_reward_threshold": 40,
+        "boss_reward_guaranteed": True
+    },
+    "companion_settings": {
+        "max_companions": 3,
+        "encounter_chance": 0.1
+    },
+    "environment_settings": {
+        "weather_change_frequency": 3,
+        "day_night_cycle_frequency": 5
+    }
+}
+
+
+def write_json_file(path, data):
+    """Write JSON to a temp file and rename it over `path`, so readers see the old file or the new one, never half of it"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                     prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def freeze_config(value):
+    """Read-only view of a parsed config: dicts become mapping proxies and lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze_config(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+
+def thaw_config(value):
+    """Editable deep copy of a frozen config"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_config(item) for item in value]
+    return value
+
+
+def validate_config(config):
+    """Fill in missing settings from DEFAULT_CONFIG; a bad value warns and falls back to its default"""
+    if not isinstance(config, dict):
+        warnings.warn("Config must be a JSON object; using the default config")
+        config = {}
+    validated = dict(config)
+
+    def fall_back(section, key, problem):
+        default = DEFAULT_CONFIG[section][key]
+        warnings.warn(f"Config value {section}.{key} {problem}; using the default {default!r}")
+        validated[section][key] = default
+
+    for section, defaults in DEFAULT_CONFIG.items():
+        given = config.get(section, {})
+        if not isinstance(given, dict):
+            warnings.warn(f"Config section {section} must be a JSON object; using its defaults")
+            given = {}
+        settings = validated[section] = dict(defaults, **given)
+        for key, default in defaults.items():
+            value = settings[key]
+            if isinstance(default, bool):
+                valid = isinstance(value, bool)
+            elif isinstance(default, (int, float)):
+                valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            else:
+                valid = isinstance(value, type(default))
+            if not valid:
+                fall_back(section, key, f"{value!r} has the wrong type")
+
+    # Settings with a fixed set of values
+    for key, choices in (("save_backend", SAVE_BACKENDS), ("save_compression", SAVE_COMPRESSIONS),
+                         ("pacing", PACING_MODES)):
+        if validated["game_settings"][key] not in choices:
+            fall_back("game_settings", key, f"must be one of {choices}")
+    if validated["game_settings"]["pacing_speedup"] <= 0:
+        fall_back("game_settings", "pacing_speedup", "must be positive")
+
+    # These divide the floor number
+    for section, key in (("challenge_settings", "boss_frequency"),
+                         ("challenge_settings", "hidden_floor_frequency"),
+                         ("challenge_settings", "checkpoint_frequency"),
+                         ("challenge_settings", "legendary_floor_frequency"),
+                         ("environment_settings", "weather_change_frequency"),
+                         ("environment_settings", "day_night_cycle_frequency")):
+        if validated[section][key] < 1:
+            fall_back(section, key, "must be at least 1")
+
+    # Challenge types are drawn by weight, before and from LEGENDARY_FLOOR
+    weights = [f"{t}_challenge_weight" for t in ("luck", "skill", "mixed", "legendary")]
+    for key in weights:
+        if validated["challenge_settings"][key] < 0:
+            fall_back("challenge_settings", key, "must not be negative")
+    if sum(validated["challenge_settings"][key] for key in weights[:-1]) <= 0:
+        for key in weights[:-1]:
+            fall_back("challenge_settings", key, "leaves no challenge type below the legendary floor")
+    return validated
+
+
+class ConfigStore:
+    """Parses a config file once and serves it until the file changes.
+
+    The file is only re-read when its mtime or size changes, or after
+    `save`. The config is served as a read-only mapping so that callers
+    sharing it cannot change each other's settings; use thaw_config to get
+    an editable copy.
+    """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # (file signature, frozen config), swapped as one object so readers never see a mix
+        self._cached = (None, None)
+
+    @classmethod
+    def for_path(cls, path=CONFIG_FILE):
+        """Store shared by every game in this process that uses the same file"""
+        key = os.path.abspath(path)
+        with cls._stores_lock:
+            store = cls._stores.get(key)
+            if store is None:
+                store = cls._stores[key] = cls(key)
+            return store
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        """Current config, re-read only if the file changed"""
+        signature = self._stat_signature()
+        cached_signature, config = self._cached
+        if config is not None and signature == cached_signature:
+            return config
+
+        with self._lock:
+            cached_signature, config = self._cached
+            if config is not None and signature == cached_signature:
+                return config
+            if signature is None:
+                # Create default config if not found
+                return self._write(DEFAULT_CONFIG)
+            with open(self.path, "r") as f:
+                config = freeze_config(validate_config(json.load(f)))
+            self._cached = (signature, config)
+            return config
+
+    def save(self, config):
+        """Write a config to the file and serve it from now on"""
+        config = validate_config(thaw_config(config))
+        with self._lock:
+            self._write(config)
+
+    def _write(self, config):
+        write_json_file(self.path, config)
+        frozen = freeze_config(config)
+        self._cached = (self._stat_signature(), frozen)
+        return frozen
+
+
+class EnvironmentSchedule:
+    """Weather, time of day and environment modifiers for every floor.
+
+    Weather is drawn once per block of `weather_change_frequency` floors
+    and kept as one byte per block; day and night alternate every
+    `day_night_cycle_frequency` floors. Blocks are added on demand, so
+    towers of any height cost nothing up front.
+    """
+
+    def __init__(self, seed, weather_change_frequency=3, day_night_cycle_frequency=5, floors=0):
+        self.weather_change_frequency = weather_change_frequency
+        self.day_night_cycle_frequency = day_night_cycle_frequency
+        self._rng = random.Random(f"{seed}:weather")
+        self._weather = array("B")
+        # Per challenge type: modifier for each (weather, time of day) pair
+        self._modifiers = {}
+        self.extend(floors)
+
+    def extend(self, floor):
+        """Make sure the schedule covers floors up to `floor`"""
+        blocks = floor // self.weather_change_frequency + 1
+        while len(self._weather) < blocks:
+            self._weather.append(self._rng.randrange(len(WEATHERS)))
+
+    def weather_index(self, floor):
+        block = floor // self.weather_change_frequency
+        if block >= len(self._weather):
+            self.extend(floor)
+        return self._weather[block]
+
+    def weather(self, floor):
+        return WEATHERS[self.weather_index(floor)]
+
+    def time_index(self, floor):
+        return (floor // self.day_night_cycle_frequency) % len(TIMES_OF_DAY)
+
+    def time_of_day(self, floor):
+        return TIMES_OF_DAY[self.time_index(floor)]
+
+    def _modifier_table(self, challenge_type):
+        table = self._modifiers.get(challenge_type)
+        if table is None:
+            table = []
+            for weather in WEATHERS:
+                weather_mod = weather["modifier"] if weather["affects"] in ("all", challenge_type) else 0
+                for time_of_day in TIMES_OF_DAY:
+                    table.append(weather_mod + (1 if TIME_OF_DAY_BONUS[time_of_day] == challenge_type else 0))
+            self._modifiers[challenge_type] = table
+        return table
+
+    def modifier(self, floor, challenge_type):
+        """Total weather and time of day modifier for a challenge type on a floor"""
+        table = self._modifier_table(challenge_type)
+        return table[self.weather_index(floor) * len(TIMES_OF_DAY) + self.time_index(floor)]
+
+
 class TowerOfChance:
-    def __init__(self):
-        self.player = {
-            "name": "",
-            "class": "",
-            "level": 1,
-            "max_level": 1,
-            "items": [],
-            "companions": [],
-            "buffs": [],
-            "debuffs": [],
-            "achievements": [],
-            "hidden_floors_found": [],
-            "bosses_defeated": [],
-            "color_theme": "default",
-            "skills": {
-                "luck": 1,
-                "strength": 1,
-                "agility": 1,
-                "wisdom": 1
-            }
-        }
+    def __init__(self, seed=None, input_port=None, output_port=None, editors=True):
+        # The settings and challenge editors rewrite files every game in the
+        # process reads, so games hosted for other players go without them
+        self.editors = editors
+        # The screen flow and the prompt it waits on, see start() and step()
+        self.screen = self.flow = self.pending = None
+        self.config_store = ConfigStore.for_path(CONFIG_FILE)
+        self.achievement_engine = AchievementEngine(load_achievement_definitions())
+        game_settings = self.load_config()["game_settings"]
+        self.save_store = open_save_store(game_settings["save_backend"], "saves")
+        self.save_writer = SaveWriter.shared(self.save_store, game_settings["save_flush_interval"])
+        self.set_seed(seed)
+        self.reset_state()
         
         # Load configuration
         config = self.load_config()
         self.tower_height = config["game_settings"]["tower_height"]
         self.animation_speed = config["game_settings"]["animation_speed"]
+        self.clock = PacingClock(config["game_settings"]["pacing"], config["game_settings"]["pacing_speedup"])
+        self.sound = SoundQueue(config["game_settings"]["sound_effects"], self.clock)
+        self.set_ports(input_port, output_port)
         
         self.challenges = self.load_challenges()
+        self.challenge_catalog = ChallengeCatalog(self.challenges)
+        self._type_samplers = None
         self.colors = {
             "default": {
                 "title": Fore.CYAN,
@@ -221,6 +917,63 @@ class TowerOfChance:
             Back.RED, Back.GREEN, Back.YELLOW, Back.BLUE, 
             Back.MAGENTA, Back.CYAN
         ]
+        
+    def set_ports(self, input_port=None, output_port=None):
+        """Where the game reads answers from and writes its screens to; the terminal by default"""
+        self.input_port = input_port or ConsoleInput()
+        self.output_port = output_port or ConsoleOutput()
+        # Screens come from the game thread and bells from the sound thread
+        write = serialized(self.output_port.write)
+        self.renderer = Renderer(write, self.output_port.isatty(), getattr(self.output_port, "size", None))
+        self.sound.write = write
+        self.clock.wait_for_key = getattr(self.input_port, "wait_for_key", None)
+        self.clock.delay = getattr(self.output_port, "delay", None)
+        self.observer = getattr(self.output_port, "observe", None)
+        # Ports that send prompts out later than the game reaches them say when they did
+        self.prompt_clock = getattr(self.output_port, "prompt_sent_at", None)
+        # Ports on an event loop wait for saves themselves, see SaveFlush
+        self.defer_flushes = getattr(self.output_port, "defer_flushes", False)
+        
+    def set_seed(self, seed=None):
+        """Derive this game's random streams from one session seed (a fresh one if None)"""
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        # Separate streams, so e.g. an extra reward roll never shifts the challenges that follow
+        self.challenge_rng = random.Random(f"{seed}:challenges")
+        self.reward_rng = random.Random(f"{seed}:rewards")
+        self.companion_rng = random.Random(f"{seed}:companions")
+
+        self.build_environment()
+
+    def build_environment(self):
+        """Weather and time of day, drawn as the climb reaches each floor"""
+        environment = self.load_config()["environment_settings"]
+        self.environment = EnvironmentSchedule(self.seed, environment["weather_change_frequency"],
+                                               environment["day_night_cycle_frequency"])
+
+    def reset_state(self):
+        """Reset the player and statistics to a fresh adventurer"""
+        self.player = {
+            "name": "",
+            "class": "",
+            "level": 1,
+            "max_level": 1,
+            "items": [],
+            "companions": [],
+            "buffs": [],
+            "debuffs": [],
+            "achievements": [],
+            "hidden_floors_found": FloorSet(),
+            "bosses_defeated": FloorSet(),
+            "color_theme": "default",
+            "skills": {
+                "luck": 1,
+                "strength": 1,
+                "agility": 1,
+                "wisdom": 1
+            }
+        }
         self.stats = {
             "challenges_completed": 0,
             "challenges_failed": 0,
@@ -235,6 +988,12 @@ class TowerOfChance:
             "mini_games_played": 0,
             "mini_games_won": 0
         }
+        self.achievement_engine.reset()
+        # Save text last handed to the writer, to skip saves when nothing changed
+        self.saved_snapshot = None
+        # Set by whatever changes the player or stats (climbing, character
+        # creation, the color theme), so auto-save only serializes after those
+        self.unsaved_changes = False
         
     def load_challenges(self):
         """Load challenges from file or use defaults if file doesn't exist"""
@@ -262,20 +1021,60 @@ class TowerOfChance:
         except FileNotFoundError:
             return default_challenges
             
+    def serialize_save(self):
+        """The current game state as compact save text (SAVE_FORMAT)"""
+        player = dict(self.player)
+        # Achievements by id, repeated rewards as stacks and floor lists as bitmaps
+        player["achievements"] = [a["id"] for a in self.player["achievements"]]
+        player["items"] = stack_items(self.player["items"])
+        for key in ("hidden_floors_found", "bosses_defeated"):
+            player[key] = self.player[key].to_bitmap()
+        save_data = {
+            "format": SAVE_FORMAT,
+            "player": player,
+            "stats": self.stats
+        }
+        return json.dumps(save_data, separators=(",", ":"))
+        
+    def expand_player(self, player):
+        """Player state from its compact saved form"""
+        player = dict(player)
+        player["achievements"] = [self.achievement_engine.definition(a) for a in player["achievements"]]
+        player["items"] = unstack_items(player["items"])
+        for key in ("hidden_floors_found", "bosses_defeated"):
+            player[key] = FloorSet.from_bitmap(player[key])
+        return player
+        
+    def queue_save(self, save_text):
+        """Hand a save to the background writer and remember it as the saved state"""
+        compression = self.load_config()["game_settings"]["save_compression"]
+        summary = {key: self.player[key] for key in ("class", "level", "max_level")}
+        self.save_writer.submit(self.player["name"], pack_save(save_text, compression), summary)
+        self.saved_snapshot = save_text
+        self.unsaved_changes = False
+        
+    def flush_saves(self, name=None):
+        """Wait until the pending saves are written, re-raising the save error for `name`"""
+        if self.defer_flushes:
+            error = yield SaveFlush(name)
+            if error is not None:
+                raise error
+        else:
+            self.save_writer.flush(name)
+        
     def save_game(self, silent=False):
         """Save the current game state"""
-        # Create saves directory if it doesn't exist
-        if not os.path.exists("saves"):
-            os.makedirs("saves")
-            
-        with open(f"saves/{self.player['name']}_save.json", "w") as f:
-            save_data = {
-                "player": self.player,
-                "stats": self.stats
-            }
-            json.dump(save_data, f)
+        self.queue_save(self.serialize_save())
             
         if not silent:
+            # An explicit save is on disk before we say so
+            try:
+                yield from self.flush_saves(self.player["name"])
+            except OSError as e:
+                self.print_colored(f"The game could not be saved ({e}); it will be retried.", 
+                                  self.colors[self.player["color_theme"]]["failure"])
+                self.play_sound("failure")
+                return
             self.print_colored("Game saved successfully!", 
                               self.colors[self.player["color_theme"]]["success"])
             self.play_sound("success")
@@ -283,17 +1082,32 @@ class TowerOfChance:
     def load_game(self, player_name):
         """Load a saved game"""
         try:
-            with open(f"saves/{player_name}_save.json", "r") as f:
-                save_data = json.load(f)
+            if not valid_save_name(player_name):
+                raise FileNotFoundError(player_name)
+            # Make sure a save still waiting in the writer is read back
+            yield from self.flush_saves()
+            save_data = json.loads(unpack_save(self.save_store.read(player_name)))
                 
-                # Handle both new and old save formats
-                if "player" in save_data:
-                    self.player = save_data["player"]
-                    if "stats" in save_data:
-                        self.stats = save_data["stats"]
-                else:
-                    # Old format where save_data is just the player
-                    self.player = save_data
+            # Handle the compact format as well as the older full ones
+            save_format = save_data.get("format")
+            if save_format is not None:
+                if save_format > SAVE_FORMAT:
+                    raise ValueError(f"Save format {save_format} is newer than this game")
+                self.player = self.expand_player(save_data["player"])
+                self.stats = save_data["stats"]
+            elif "player" in save_data:
+                self.player = save_data["player"]
+                if "stats" in save_data:
+                    self.stats = save_data["stats"]
+            else:
+                # Old format where save_data is just the player
+                self.player = save_data
+            for key in ("hidden_floors_found", "bosses_defeated"):
+                if not isinstance(self.player[key], FloorSet):
+                    self.player[key] = FloorSet(self.player[key])
+            self.achievement_engine.reset(self.player["achievements"])
+            self.saved_snapshot = self.serialize_save()
+            self.unsaved_changes = False
                     
             self.print_colored(f"Welcome back, {self.player['name']}!", 
                               self.colors[self.player["color_theme"]]["highlight"])
@@ -304,15 +1118,20 @@ class TowerOfChance:
                               self.colors[self.player["color_theme"]]["failure"])
             self.play_sound("failure")
             return False
+        except ValueError:
+            # Saves written before atomic saving could be cut off mid-write
+            self.print_colored("That saved game is damaged and can't be loaded.", 
+                              self.colors[self.player["color_theme"]]["failure"])
+            self.play_sound("failure")
+            return False
             
     def print_colored(self, text, color=None, background=None):
         """Print text with colors based on the current theme"""
         if color is None:
             color = self.colors[self.player["color_theme"]]["info"]
-        if background is None:
-            print(f"{color}{text}")
-        else:
-            print(f"{color}{background}{text}")
+        if background is not None:
+            color = f"{color}{background}"
+        self.renderer.line(text, color)
             
     def animate_text(self, text, color=None, delay=None):
         """Animate text printing character by character"""
@@ -322,14 +1141,44 @@ class TowerOfChance:
         if delay is None:
             delay = self.animation_speed
         
-        for char in text:
-            print(f"{color}{char}", end='', flush=True)
-            time.sleep(delay)
-        print()
+        # A few characters per write, each write followed by their share of the delay
+        chunk = self.clock.chunk_size(delay, len(text))
+        for start in range(0, len(text), chunk):
+            piece = text[start:start + chunk]
+            self.renderer.text(f"{color}{piece}")
+            self.pause(delay * len(piece))
+        self.renderer.text(f"{Style.RESET_ALL}\n")
+        
+    def print_plain(self, text=""):
+        """Print text without applying a theme color"""
+        self.renderer.line(text)
+        
+    def get_input(self, prompt="", prompt_id="continue", choices=None, **context):
+        """Wait for a line of player input for the given prompt and return it"""
+        self.renderer.flush()
+        self.clock.resume()
+        self.prompt_shown_at = time.time()
+        # Flows yield the pending prompt; start() and step() hand it to the caller
+        answer = yield prompt, prompt_descriptor(prompt, prompt_id, choices, context)
+        if self.prompt_clock is not None:
+            self.prompt_shown_at = self.prompt_clock()
+        # The prompt and the echoed answer are on screen now too
+        self.renderer.track(f"{prompt}{answer}\n")
+        return answer
+        
+    def observe(self, kind, **data):
+        """Report what happens as plain data, to output ports that take it"""
+        if self.observer is not None:
+            self.observer(kind, data)
+        
+    def pause(self, seconds):
+        """Pause the game for dramatic effect"""
+        self.renderer.flush()
+        self.clock.sleep(seconds)
         
     def clear_screen(self):
         """Clear the terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.renderer.clear()
         
     def print_ascii_art(self, art_name, color=None):
         """Print ASCII art with color"""
@@ -360,78 +1209,39 @@ class TowerOfChance:
         title_color = self.colors[self.player["color_theme"]]["title"]
         for line in title.split('\n'):
             self.print_colored(line, title_color)
-        print()
+        self.print_plain()
         
     def display_tower(self):
         """Display the tower and player's position"""
-        tower_height = 20  # Visual representation height
-        level_spacing = self.tower_height / tower_height
-        
-        self.print_colored("\n=== THE TOWER OF CHANCE ===", self.colors[self.player["color_theme"]]["title"])
-        
-        # Draw tower structure
-        for i in range(tower_height, 0, -1):
-            level = int(i * level_spacing)
-            
-            # Determine what to display at this level
-            if level == self.player["level"]:
-                marker = f"{self.colors[self.player['color_theme']]['success']}▶ YOU ARE HERE ◀{Style.RESET_ALL}"
-            elif level == 100:
-                marker = f"{self.colors[self.player['color_theme']]['legendary']}★ FINAL CHALLENGE ★{Style.RESET_ALL}"
-            elif level % 20 == 0:
-                marker = f"{self.colors[self.player['color_theme']]['legendary']}★ LEGENDARY FLOOR ★{Style.RESET_ALL}"
-            elif level % 10 == 0:
-                marker = f"{self.colors[self.player['color_theme']]['warning']}★ BOSS FLOOR ★{Style.RESET_ALL}"
-            elif level % 5 == 0:
-                marker = f"{self.colors[self.player['color_theme']]['highlight']}◆ CHECKPOINT ◆{Style.RESET_ALL}"
-            else:
-                marker = ""
-                
-            # Create the tower level visualization
-            if level == self.player["level"]:
-                level_str = f"{Back.GREEN}{Fore.BLACK} {level:3d} {Style.RESET_ALL}"
-            elif level <= self.player["max_level"]:
-                level_str = f"{self.colors[self.player['color_theme']]['success']} {level:3d} {Style.RESET_ALL}"
-            else:
-                level_str = f"{self.colors[self.player['color_theme']]['info']} {level:3d} {Style.RESET_ALL}"
+        settings = self.load_config()["challenge_settings"]
+        lines = render_tower(self.player["level"], self.player["max_level"], self.tower_height,
+                             tuple(self.colors[self.player["color_theme"]].items()),
+                             settings["boss_frequency"], settings["legendary_floor_frequency"],
+                             settings["checkpoint_frequency"])
+        with self.renderer.frame():
+            for line in lines:
+                self.print_plain(line)
                 
-            # Draw the tower structure with appropriate width based on level
-            tower_width = 30 + (level // 20)  # Tower gets wider at the base
-            tower_line = '║' + '═' * tower_width + '║'
-            
-            print(f"{level_str} {tower_line} {marker}")
-            
-        # Draw tower base
-        base_width = 32 + (5 // 20)
-        self.print_colored("╚" + "═" * base_width + "╝", self.colors[self.player["color_theme"]]["highlight"])
-        print()
+    def get_challenge_type_sampler(self):
+        """Weighted challenge type sampler for the current floor, rebuilt when the config or challenges change"""
+        config = self.load_config()
+        cached = self._type_samplers
+        if cached is None or cached[0] is not config or cached[1] is not self.challenge_catalog:
+            samplers = challenge_type_samplers(list(self.challenges.keys()), config["challenge_settings"])
+            cached = self._type_samplers = (config, self.challenge_catalog, samplers)
+        return cached[2][self.player["level"] >= LEGENDARY_FLOOR]
+        
     def get_challenge(self, forced_type=None):
         """Get a random challenge appropriate for the current level"""
-        # Determine available challenge types based on player level
-        challenge_types = list(self.challenges.keys())
-        
-        # Filter challenge types based on player level and forced type
-        available_types = []
-        if forced_type and forced_type in challenge_types:
-            available_types = [forced_type]
+        if forced_type and forced_type in self.challenges:
+            challenge_type = forced_type
         else:
-            for challenge_type in challenge_types:
-                if challenge_type == "legendary" and self.player["level"] >= 20:
-                    available_types.append(challenge_type)
-                elif challenge_type != "legendary":
-                    available_types.append(challenge_type)
-                    
-        # Select a challenge type
-        challenge_type = random.choice(available_types)
-        
-        # Filter challenges by appropriate difficulty
-        suitable_challenges = [c for c in self.challenges[challenge_type] 
-                              if c["difficulty"] <= self.player["level"] // 5 + 1]
+            # Weighted by the *_challenge_weight settings, legendary only from floor 20
+            challenge_type = self.get_challenge_type_sampler().draw(self.challenge_rng)
         
-        if not suitable_challenges:
-            suitable_challenges = self.challenges[challenge_type]
-            
-        return random.choice(suitable_challenges), challenge_type
+        # Pick among challenges of appropriate difficulty
+        max_difficulty = self.player["level"] // 5 + 1
+        return self.challenge_catalog.pick(challenge_type, max_difficulty, self.challenge_rng), challenge_type
     
     def run_luck_challenge(self, challenge, modifier=0):
         """Run a luck-based challenge"""
@@ -443,44 +1253,44 @@ class TowerOfChance:
         success_chance = max(0.1, min(0.9, success_chance))  # Cap between 10% and 90%
         
         if challenge["name"] == "Coin Flip":
-            guess = input("\nHeads or Tails? (h/t): ").lower()
-            result = random.choice(["h", "t"])
+            guess = (yield from self.get_input("\nHeads or Tails? (h/t): ", "coin_flip", ["h", "t"])).lower()
+            result = self.challenge_rng.choice(["h", "t"])
             
             self.print_colored("\nThe coin flips through the air...", Fore.CYAN)
-            time.sleep(1)
+            self.pause(1)
             
             if result == "h":
                 self.print_colored("It's HEADS!", Fore.YELLOW)
             else:
                 self.print_colored("It's TAILS!", Fore.YELLOW)
                 
-            return guess == result or random.random() < success_chance
+            return guess == result or self.challenge_rng.random() < success_chance
             
         elif challenge["name"] == "Lucky Draw":
             cards = ["Ace", "King", "Queen", "Jack", "10", "9", "8", "7"]
-            target = random.choice(cards)
+            target = self.challenge_rng.choice(cards)
             
             self.print_colored(f"\nYou must draw the {target} to succeed!", Fore.CYAN)
-            input("Press Enter to draw a card...")
+            yield from self.get_input("Press Enter to draw a card...")
             
-            drawn = random.choice(cards)
+            drawn = self.challenge_rng.choice(cards)
             self.print_colored(f"\nYou drew the {drawn}!", Fore.YELLOW)
             
-            return drawn == target or random.random() < success_chance
+            return drawn == target or self.challenge_rng.random() < success_chance
             
         elif challenge["name"] == "Roll of Fate":
-            target = random.randint(1, 6)
+            target = self.challenge_rng.randint(1, 6)
             
             self.print_colored(f"\nYou must roll a {target} to succeed!", Fore.CYAN)
-            input("Press Enter to roll the dice...")
+            yield from self.get_input("Press Enter to roll the dice...")
             
-            roll = random.randint(1, 6)
+            roll = self.challenge_rng.randint(1, 6)
             self.print_colored(f"\nYou rolled a {roll}!", Fore.YELLOW)
             
-            return roll == target or random.random() < success_chance
+            return roll == target or self.challenge_rng.random() < success_chance
             
         # Default fallback
-        return random.random() < success_chance
+        return self.challenge_rng.random() < success_chance
     
     def run_skill_challenge(self, challenge, modifier=0):
         """Run a skill-based challenge"""
@@ -492,12 +1302,12 @@ class TowerOfChance:
             
             for i in range(3, 0, -1):
                 self.print_colored(f"{i}...", Fore.YELLOW)
-                time.sleep(random.uniform(0.7, 1.3))
+                self.pause(self.challenge_rng.uniform(0.7, 1.3))
                 
             self.print_colored("NOW!", Fore.GREEN)
-            start_time = time.time()
-            input()
-            reaction_time = time.time() - start_time
+            yield from self.get_input(prompt_id="reflexes")
+            # Timed from when the player could see the prompt
+            reaction_time = time.time() - self.prompt_shown_at
             
             self.print_colored(f"Your reaction time: {reaction_time:.3f} seconds", Fore.CYAN)
             
@@ -511,15 +1321,16 @@ class TowerOfChance:
             sequence_length = max(3, sequence_length - modifier)
             
             symbols = ["★", "♦", "♥", "♠", "♣", "▲", "■", "●"]
-            sequence = [random.choice(symbols) for _ in range(sequence_length)]
+            sequence = [self.challenge_rng.choice(symbols) for _ in range(sequence_length)]
             
             self.print_colored("\nMemorize this sequence:", Fore.CYAN)
             self.print_colored(" ".join(sequence), Fore.YELLOW)
             
-            time.sleep(2 + sequence_length * 0.5)
-            os.system('cls' if os.name == 'nt' else 'clear')
+            self.pause(2 + sequence_length * 0.5)
+            self.clear_screen()
             
-            guess = input("Enter the sequence (symbols separated by spaces): ")
+            guess = yield from self.get_input("Enter the sequence (symbols separated by spaces): ", "memory_sequence",
+                                              shown=sequence)
             guess_sequence = guess.split()
             
             return guess_sequence == sequence
@@ -531,10 +1342,10 @@ class TowerOfChance:
                 {"q": "What has keys but no locks, space but no room, and you can enter but not go in?", "a": "keyboard"}
             ]
             
-            riddle = random.choice(riddles)
+            riddle = self.challenge_rng.choice(riddles)
             self.print_colored(f"\nRiddle: {riddle['q']}", Fore.CYAN)
             
-            answer = input("Your answer: ").lower().strip()
+            answer = (yield from self.get_input("Your answer: ", "riddle", question=riddle["q"])).lower().strip()
             
             # Wisdom helps with partial answers, modified by the modifier
             wisdom_threshold = 2 - modifier
@@ -548,7 +1359,7 @@ class TowerOfChance:
                 return False
                 
         # Default fallback
-        return random.random() < (0.5 + (modifier * 0.1))
+        return self.challenge_rng.random() < (0.5 + (modifier * 0.1))
         
     def run_mixed_challenge(self, challenge, modifier=0):
         """Run a challenge that combines luck and skill"""
@@ -568,29 +1379,29 @@ class TowerOfChance:
             for clue in clues:
                 self.print_colored(f"- {clue}", Fore.WHITE)
                 
-            answer = input("\nWhere is the treasure hidden? ").lower()
+            answer = (yield from self.get_input("\nWhere is the treasure hidden? ", "treasure_hunt", clues=clues)).lower()
             if "chest" in answer:
                 puzzle_solved = True
                 
             # Luck component - find the right chest
             if puzzle_solved:
                 self.print_colored("\nYou found the chests! But which one contains the treasure?", Fore.CYAN)
-                chest_choice = input("Choose chest 1, 2, or 3: ")
+                chest_choice = yield from self.get_input("Choose chest 1, 2, or 3: ", "treasure_chest", ["1", "2", "3"])
                 
-                lucky_chest = str(random.randint(1, 3))
+                lucky_chest = str(self.challenge_rng.randint(1, 3))
                 luck_bonus = self.player["skills"]["luck"] * 0.1 + modifier * 0.05
                 
-                return chest_choice == lucky_chest or random.random() < (0.33 + luck_bonus)
+                return chest_choice == lucky_chest or self.challenge_rng.random() < (0.33 + luck_bonus)
             else:
                 return False
                 
         elif challenge["name"] == "Dragon's Gambit":
             self.print_colored("\nA dragon blocks your path! You can try to outsmart it or outrun it.", Fore.RED)
-            choice = input("Will you use your wits (w) or speed (s)? ").lower()
+            choice = (yield from self.get_input("Will you use your wits (w) or speed (s)? ", "dragons_gambit", ["w", "s"])).lower()
             
             if choice == 'w':
                 # Wisdom-based challenge
-                wisdom_check = random.random() < (0.4 + self.player["skills"]["wisdom"] * 0.1 + modifier * 0.05)
+                wisdom_check = self.challenge_rng.random() < (0.4 + self.player["skills"]["wisdom"] * 0.1 + modifier * 0.05)
                 if wisdom_check:
                     self.print_colored("You cleverly distract the dragon with a riddle!", Fore.GREEN)
                     return True
@@ -599,7 +1410,7 @@ class TowerOfChance:
                     return False
             else:
                 # Agility-based challenge
-                agility_check = random.random() < (0.4 + self.player["skills"]["agility"] * 0.1 + modifier * 0.05)
+                agility_check = self.challenge_rng.random() < (0.4 + self.player["skills"]["agility"] * 0.1 + modifier * 0.05)
                 if agility_check:
                     self.print_colored("You dash past the dragon with incredible speed!", Fore.GREEN)
                     return True
@@ -615,10 +1426,10 @@ class TowerOfChance:
             # Luck affects finding good footing
             luck_factor = self.player["skills"]["luck"] * 0.1 + modifier * 0.05
             
-            input("Press Enter to jump...")
+            yield from self.get_input("Press Enter to jump...")
             
-            jump_success = random.random() < (0.5 + strength_factor)
-            footing_success = random.random() < (0.5 + luck_factor)
+            jump_success = self.challenge_rng.random() < (0.5 + strength_factor)
+            footing_success = self.challenge_rng.random() < (0.5 + luck_factor)
             
             if jump_success and footing_success:
                 self.print_colored("Perfect jump! You land safely on the other side.", Fore.GREEN)
@@ -634,13 +1445,13 @@ class TowerOfChance:
                 return False
                 
         # Default fallback
-        return random.random() < (0.5 + modifier * 0.1)
+        return self.challenge_rng.random() < (0.5 + modifier * 0.1)
         
     def run_challenge(self):
         """Run a random challenge based on the player's level"""
         # Check for boss floor
         if self.check_for_boss_floor():
-            success = self.run_boss_challenge()
+            success = yield from self.run_boss_challenge()
             if success:
                 self.player["level"] += 1
                 if self.player["level"] > self.player["max_level"]:
@@ -649,7 +1460,7 @@ class TowerOfChance:
             return success
             
         # Check for hidden floor
-        if self.check_for_hidden_floor():
+        if (yield from self.check_for_hidden_floor()):
             self.player["level"] += 1
             if self.player["level"] > self.player["max_level"]:
                 self.player["max_level"] = self.player["level"]
@@ -657,14 +1468,14 @@ class TowerOfChance:
             return True
             
         # Random chance for mini-game
-        if random.random() < 0.15:
+        if self.challenge_rng.random() < 0.15:
             self.stats["mini_games_played"] += 1
-            result = self.run_mini_game()
+            result = yield from self.run_mini_game()
             if result:
                 self.stats["mini_games_won"] += 1
         
         # Check for branching paths
-        chosen_path = self.present_branching_path()
+        chosen_path = yield from self.present_branching_path()
         
         if chosen_path:
             challenge_type = chosen_path["challenge_type"]
@@ -729,14 +1540,26 @@ class TowerOfChance:
         # Apply total modifier to challenge
         total_mod = environment_mod + effects_mod + companion_mod + difficulty_mod
         
+        # Only gathered for ports that take observations
+        if self.observer is not None:
+            weather = self.get_weather()
+            self.observe("environment", time_of_day=self.get_time_of_day(), weather=weather["name"],
+                         effect=weather["effect"], modifier=environment_mod)
+            self.observe("effects", buffs=self.player["buffs"], debuffs=self.player["debuffs"],
+                         companions=[companion["name"] for companion in self.player["companions"]],
+                         modifier=effects_mod, companion_modifier=companion_mod)
+            self.observe("challenge", challenge_type=challenge_type, name=challenge["name"],
+                         description=challenge.get("description"), difficulty=challenge.get("difficulty"),
+                         path=chosen_path["name"] if chosen_path else None, modifier=total_mod)
+        
         if challenge_type == "luck":
-            success = self.run_luck_challenge(challenge, total_mod)
+            success = yield from self.run_luck_challenge(challenge, total_mod)
         elif challenge_type == "skill":
-            success = self.run_skill_challenge(challenge, total_mod)
+            success = yield from self.run_skill_challenge(challenge, total_mod)
         elif challenge_type == "legendary":
-            success = self.run_legendary_challenge(challenge, total_mod)
+            success = yield from self.run_legendary_challenge(challenge, total_mod)
         else:  # mixed
-            success = self.run_mixed_challenge(challenge, total_mod)
+            success = yield from self.run_mixed_challenge(challenge, total_mod)
             
         if success:
             self.clear_screen()
@@ -754,19 +1577,15 @@ class TowerOfChance:
                 self.check_for_achievement("skill", (skill, value))
                 
             # Check for reward based on path
-            if random.random() < reward_chance:
+            if self.reward_rng.random() < reward_chance:
                 self.give_reward()
                 self.stats["rewards_found"] += 1
                 
             # Random chance for buffs on success
-            if random.random() < 0.2:
+            if self.reward_rng.random() < 0.2:
                 buff_types = ["luck", "skill", "mixed", "all"]
-                buff_type = random.choice(buff_types)
-                self.add_buff(f"Victory Surge", buff_type, 1, random.randint(1, 3))
-                
-            # Check for game completion
-            if self.player["level"] >= self.tower_height:
-                self.game_completed()
+                buff_type = self.reward_rng.choice(buff_types)
+                self.add_buff(f"Victory Surge", buff_type, 1, self.reward_rng.randint(1, 3))
                 
             return True
         else:
@@ -775,10 +1594,10 @@ class TowerOfChance:
                               self.colors[self.player["color_theme"]]["failure"])
             
             # Random chance for debuffs on failure
-            if random.random() < 0.3:
+            if self.reward_rng.random() < 0.3:
                 debuff_types = ["luck", "skill", "mixed", "all"]
-                debuff_type = random.choice(debuff_types)
-                self.add_debuff(f"Setback", debuff_type, -1, random.randint(1, 2))
+                debuff_type = self.reward_rng.choice(debuff_types)
+                self.add_debuff(f"Setback", debuff_type, -1, self.reward_rng.randint(1, 2))
                 
             return False
             
@@ -810,82 +1629,21 @@ class TowerOfChance:
         self.print_colored(f"Achievements Earned: {len(self.player['achievements'])}", 
                           self.colors[self.player["color_theme"]]["warning"])
         
-        input("\nPress Enter to return to the main menu...")
-        self.start_game()
+        yield from self.get_input("\nPress Enter to return to the main menu...")
             
     def give_reward(self, force=False):
         """Give the player a random reward"""
         # Different tiers of rewards based on player level
-        basic_rewards = [
-            "Lucky Coin (+1 Luck)",
-            "Strength Potion (+1 Strength)",
-            "Agility Boots (+1 Agility)",
-            "Wisdom Scroll (+1 Wisdom)",
-            "Health Potion (Restore health)",
-            "Magic Map (Reveal next challenge)"
-        ]
+        reward_pool = get_reward_pool(self.player["level"])
         
-        advanced_rewards = [
-            "Fortune's Charm (+2 Luck)",
-            "Giant's Elixir (+2 Strength)",
-            "Wind Walker Boots (+2 Agility)",
-            "Ancient Tome (+2 Wisdom)",
-            "Phoenix Feather (Automatic revival)",
-            "Oracle's Eye (Skip a challenge)"
-        ]
-        
-        legendary_rewards = [
-            "Destiny's Die (+3 to all stats)",
-            "Titan's Heart (Double strength for 3 floors)",
-            "Cosmic Insight (Automatic success on wisdom challenges)",
-            "Fate's Favor (Reroll any failed challenge once)"
-        ]
-        
-        # Select reward tier based on player level
-        if self.player["level"] >= 40:
-            reward_pool = legendary_rewards + advanced_rewards
-        elif self.player["level"] >= 20:
-            reward_pool = advanced_rewards + basic_rewards
-        else:
-            reward_pool = basic_rewards
-        
-        reward = random.choice(reward_pool)
+        reward = self.reward_rng.choice(reward_pool)
         self.player["items"].append(reward)
         
         self.print_colored(f"\nYou found a reward: {reward}", Fore.YELLOW)
         
         # Apply stat bonuses
-        if "Luck" in reward:
-            if "+3" in reward:
-                self.player["skills"]["luck"] += 3
-            elif "+2" in reward:
-                self.player["skills"]["luck"] += 2
-            else:
-                self.player["skills"]["luck"] += 1
-        elif "Strength" in reward:
-            if "+3" in reward:
-                self.player["skills"]["strength"] += 3
-            elif "+2" in reward:
-                self.player["skills"]["strength"] += 2
-            else:
-                self.player["skills"]["strength"] += 1
-        elif "Agility" in reward:
-            if "+3" in reward:
-                self.player["skills"]["agility"] += 3
-            elif "+2" in reward:
-                self.player["skills"]["agility"] += 2
-            else:
-                self.player["skills"]["agility"] += 1
-        elif "Wisdom" in reward:
-            if "+3" in reward:
-                self.player["skills"]["wisdom"] += 3
-            elif "+2" in reward:
-                self.player["skills"]["wisdom"] += 2
-            else:
-                self.player["skills"]["wisdom"] += 1
-        elif "all stats" in reward:
-            for skill in self.player["skills"]:
-                self.player["skills"][skill] += 3
+        for skill, bonus in get_reward_bonus(reward).items():
+            self.player["skills"][skill] += bonus
                 
         # Check for skill achievements after rewards
         for skill, value in self.player["skills"].items():
@@ -893,74 +1651,199 @@ class TowerOfChance:
             
     def show_inventory(self):
         """Display the player's inventory and stats"""
-        self.print_colored("\n=== INVENTORY & STATS ===", Fore.CYAN)
-        self.print_colored(f"Name: {self.player['name']}", Fore.WHITE)
-        self.print_colored(f"Class: {self.player['class']}", Fore.YELLOW)
-        self.print_colored(f"Current Level: {self.player['level']}", Fore.GREEN)
-        self.print_colored(f"Highest Level: {self.player['max_level']}", Fore.YELLOW)
-        
-        self.print_colored("\nSkills:", Fore.CYAN)
-        for skill, value in self.player["skills"].items():
-            self.print_colored(f"  {skill.capitalize()}: {value}", Fore.WHITE)
+        with self.renderer.frame():
+            self.print_colored("\n=== INVENTORY & STATS ===", Fore.CYAN)
+            self.print_colored(f"Name: {self.player['name']}", Fore.WHITE)
+            self.print_colored(f"Class: {self.player['class']}", Fore.YELLOW)
+            self.print_colored(f"Current Level: {self.player['level']}", Fore.GREEN)
+            self.print_colored(f"Highest Level: {self.player['max_level']}", Fore.YELLOW)
+        
+            self.print_colored("\nSkills:", Fore.CYAN)
+            for skill, value in self.player["skills"].items():
+                self.print_colored(f"  {skill.capitalize()}: {value}", Fore.WHITE)
             
-        if self.player["items"]:
-            self.print_colored("\nItems:", Fore.CYAN)
-            for item in self.player["items"]:
-                self.print_colored(f"  - {item}", Fore.WHITE)
-        else:
-            self.print_colored("\nItems: None", Fore.WHITE)
+            if self.player["items"]:
+                self.print_colored("\nItems:", Fore.CYAN)
+                for item in self.player["items"]:
+                    self.print_colored(f"  - {item}", Fore.WHITE)
+            else:
+                self.print_colored("\nItems: None", Fore.WHITE)
             
-        # Show companions
-        self.print_colored("\nCompanions:", Fore.CYAN)
-        if self.player["companions"]:
-            for companion in self.player["companions"]:
-                self.print_colored(f"  - {companion['name']}: {companion['ability']}", Fore.WHITE)
-        else:
-            self.print_colored("  None", Fore.WHITE)
+            # Show companions
+            self.print_colored("\nCompanions:", Fore.CYAN)
+            if self.player["companions"]:
+                for companion in self.player["companions"]:
+                    self.print_colored(f"  - {companion['name']}: {companion['ability']}", Fore.WHITE)
+            else:
+                self.print_colored("  None", Fore.WHITE)
             
-        # Show active effects
-        self.print_colored("\nActive Effects:", Fore.CYAN)
-        if self.player["buffs"] or self.player["debuffs"]:
-            self.show_active_effects()
-        else:
-            self.print_colored("  None", Fore.WHITE)
+            # Show active effects
+            self.print_colored("\nActive Effects:", Fore.CYAN)
+            if self.player["buffs"] or self.player["debuffs"]:
+                self.show_active_effects()
+            else:
+                self.print_colored("  None", Fore.WHITE)
             
-        # Show achievements
-        self.print_colored("\nAchievements:", Fore.CYAN)
-        if self.player["achievements"]:
-            for achievement in self.player["achievements"]:
-                self.print_colored(f"  - {achievement['name']}: {achievement['description']}", Fore.WHITE)
-        else:
-            self.print_colored("  None", Fore.WHITE)
+            # Show achievements
+            self.print_colored("\nAchievements:", Fore.CYAN)
+            if self.player["achievements"]:
+                for achievement in self.player["achievements"]:
+                    self.print_colored(f"  - {achievement['name']}: {achievement['description']}", Fore.WHITE)
+            else:
+                self.print_colored("  None", Fore.WHITE)
             
-        # Show special discoveries
-        self.print_colored("\nSpecial Discoveries:", Fore.CYAN)
+            # Show special discoveries
+            self.print_colored("\nSpecial Discoveries:", Fore.CYAN)
         
-        # Hidden floors
-        if self.player["hidden_floors_found"]:
-            self.print_colored(f"  Hidden Floors Found: {len(self.player['hidden_floors_found'])}", Fore.WHITE)
-        else:
-            self.print_colored("  Hidden Floors Found: 0", Fore.WHITE)
+            # Hidden floors
+            if self.player["hidden_floors_found"]:
+                self.print_colored(f"  Hidden Floors Found: {len(self.player['hidden_floors_found'])}", Fore.WHITE)
+            else:
+                self.print_colored("  Hidden Floors Found: 0", Fore.WHITE)
             
-        # Bosses defeated
-        if self.player["bosses_defeated"]:
-            self.print_colored(f"  Bosses Defeated: {len(self.player['bosses_defeated'])}", Fore.WHITE)
-        else:
-            self.print_colored("  Bosses Defeated: 0", Fore.WHITE)
+            # Bosses defeated
+            if self.player["bosses_defeated"]:
+                self.print_colored(f"  Bosses Defeated: {len(self.player['bosses_defeated'])}", Fore.WHITE)
+            else:
+                self.print_colored("  Bosses Defeated: 0", Fore.WHITE)
             
+    def climb_floor(self):
+        """Attempt the next floor, including any companion encounter on the way"""
+        self.unsaved_changes = True
+        # Random chance to encounter a companion before a challenge
+        config = self.load_config()
+        encounter_chance = config["companion_settings"]["encounter_chance"]
+        max_companions = config["companion_settings"]["max_companions"]
+        
+        if self.companion_rng.random() < encounter_chance and len(self.player["companions"]) < max_companions:
+            yield from self.encounter_companion()
+            self.stats["companions_met"] += 1
+        
+        self.observe("floor", level=self.player["level"], max_level=self.player["max_level"],
+                     tower_height=self.tower_height)
+        result = yield from self.run_challenge()
+        if result:
+            self.stats["challenges_completed"] += 1
+        else:
+            self.stats["challenges_failed"] += 1
+        self.observe("result", success=result, level=self.player["level"], max_level=self.player["max_level"])
+        return result
+        
+    # --- Screen flow ---
+    # Every screen is a flow: it yields each prompt it waits on and returns
+    # the name of the next screen, or None to end the session. start() and
+    # step() advance one prompt at a time, so a caller can feed answers as
+    # they arrive instead of blocking in get_input; run_screens drives them
+    # from the input port. Screens follow each other in a flat loop, so a
+    # session uses the same stack however many towers it completes.
+
+    SCREENS = {
+        "title": "screen_title",
+        "main_menu": "screen_main_menu",
+        "completed": "screen_completed"
+    }
+
+    def start(self, screen="title"):
+        """Begin at a screen and return the first pending prompt, or None if the session ended.
+
+        A prompt is a (text, descriptor) pair, or a SaveFlush for ports that defer flushes.
+        """
+        if screen not in self.SCREENS:
+            raise ValueError(f"Unknown screen {screen!r}, expected one of {list(self.SCREENS)}")
+        self.screen = screen
+        self.flow = getattr(self, self.SCREENS[screen])()
+        self.pending = None
+        return self._advance(None)
+
+    def step(self, answer):
+        """Answer the pending prompt and return the next one, or None if the session ended"""
+        if self.pending is None:
+            raise RuntimeError("No prompt is waiting for an answer")
+        return self._advance(answer)
+
+    def _advance(self, answer):
+        """Run the current flow up to its next prompt, moving on to later screens as they finish"""
+        while True:
+            try:
+                self.pending = self.flow.send(answer)
+                return self.pending
+            except StopIteration as done:
+                screen = done.value
+            if screen is None:
+                self.screen = self.flow = self.pending = None
+                return None
+            if screen not in self.SCREENS:
+                raise ValueError(f"Unknown screen {screen!r}, expected one of {list(self.SCREENS)}")
+            self.screen = screen
+            self.flow = getattr(self, self.SCREENS[screen])()
+            answer = None
+
+    def run_screens(self, screen="title"):
+        """Play from a screen until the session ends, reading answers from the input port"""
+        prompt = self.start(screen)
+        while prompt is not None:
+            text, descriptor = prompt
+            prompt = self.step(self.input_port.read(text, descriptor))
+
+    def start_game(self):
+        """Start the game"""
+        self.run_screens("title")
+
     def game_loop(self):
         """Main game loop"""
-        while True:
-            # Auto-save if enabled
-            self.auto_save()
-            
-            # Update environment (time of day, weather) each turn
-            current_weather = self.get_weather()
-            current_time = self.get_time_of_day()
+        self.run_screens("main_menu")
+
+    def screen_title(self):
+        """Title screen: new game, load game or quit"""
+        self.clear_screen()
+        self.print_title()
+        
+        # Set default color theme
+        if "color_theme" not in self.player or not self.player["color_theme"]:
+            self.player["color_theme"] = "default"
+        
+        self.animate_text("Welcome to the Tower of Chance!", 
+                         self.colors[self.player["color_theme"]]["title"], 0.03)
+        self.print_colored("1. New Game", self.colors[self.player["color_theme"]]["success"])
+        self.print_colored("2. Load Game", self.colors[self.player["color_theme"]]["info"])
+        self.print_colored("3. Quit", self.colors[self.player["color_theme"]]["failure"])
+        
+        choice = yield from self.get_input("\nEnter your choice (1-3): ", "title_menu", ["1", "2", "3"])
+        
+        if choice == "1":
+            # A session may finish several towers; every new one starts from scratch
+            self.reset_state()
+            self.build_environment()
+            yield from self.create_character()
+            yield from self.choose_color_theme()
+            return "main_menu"
+        elif choice == "2":
+            player_name = yield from self.get_input("Enter your character's name: ", "load_name")
+            if (yield from self.load_game(player_name)):
+                return "main_menu"
+        elif choice == "3":
+            # Pending saves reach the disk before we leave
+            yield from self.flush_saves()
+            self.animate_text("Maybe next time!", 
+                             self.colors[self.player["color_theme"]]["title"], 0.03)
+        else:
+            self.print_colored("Invalid choice!", 
+                              self.colors[self.player["color_theme"]]["failure"])
+        return None
             
+    def screen_main_menu(self):
+        """Tower view and main menu; one pass per action"""
+        # Auto-save if enabled
+        self.auto_save()
+        
+        # Update environment (time of day, weather) each turn
+        current_weather = self.get_weather()
+        current_time = self.get_time_of_day()
+        
+        with self.renderer.frame():
             self.display_tower()
-            
-            print("\nWhat would you like to do?")
+        
+            self.print_plain("\nWhat would you like to do?")
             self.print_colored("1. Climb to next floor (challenge)", 
                               self.colors[self.player["color_theme"]]["highlight"])
             self.print_colored("2. View inventory and stats", 
@@ -973,95 +1856,64 @@ class TowerOfChance:
                               self.colors[self.player["color_theme"]]["luck"])
             self.print_colored("6. Change color theme", 
                               self.colors[self.player["color_theme"]]["skill"])
-            self.print_colored("7. Game settings", 
-                              self.colors[self.player["color_theme"]]["highlight"])
-            self.print_colored("8. Challenge editor", 
-                              self.colors[self.player["color_theme"]]["mixed"])
+            if self.editors:
+                self.print_colored("7. Game settings", 
+                                  self.colors[self.player["color_theme"]]["highlight"])
+                self.print_colored("8. Challenge editor", 
+                                  self.colors[self.player["color_theme"]]["mixed"])
             self.print_colored("9. Save game", 
                               self.colors[self.player["color_theme"]]["success"])
             self.print_colored("10. Quit", 
                               self.colors[self.player["color_theme"]]["failure"])
-            
-            choice = input("\nEnter your choice (1-10): ")
-            
-            if choice == "1":
-                # Random chance to encounter a companion before a challenge
-                config = self.load_config()
-                encounter_chance = config["companion_settings"]["encounter_chance"]
-                max_companions = config["companion_settings"]["max_companions"]
-                
-                if random.random() < encounter_chance and len(self.player["companions"]) < max_companions:
-                    self.encounter_companion()
-                    self.stats["companions_met"] += 1
-                
-                result = self.run_challenge()
-                if result:
-                    self.stats["challenges_completed"] += 1
-                else:
-                    self.stats["challenges_failed"] += 1
-                    
-                input("\nPress Enter to continue...")
-            elif choice == "2":
-                self.show_inventory()
-                input("\nPress Enter to continue...")
-            elif choice == "3":
-                self.display_environment()
-                input("\nPress Enter to continue...")
-            elif choice == "4":
-                self.show_achievements()
-                input("\nPress Enter to continue...")
-            elif choice == "5":
-                self.show_progress_visualization()
-            elif choice == "6":
-                self.choose_color_theme()
-            elif choice == "7":
-                self.edit_settings()
-            elif choice == "8":
-                self.challenge_editor()
-            elif choice == "9":
-                self.save_game()
-                input("\nPress Enter to continue...")
-            elif choice == "10":
-                self.clear_screen()
-                self.animate_text("Thanks for playing Tower of Chance!", 
-                                 self.colors[self.player["color_theme"]]["title"])
-                break
-            else:
-                self.print_colored("Invalid choice! Please try again.", 
-                                  self.colors[self.player["color_theme"]]["failure"])
-                
-    def start_game(self):
-        """Start the game"""
-        self.clear_screen()
-        self.print_title()
-        
-        # Set default color theme
-        if "color_theme" not in self.player or not self.player["color_theme"]:
-            self.player["color_theme"] = "default"
-        
-        self.animate_text("Welcome to the Tower of Chance!", 
-                         self.colors[self.player["color_theme"]]["title"], 0.03)
-        self.print_colored("1. New Game", self.colors[self.player["color_theme"]]["success"])
-        self.print_colored("2. Load Game", self.colors[self.player["color_theme"]]["info"])
-        self.print_colored("3. Quit", self.colors[self.player["color_theme"]]["failure"])
         
-        choice = input("\nEnter your choice (1-3): ")
+        choices = [str(i) for i in range(1, 11) if self.editors or i not in (7, 8)]
+        choice = yield from self.get_input("\nEnter your choice (1-10): ", "main_menu", choices,
+                                           level=self.player["level"], tower_height=self.tower_height)
         
         if choice == "1":
-            self.create_character()
-            self.choose_color_theme()
-            self.game_loop()
+            yield from self.climb_floor()
+            if self.player["level"] >= self.tower_height:
+                # The finished tower is saved before the victory screen
+                self.auto_save()
+                return "completed"
+            yield from self.get_input("\nPress Enter to continue...")
         elif choice == "2":
-            player_name = input("Enter your character's name: ")
-            if self.load_game(player_name):
-                self.game_loop()
+            self.show_inventory()
+            yield from self.get_input("\nPress Enter to continue...")
         elif choice == "3":
-            self.animate_text("Maybe next time!", 
-                             self.colors[self.player["color_theme"]]["title"], 0.03)
+            self.display_environment()
+            yield from self.get_input("\nPress Enter to continue...")
+        elif choice == "4":
+            self.show_achievements()
+            yield from self.get_input("\nPress Enter to continue...")
+        elif choice == "5":
+            yield from self.show_progress_visualization()
+        elif choice == "6":
+            yield from self.choose_color_theme()
+        elif choice == "7" and self.editors:
+            yield from self.edit_settings()
+        elif choice == "8" and self.editors:
+            yield from self.challenge_editor()
+        elif choice == "9":
+            yield from self.save_game()
+            yield from self.get_input("\nPress Enter to continue...")
+        elif choice == "10":
+            # Pending saves reach the disk before we leave
+            yield from self.flush_saves()
+            self.clear_screen()
+            self.animate_text("Thanks for playing Tower of Chance!", 
+                             self.colors[self.player["color_theme"]]["title"])
+            return None
         else:
-            self.print_colored("Invalid choice!", 
+            self.print_colored("Invalid choice! Please try again.", 
                               self.colors[self.player["color_theme"]]["failure"])
+        return "main_menu"
             
+    def screen_completed(self):
+        """Victory screen, then back to the title"""
+        yield from self.game_completed()
+        return "title"
+        
     def run_legendary_challenge(self, challenge, modifier=0):
         """Run a legendary challenge that tests the limits of the player's abilities"""
         self.print_colored(f"\n=== {challenge['name']} ===", Fore.RED + Style.BRIGHT)
@@ -1075,12 +1927,12 @@ class TowerOfChance:
             success_chance = 0.3 + (total_skill * 0.02) + (modifier * 0.05)
             success_chance = max(0.1, min(0.9, success_chance))  # Cap between 10% and 90%
             
-            input("Press Enter to embrace the flames...")
+            yield from self.get_input("Press Enter to embrace the flames...")
             
-            if random.random() < success_chance:
+            if self.challenge_rng.random() < success_chance:
                 self.print_colored("\nYou emerge from the flames, stronger than before!", Fore.YELLOW)
                 # Boost a random skill
-                skill = random.choice(list(self.player["skills"].keys()))
+                skill = self.reward_rng.choice(list(self.player["skills"].keys()))
                 self.player["skills"][skill] += 1
                 self.print_colored(f"Your {skill} has increased!", Fore.GREEN)
                 return True
@@ -1090,11 +1942,11 @@ class TowerOfChance:
                 
         elif challenge["name"] == "Titan's Challenge":
             self.print_colored("\nA colossal titan blocks your path. It offers you three trials - strength, wisdom, or chance.", Fore.CYAN)
-            choice = input("Which do you choose? (s/w/c): ").lower()
+            choice = (yield from self.get_input("Which do you choose? (s/w/c): ", "titans_challenge", ["s", "w", "c"])).lower()
             
             if choice == 's':
                 # Strength challenge
-                strength_check = random.random() < (0.3 + self.player["skills"]["strength"] * 0.05 + modifier * 0.05)
+                strength_check = self.challenge_rng.random() < (0.3 + self.player["skills"]["strength"] * 0.05 + modifier * 0.05)
                 if strength_check:
                     self.print_colored("\nYou match the titan's strength, impressing it greatly!", Fore.GREEN)
                     return True
@@ -1103,7 +1955,7 @@ class TowerOfChance:
                     return False
             elif choice == 'w':
                 # Wisdom challenge
-                wisdom_check = random.random() < (0.3 + self.player["skills"]["wisdom"] * 0.05 + modifier * 0.05)
+                wisdom_check = self.challenge_rng.random() < (0.3 + self.player["skills"]["wisdom"] * 0.05 + modifier * 0.05)
                 if wisdom_check:
                     self.print_colored("\nYour wisdom allows you to solve the titan's ancient riddle!", Fore.GREEN)
                     return True
@@ -1112,7 +1964,7 @@ class TowerOfChance:
                     return False
             else:
                 # Chance challenge
-                luck_check = random.random() < (0.3 + self.player["skills"]["luck"] * 0.05 + modifier * 0.05)
+                luck_check = self.challenge_rng.random() < (0.3 + self.player["skills"]["luck"] * 0.05 + modifier * 0.05)
                 if luck_check:
                     self.print_colored("\nFortune favors you in this gamble with the titan!", Fore.GREEN)
                     return True
@@ -1125,21 +1977,22 @@ class TowerOfChance:
             
             # This challenge tests all skills
             elements = ["fire", "water", "earth", "air", "void"]
-            random.shuffle(elements)
+            self.challenge_rng.shuffle(elements)
             
             self.print_colored("\nArrange these elements in harmonious order:", Fore.CYAN)
             for i, element in enumerate(elements):
                 self.print_colored(f"{i+1}. {element}", Fore.WHITE)
                 
             # The player needs to make a choice, but the outcome is influenced by their skills
-            input("\nMeditate on the correct order and press Enter when ready...")
+            yield from self.get_input("\nMeditate on the correct order and press Enter when ready...", "cosmic_harmony",
+                                      elements=elements)
             
             # Calculate success chance based on all skills
             total_skill = sum(self.player["skills"].values())
             success_chance = 0.2 + (total_skill * 0.015) + (modifier * 0.05)
             success_chance = max(0.1, min(0.9, success_chance))  # Cap between 10% and 90%
             
-            if random.random() < success_chance:
+            if self.challenge_rng.random() < success_chance:
                 self.print_colored("\nYou feel the elements align under your guidance!", Fore.GREEN)
                 return True
             else:
@@ -1156,7 +2009,7 @@ class TowerOfChance:
             
             # Luck trial
             self.print_colored("\n--- Trial of Fortune ---", Fore.YELLOW)
-            luck_roll = random.random()
+            luck_roll = self.challenge_rng.random()
             luck_threshold = 0.5 - (self.player["skills"]["luck"] * 0.04) - (modifier * 0.05)
             luck_threshold = max(0.1, min(0.9, luck_threshold))  # Cap between 10% and 90%
             if luck_roll > luck_threshold:
@@ -1167,7 +2020,7 @@ class TowerOfChance:
                 
             # Strength trial
             self.print_colored("\n--- Trial of Power ---", Fore.RED)
-            strength_roll = random.random()
+            strength_roll = self.challenge_rng.random()
             strength_threshold = 0.5 - (self.player["skills"]["strength"] * 0.04) - (modifier * 0.05)
             strength_threshold = max(0.1, min(0.9, strength_threshold))  # Cap between 10% and 90%
             if strength_roll > strength_threshold:
@@ -1178,7 +2031,7 @@ class TowerOfChance:
                 
             # Wisdom trial
             self.print_colored("\n--- Trial of Wisdom ---", Fore.BLUE)
-            wisdom_roll = random.random()
+            wisdom_roll = self.challenge_rng.random()
             wisdom_threshold = 0.5 - (self.player["skills"]["wisdom"] * 0.04) - (modifier * 0.05)
             wisdom_threshold = max(0.1, min(0.9, wisdom_threshold))  # Cap between 10% and 90%
             if wisdom_roll > wisdom_threshold:
@@ -1189,7 +2042,7 @@ class TowerOfChance:
                 
             # Agility trial
             self.print_colored("\n--- Trial of Grace ---", Fore.CYAN)
-            agility_roll = random.random()
+            agility_roll = self.challenge_rng.random()
             agility_threshold = 0.5 - (self.player["skills"]["agility"] * 0.04) - (modifier * 0.05)
             agility_threshold = max(0.1, min(0.9, agility_threshold))  # Cap between 10% and 90%
             if agility_roll > agility_threshold:
@@ -1216,9 +2069,9 @@ class TowerOfChance:
         success_chance = 0.2 + (total_skill * 0.01) + (modifier * 0.05)
         success_chance = max(0.1, min(0.9, success_chance))  # Cap between 10% and 90%
         
-        input("Press Enter to face your destiny...")
+        yield from self.get_input("Press Enter to face your destiny...")
         
-        if random.random() < success_chance:
+        if self.challenge_rng.random() < success_chance:
             self.print_colored("\nAgainst all odds, you triumph!", Fore.GREEN)
             return True
         else:
@@ -1226,59 +2079,15 @@ class TowerOfChance:
             return False
     def get_time_of_day(self):
         """Get the current time of day in the tower"""
-        # Cycle through day and night every 5 floors
-        if self.player["level"] % 10 < 5:
-            return "day"
-        else:
-            return "night"
+        return self.environment.time_of_day(self.player["level"])
             
     def get_weather(self):
         """Determine the current weather in the tower"""
-        # Weather changes every 3 floors
-        weather_seed = self.player["level"] // 3
-        random.seed(weather_seed)
-        
-        weathers = [
-            {"name": "Clear", "effect": "No special effects", "modifier": 0},
-            {"name": "Foggy", "effect": "Reduced visibility affects Wisdom challenges", "modifier": -1},
-            {"name": "Stormy", "effect": "Lightning affects Luck challenges", "modifier": -1},
-            {"name": "Windy", "effect": "Strong winds affect Agility challenges", "modifier": -1},
-            {"name": "Sunny", "effect": "Bright sun boosts all challenges", "modifier": 1},
-            {"name": "Moonlit", "effect": "Mystical moonlight boosts Luck challenges", "modifier": 1}
-        ]
-        
-        weather = random.choice(weathers)
-        # Reset the random seed
-        random.seed()
-        
-        return weather
+        return self.environment.weather(self.player["level"])
         
     def apply_weather_effects(self, challenge_type):
-        """Apply weather effects to challenges"""
-        weather = self.get_weather()
-        time_of_day = self.get_time_of_day()
-        
-        # Apply weather modifiers
-        modifier = 0
-        
-        if weather["name"] == "Foggy" and challenge_type == "skill":
-            modifier += weather["modifier"]
-        elif weather["name"] == "Stormy" and challenge_type == "luck":
-            modifier += weather["modifier"]
-        elif weather["name"] == "Windy" and challenge_type == "mixed":
-            modifier += weather["modifier"]
-        elif weather["name"] == "Sunny":
-            modifier += weather["modifier"]
-        elif weather["name"] == "Moonlit" and challenge_type == "luck":
-            modifier += weather["modifier"]
-            
-        # Apply time of day modifiers
-        if time_of_day == "day" and challenge_type == "skill":
-            modifier += 1
-        elif time_of_day == "night" and challenge_type == "luck":
-            modifier += 1
-            
-        return modifier
+        """Apply weather and time of day effects to challenges"""
+        return self.environment.modifier(self.player["level"], challenge_type)
         
     def display_environment(self):
         """Display the current environment conditions"""
@@ -1411,29 +2220,20 @@ class TowerOfChance:
         
     def encounter_companion(self):
         """Random chance to encounter a companion"""
-        companions = [
-            {"name": "Whiskers the Lucky Cat", "ability": "Improves luck challenges", "type": "luck", "modifier": 1},
-            {"name": "Brutus the Warrior", "ability": "Improves strength-based challenges", "type": "skill", "modifier": 1},
-            {"name": "Zephyr the Wind Spirit", "ability": "Improves agility challenges", "type": "skill", "modifier": 1},
-            {"name": "Athena the Owl", "ability": "Improves wisdom challenges", "type": "skill", "modifier": 1},
-            {"name": "Echo the Fairy", "ability": "Improves all challenges slightly", "type": "all", "modifier": 1},
-            {"name": "Shadow the Rogue", "ability": "Improves mixed challenges", "type": "mixed", "modifier": 1},
-            {"name": "Luna the Mystic", "ability": "Improves night-time challenges", "type": "all", "modifier": 1}
-        ]
-        
         # Filter out companions the player already has
-        available_companions = [c for c in companions if c["name"] not in [pc["name"] for pc in self.player["companions"]]]
+        available_companions = [c for c in COMPANIONS if c["name"] not in [pc["name"] for pc in self.player["companions"]]]
         
         if not available_companions:
             return False
             
-        companion = random.choice(available_companions)
+        companion = self.companion_rng.choice(available_companions)
         
         self.print_colored(f"\nYou encounter {companion['name']}!", Fore.CYAN)
         self.print_colored(f"{companion['name']} offers to join your journey.", Fore.WHITE)
         self.print_colored(f"Ability: {companion['ability']}", Fore.YELLOW)
         
-        choice = input("\nAccept their help? (y/n): ").lower()
+        choice = (yield from self.get_input("\nAccept their help? (y/n): ", "companion", ["y", "n"],
+                                            companion=companion["name"])).lower()
         
         if choice == 'y':
             self.add_companion(companion)
@@ -1445,7 +2245,7 @@ class TowerOfChance:
     def present_branching_path(self):
         """Present the player with a choice of paths"""
         # Only present branching paths occasionally
-        if self.player["level"] % 5 != 0:
+        if self.player["level"] % self.load_config()["challenge_settings"]["checkpoint_frequency"] != 0:
             return False
             
         self.print_colored("\n=== BRANCHING PATH ===", Fore.MAGENTA)
@@ -1458,7 +2258,7 @@ class TowerOfChance:
         paths.append({
             "name": "Standard Path",
             "description": "A balanced challenge awaits.",
-            "challenge_type": random.choice(["luck", "skill", "mixed"]),
+            "challenge_type": self.challenge_rng.choice(["luck", "skill", "mixed"]),
             "difficulty_mod": 0,
             "reward_chance": 0.3
         })
@@ -1467,7 +2267,7 @@ class TowerOfChance:
         paths.append({
             "name": "Treacherous Path",
             "description": "A difficult challenge with greater rewards.",
-            "challenge_type": random.choice(["luck", "skill", "mixed"]),
+            "challenge_type": self.challenge_rng.choice(["luck", "skill", "mixed"]),
             "difficulty_mod": 2,
             "reward_chance": 0.6
         })
@@ -1476,13 +2276,13 @@ class TowerOfChance:
         paths.append({
             "name": "Safe Path",
             "description": "An easier challenge with fewer rewards.",
-            "challenge_type": random.choice(["luck", "skill", "mixed"]),
+            "challenge_type": self.challenge_rng.choice(["luck", "skill", "mixed"]),
             "difficulty_mod": -1,
             "reward_chance": 0.1
         })
         
         # Add a special path occasionally
-        if random.random() < 0.3:
+        if self.challenge_rng.random() < 0.3:
             special_paths = [
                 {
                     "name": "Mysterious Portal",
@@ -1494,7 +2294,7 @@ class TowerOfChance:
                 {
                     "name": "Companion's Trail",
                     "description": "You might find a new ally here.",
-                    "challenge_type": random.choice(["luck", "skill", "mixed"]),
+                    "challenge_type": self.challenge_rng.choice(["luck", "skill", "mixed"]),
                     "difficulty_mod": 0,
                     "reward_chance": 0.2,
                     "companion_chance": 0.8
@@ -1509,7 +2309,7 @@ class TowerOfChance:
                     "debuff_chance": 0.3
                 }
             ]
-            paths.append(random.choice(special_paths))
+            paths.append(self.challenge_rng.choice(special_paths))
             
         # Display path options
         for i, path in enumerate(paths):
@@ -1517,7 +2317,9 @@ class TowerOfChance:
             self.print_colored(f"   {path['description']}", Fore.WHITE)
             
         # Get player choice
-        choice = input("\nWhich path will you take? (1-3): ")
+        choice = yield from self.get_input("\nWhich path will you take? (1-3): ", "branching_path",
+                                           [str(i + 1) for i in range(len(paths))],
+                                           paths=[path["name"] for path in paths])
         try:
             path_idx = int(choice) - 1
             if 0 <= path_idx < len(paths):
@@ -1525,18 +2327,18 @@ class TowerOfChance:
                 self.print_colored(f"\nYou take the {chosen_path['name']}.", Fore.CYAN)
                 
                 # Handle special path effects
-                if "companion_chance" in chosen_path and random.random() < chosen_path["companion_chance"]:
-                    self.encounter_companion()
+                if "companion_chance" in chosen_path and self.companion_rng.random() < chosen_path["companion_chance"]:
+                    yield from self.encounter_companion()
                     
-                if "buff_chance" in chosen_path and random.random() < chosen_path["buff_chance"]:
+                if "buff_chance" in chosen_path and self.reward_rng.random() < chosen_path["buff_chance"]:
                     buff_types = ["luck", "skill", "mixed", "all"]
-                    buff_type = random.choice(buff_types)
-                    self.add_buff(f"Shrine Blessing", buff_type, random.randint(1, 2), random.randint(2, 5))
+                    buff_type = self.reward_rng.choice(buff_types)
+                    self.add_buff(f"Shrine Blessing", buff_type, self.reward_rng.randint(1, 2), self.reward_rng.randint(2, 5))
                     
-                if "debuff_chance" in chosen_path and random.random() < chosen_path["debuff_chance"]:
+                if "debuff_chance" in chosen_path and self.reward_rng.random() < chosen_path["debuff_chance"]:
                     debuff_types = ["luck", "skill", "mixed", "all"]
-                    debuff_type = random.choice(debuff_types)
-                    self.add_debuff(f"Shrine Curse", debuff_type, -random.randint(1, 2), random.randint(1, 3))
+                    debuff_type = self.reward_rng.choice(debuff_types)
+                    self.add_debuff(f"Shrine Curse", debuff_type, -self.reward_rng.randint(1, 2), self.reward_rng.randint(1, 3))
                     
                 return chosen_path
             else:
@@ -1548,32 +2350,29 @@ class TowerOfChance:
     def create_character(self):
         """Create a new character"""
         self.print_colored("=== Character Creation ===", Fore.CYAN)
-        self.player["name"] = input("Enter your adventurer's name: ")
+        while True:
+            name = yield from self.get_input("Enter your adventurer's name: ", "character_name")
+            # The name is also the save's file name
+            if valid_save_name(name):
+                break
+            self.print_colored("Names can have up to 32 letters, digits, '_' and '-'.", Fore.RED)
+        self.player["name"] = name
         
         # Character class selection
         self.print_colored("\nChoose your character class:", Fore.CYAN)
-        classes = [
-            {"name": "Lucky Gambler", "description": "Born under a lucky star, you have a natural affinity for games of chance.", 
-             "skills": {"luck": 3, "strength": 1, "agility": 1, "wisdom": 1}},
-            {"name": "Mighty Warrior", "description": "Trained in the art of combat, your physical prowess is unmatched.", 
-             "skills": {"luck": 1, "strength": 3, "agility": 1, "wisdom": 1}},
-            {"name": "Swift Acrobat", "description": "Your nimble movements and quick reflexes keep you one step ahead.", 
-             "skills": {"luck": 1, "strength": 1, "agility": 3, "wisdom": 1}},
-            {"name": "Wise Sage", "description": "Years of study have granted you knowledge beyond your years.", 
-             "skills": {"luck": 1, "strength": 1, "agility": 1, "wisdom": 3}},
-            {"name": "Balanced Adventurer", "description": "A jack of all trades, you prefer a balanced approach to challenges.", 
-             "skills": {"luck": 2, "strength": 2, "agility": 1, "wisdom": 1}}
-        ]
+        classes = CHARACTER_CLASSES
         
         for i, char_class in enumerate(classes):
             self.print_colored(f"{i+1}. {char_class['name']}", Fore.YELLOW)
             self.print_colored(f"   {char_class['description']}", Fore.WHITE)
             skill_str = ", ".join([f"{skill.capitalize()}: {value}" for skill, value in char_class['skills'].items()])
             self.print_colored(f"   Skills: {skill_str}", Fore.CYAN)
-            print()
+            self.print_plain()
             
         while True:
-            choice = input("Select your class (1-5): ")
+            choice = yield from self.get_input("Select your class (1-5): ", "character_class",
+                                               [str(i + 1) for i in range(len(classes))],
+                                               classes=[char_class["name"] for char_class in classes])
             try:
                 class_idx = int(choice) - 1
                 if 0 <= class_idx < len(classes):
@@ -1595,12 +2394,14 @@ class TowerOfChance:
         while points > 0:
             self.print_colored(f"Points remaining: {points}", Fore.YELLOW)
             for i, skill in enumerate(self.player["skills"].keys()):
-                print(f"{i+1}. {skill.capitalize()}: {self.player['skills'][skill]}")
+                self.print_plain(f"{i+1}. {skill.capitalize()}: {self.player['skills'][skill]}")
             
-            choice = input("\nWhich skill to improve? (1-4): ")
+            skills = list(self.player["skills"].keys())
+            choice = yield from self.get_input("\nWhich skill to improve? (1-4): ", "skill_point",
+                                               [str(i + 1) for i in range(len(skills))],
+                                               skills=skills, points=points)
             try:
                 skill_idx = int(choice) - 1
-                skills = list(self.player["skills"].keys())
                 if 0 <= skill_idx < len(skills):
                     self.player["skills"][skills[skill_idx]] += 1
                     points -= 1
@@ -1610,6 +2411,7 @@ class TowerOfChance:
                 self.print_colored("Please enter a number!", Fore.RED)
         
         self.print_colored(f"\nCharacter created! Welcome, {self.player['name']} the {self.player['class']}!", Fore.GREEN)
+        self.unsaved_changes = True
         
     def choose_color_theme(self):
         """Allow player to choose a color theme"""
@@ -1627,13 +2429,15 @@ class TowerOfChance:
         while True:
             # The input prompt should also be themed using the current theme
             prompt_text = f"\nSelect a theme (1-{len(themes)}): "
-            choice = input(f"{current_theme_colors['info']}{prompt_text}{Style.RESET_ALL}")
+            choice = yield from self.get_input(f"{current_theme_colors['info']}{prompt_text}{Style.RESET_ALL}", "color_theme",
+                                               [str(i + 1) for i in range(len(themes))], themes=themes)
             
             try:
                 theme_idx = int(choice) - 1
                 if 0 <= theme_idx < len(themes):
                     selected_theme_name = themes[theme_idx]
                     self.player["color_theme"] = selected_theme_name
+                    self.unsaved_changes = True
                     # Confirmation message should use the NEWLY selected theme's success color
                     self.print_colored(f"\nYou've selected the {selected_theme_name.capitalize()} theme!", 
                                       self.colors[selected_theme_name]["success"])
@@ -1644,72 +2448,33 @@ class TowerOfChance:
             except ValueError:
                 self.print_colored("Please enter a number!", current_theme_colors["failure"])
                 
-        time.sleep(1) # Pause to let the user see the confirmation
+        self.pause(1) # Pause to let the user see the confirmation
         
     def check_for_achievement(self, achievement_type, value=None):
         """Check if player has earned an achievement"""
-        achievements = {
-            "level": [
-                {"id": "novice", "name": "Novice Climber", "description": "Reach floor 10", "threshold": 10},
-                {"id": "apprentice", "name": "Apprentice Climber", "description": "Reach floor 25", "threshold": 25},
-                {"id": "adept", "name": "Adept Climber", "description": "Reach floor 50", "threshold": 50},
-                {"id": "master", "name": "Master Climber", "description": "Reach floor 75", "threshold": 75},
-                {"id": "grandmaster", "name": "Grandmaster Climber", "description": "Reach floor 100", "threshold": 100}
-            ],
-            "skill": [
-                {"id": "lucky", "name": "Child of Fortune", "description": "Reach 10 Luck", "skill": "luck", "threshold": 10},
-                {"id": "strong", "name": "Herculean Strength", "description": "Reach 10 Strength", "skill": "strength", "threshold": 10},
-                {"id": "agile", "name": "Lightning Reflexes", "description": "Reach 10 Agility", "skill": "agility", "threshold": 10},
-                {"id": "wise", "name": "Sage's Wisdom", "description": "Reach 10 Wisdom", "skill": "wisdom", "threshold": 10}
-            ],
-            "companions": [
-                {"id": "friend", "name": "Friendly Face", "description": "Recruit your first companion", "threshold": 1},
-                {"id": "party", "name": "Party Leader", "description": "Recruit 3 companions", "threshold": 3}
-            ],
-            "boss": [
-                {"id": "boss_slayer", "name": "Boss Slayer", "description": "Defeat your first boss", "threshold": 1},
-                {"id": "boss_master", "name": "Boss Master", "description": "Defeat 5 bosses", "threshold": 5}
-            ],
-            "hidden": [
-                {"id": "explorer", "name": "Explorer", "description": "Discover your first hidden floor", "threshold": 1},
-                {"id": "treasure_hunter", "name": "Treasure Hunter", "description": "Discover 3 hidden floors", "threshold": 3}
-            ]
-        }
-        
-        # Check for achievements based on type
-        if achievement_type == "level" and value is None:
-            value = self.player["level"]
-            for achievement in achievements["level"]:
-                if value >= achievement["threshold"] and achievement["id"] not in [a["id"] for a in self.player["achievements"]]:
-                    self.award_achievement(achievement)
-                    
-        elif achievement_type == "skill" and value is not None:
-            skill, skill_value = value
-            for achievement in achievements["skill"]:
-                if achievement["skill"] == skill and skill_value >= achievement["threshold"] and achievement["id"] not in [a["id"] for a in self.player["achievements"]]:
-                    self.award_achievement(achievement)
-                    
-        elif achievement_type == "companions" and value is None:
-            value = len(self.player["companions"])
-            for achievement in achievements["companions"]:
-                if value >= achievement["threshold"] and achievement["id"] not in [a["id"] for a in self.player["achievements"]]:
-                    self.award_achievement(achievement)
-                    
-        elif achievement_type == "boss" and value is None:
-            value = len(self.player["bosses_defeated"])
-            for achievement in achievements["boss"]:
-                if value >= achievement["threshold"] and achievement["id"] not in [a["id"] for a in self.player["achievements"]]:
-                    self.award_achievement(achievement)
-                    
-        elif achievement_type == "hidden" and value is None:
-            value = len(self.player["hidden_floors_found"])
-            for achievement in achievements["hidden"]:
-                if value >= achievement["threshold"] and achievement["id"] not in [a["id"] for a in self.player["achievements"]]:
-                    self.award_achievement(achievement)
+        skill = None
+        if achievement_type == "skill":
+            if value is None:
+                return
+            skill, value = value
+        elif value is None:
+            progress = {
+                "level": self.player["level"],
+                "companions": len(self.player["companions"]),
+                "boss": len(self.player["bosses_defeated"]),
+                "hidden": len(self.player["hidden_floors_found"])
+            }
+            if achievement_type not in progress:
+                return
+            value = progress[achievement_type]
+            
+        for achievement in self.achievement_engine.check(achievement_type, value, skill):
+            self.award_achievement(achievement)
                     
     def award_achievement(self, achievement):
         """Award an achievement to the player"""
         self.player["achievements"].append(achievement)
+        self.achievement_engine.earned.add(achievement["id"])
         
         # Display achievement notification with animation
         self.clear_screen()
@@ -1723,15 +2488,15 @@ class TowerOfChance:
         # Award bonus for achievement
         self.print_colored("\nYou've earned a small bonus for this achievement!", 
                           self.colors[self.player["color_theme"]]["success"])
-        skill = random.choice(list(self.player["skills"].keys()))
+        skill = self.reward_rng.choice(list(self.player["skills"].keys()))
         self.player["skills"][skill] += 1
         self.print_colored(f"Your {skill} has increased by 1!", 
                           self.colors[self.player["color_theme"]]["highlight"])
         
         # Play sound effect if available
-        print("\a")  # Terminal bell
+        self.print_plain("\a")  # Terminal bell
         
-        time.sleep(2)
+        self.pause(2)
         
     def show_achievements(self):
         """Display the player's achievements"""
@@ -1755,18 +2520,18 @@ class TowerOfChance:
             
         # Wisdom affects chance of finding hidden floors
         wisdom_bonus = self.player["skills"]["wisdom"] * 0.05
-        if random.random() < (0.2 + wisdom_bonus):
+        if self.challenge_rng.random() < (0.2 + wisdom_bonus):
             self.clear_screen()
             self.print_ascii_art("hidden", self.colors[self.player["color_theme"]]["highlight"])
             
             self.animate_text("You notice a concealed passage that seems to lead to a secret area!", 
                              self.colors[self.player["color_theme"]]["highlight"])
-            choice = input("Do you want to explore it? (y/n): ").lower()
+            choice = (yield from self.get_input("Do you want to explore it? (y/n): ", "hidden_floor", ["y", "n"])).lower()
             
             if choice == 'y':
                 self.player["hidden_floors_found"].append(self.player["level"])
                 self.stats["hidden_floors"] += 1
-                self.run_hidden_floor()
+                yield from self.run_hidden_floor()
                 self.check_for_achievement("hidden")
                 return True
                 
@@ -1782,7 +2547,7 @@ class TowerOfChance:
             {"name": "Whispering Gallery", "description": "A circular room where whispers echo endlessly"}
         ]
         
-        challenge = random.choice(hidden_challenges)
+        challenge = self.challenge_rng.choice(hidden_challenges)
         
         self.print_colored(f"\n=== {challenge['name']} ===", Fore.MAGENTA)
         self.print_colored(challenge["description"], Fore.WHITE)
@@ -1792,14 +2557,14 @@ class TowerOfChance:
         self.give_reward(True)  # Force a reward
         
         # Chance for additional bonuses
-        if random.random() < 0.5:
+        if self.reward_rng.random() < 0.5:
             buff_types = ["luck", "skill", "mixed", "all"]
-            buff_type = random.choice(buff_types)
-            self.add_buff(f"Hidden Blessing", buff_type, 2, random.randint(3, 6))
+            buff_type = self.reward_rng.choice(buff_types)
+            self.add_buff(f"Hidden Blessing", buff_type, 2, self.reward_rng.randint(3, 6))
             
         # Chance to find a companion
-        if random.random() < 0.3 and len(self.player["companions"]) < 3:
-            self.encounter_companion()
+        if self.companion_rng.random() < 0.3 and len(self.player["companions"]) < 3:
+            yield from self.encounter_companion()
             
     def check_for_boss_floor(self):
         """Check if the current floor has a boss challenge"""
@@ -1846,6 +2611,8 @@ class TowerOfChance:
         
         # Update stats
         self.stats["bosses_faced"] += 1
+        self.observe("challenge", challenge_type="boss", name=boss["name"], description=boss["description"],
+                     difficulty=None, path=None, modifier=0)
         
         # Boss challenges are multi-stage
         stages_completed = 0
@@ -1854,13 +2621,13 @@ class TowerOfChance:
         self.print_colored("\nThe boss challenge has multiple stages. You must complete most of them to succeed.", 
                           self.colors[self.player["color_theme"]]["highlight"])
         
-        input("\nPress Enter to begin the challenge...")
+        yield from self.get_input("\nPress Enter to begin the challenge...")
         
         # Stage 1: Skill challenge
         self.clear_screen()
         self.print_colored("\n=== STAGE 1: SKILL TEST ===", 
                           self.colors[self.player["color_theme"]]["skill"])
-        skill_result = self.run_skill_challenge(random.choice(self.challenges["skill"]), 0)
+        skill_result = yield from self.run_skill_challenge(self.challenge_rng.choice(self.challenges["skill"]), 0)
         if skill_result:
             stages_completed += 1
             self.print_colored("You passed the skill test!", 
@@ -1869,13 +2636,13 @@ class TowerOfChance:
             self.print_colored("You failed the skill test!", 
                               self.colors[self.player["color_theme"]]["failure"])
             
-        input("\nPress Enter to continue...")
+        yield from self.get_input("\nPress Enter to continue...")
             
         # Stage 2: Luck challenge
         self.clear_screen()
         self.print_colored("\n=== STAGE 2: LUCK TEST ===", 
                           self.colors[self.player["color_theme"]]["luck"])
-        luck_result = self.run_luck_challenge(random.choice(self.challenges["luck"]), 0)
+        luck_result = yield from self.run_luck_challenge(self.challenge_rng.choice(self.challenges["luck"]), 0)
         if luck_result:
             stages_completed += 1
             self.print_colored("You passed the luck test!", 
@@ -1884,13 +2651,13 @@ class TowerOfChance:
             self.print_colored("You failed the luck test!", 
                               self.colors[self.player["color_theme"]]["failure"])
             
-        input("\nPress Enter to continue...")
+        yield from self.get_input("\nPress Enter to continue...")
             
         # Stage 3: Mixed challenge
         self.clear_screen()
         self.print_colored("\n=== STAGE 3: COMBINED TEST ===", 
                           self.colors[self.player["color_theme"]]["mixed"])
-        mixed_result = self.run_mixed_challenge(random.choice(self.challenges["mixed"]), 0)
+        mixed_result = yield from self.run_mixed_challenge(self.challenge_rng.choice(self.challenges["mixed"]), 0)
         if mixed_result:
             stages_completed += 1
             self.print_colored("You passed the combined test!", 
@@ -1899,7 +2666,7 @@ class TowerOfChance:
             self.print_colored("You failed the combined test!", 
                               self.colors[self.player["color_theme"]]["failure"])
             
-        input("\nPress Enter to see the results...")
+        yield from self.get_input("\nPress Enter to see the results...")
         self.clear_screen()
             
         # Final result
@@ -1921,7 +2688,7 @@ class TowerOfChance:
             self.give_reward(True)  # Force a reward
             
             # Chance for a powerful buff
-            if random.random() < 0.7:
+            if self.reward_rng.random() < 0.7:
                 self.add_buff("Boss Slayer", "all", 2, 5)
                 
             return True
@@ -1949,14 +2716,14 @@ class TowerOfChance:
             {"name": "Simon Says", "function": self.mini_game_simon_says}
         ]
         
-        mini_game = random.choice(mini_games)
+        mini_game = self.challenge_rng.choice(mini_games)
         
         self.clear_screen()
         self.print_colored(f"\n=== MINI-GAME: {mini_game['name']} ===", 
                           self.colors[self.player["color_theme"]]["title"])
         
         self.stats["mini_games_played"] += 1
-        result = mini_game["function"]()
+        result = yield from mini_game["function"]()
         
         if result:
             self.print_colored("\nYou won the mini-game!", 
@@ -1965,7 +2732,7 @@ class TowerOfChance:
             self.stats["mini_games_won"] += 1
             
             # Small reward for winning mini-games
-            skill = random.choice(list(self.player["skills"].keys()))
+            skill = self.reward_rng.choice(list(self.player["skills"].keys()))
             self.player["skills"][skill] += 1
             self.print_colored(f"Your {skill} has increased by 1!", 
                               self.colors[self.player["color_theme"]]["highlight"])
@@ -1974,17 +2741,17 @@ class TowerOfChance:
                               self.colors[self.player["color_theme"]]["failure"])
             self.play_sound("failure")
             
-        input("\nPress Enter to continue...")
+        yield from self.get_input("\nPress Enter to continue...")
         return result
         
     def mini_game_word_scramble(self):
         """Word scramble mini-game"""
         words = ["tower", "chance", "adventure", "challenge", "destiny", "fortune", "journey", "quest", "skill", "luck"]
-        word = random.choice(words)
+        word = self.challenge_rng.choice(words)
         
         # Scramble the word
         letters = list(word)
-        random.shuffle(letters)
+        self.challenge_rng.shuffle(letters)
         scrambled = ''.join(letters)
         
         self.print_colored("Unscramble the following word:", Fore.YELLOW)
@@ -1996,11 +2763,10 @@ class TowerOfChance:
         
         self.print_colored(f"You have {time_limit} seconds to answer.", Fore.YELLOW)
         
-        start_time = time.time()
-        guess = input("Your answer: ").lower().strip()
-        end_time = time.time()
+        guess = (yield from self.get_input("Your answer: ", "word_scramble", scrambled=scrambled)).lower().strip()
+        answer_time = time.time() - self.prompt_shown_at
         
-        if guess == word and (end_time - start_time) <= time_limit:
+        if guess == word and answer_time <= time_limit:
             return True
         else:
             self.print_colored(f"The correct answer was: {word}", Fore.RED)
@@ -2012,14 +2778,15 @@ class TowerOfChance:
         max_number = 20 - (self.player["skills"]["luck"] - 1)
         max_number = max(10, max_number)  # Minimum 10
         
-        number = random.randint(1, max_number)
+        number = self.challenge_rng.randint(1, max_number)
         
         self.print_colored(f"I'm thinking of a number between 1 and {max_number}.", Fore.YELLOW)
         self.print_colored("You have 3 guesses.", Fore.YELLOW)
         
         for i in range(3):
             try:
-                guess = int(input(f"Guess {i+1}: "))
+                guess = int((yield from self.get_input(f"Guess {i+1}: ", "number_guess", [str(n) for n in range(1, max_number + 1)],
+                                                       attempt=i + 1, low=1, high=max_number)))
                 
                 if guess == number:
                     return True
@@ -2044,7 +2811,8 @@ class TowerOfChance:
         while player_wins < 2 and computer_wins < 2:
             self.print_colored(f"\nScore: You {player_wins} - {computer_wins} Computer", Fore.CYAN)
             
-            player_choice = input("Choose rock, paper, or scissors (r/p/s): ").lower()
+            player_choice = (yield from self.get_input("Choose rock, paper, or scissors (r/p/s): ", "rock_paper_scissors",
+                                                       ["r", "p", "s"], wins=player_wins, losses=computer_wins)).lower()
             if player_choice.startswith('r'):
                 player_choice = "rock"
             elif player_choice.startswith('p'):
@@ -2055,7 +2823,7 @@ class TowerOfChance:
                 self.print_colored("Invalid choice! Please choose r, p, or s.", Fore.RED)
                 continue
                 
-            computer_choice = random.choice(choices)
+            computer_choice = self.challenge_rng.choice(choices)
             
             self.print_colored(f"You chose {player_choice}.", Fore.YELLOW)
             self.print_colored(f"Computer chose {computer_choice}.", Fore.YELLOW)
@@ -2081,168 +2849,115 @@ class TowerOfChance:
         sequence_length = 4 + (self.player["skills"]["agility"] // 3)
         
         colors = ["red", "green", "blue", "yellow"]
-        sequence = [random.choice(colors) for _ in range(sequence_length)]
+        sequence = [self.challenge_rng.choice(colors) for _ in range(sequence_length)]
         
         # Show sequence
         for color in sequence:
             self.print_colored(f"Simon says: {color.upper()}", Fore.YELLOW)
-            time.sleep(1)
-            os.system('cls' if os.name == 'nt' else 'clear')
-            time.sleep(0.5)
+            self.pause(1)
+            self.clear_screen()
+            self.pause(0.5)
             
         # Get player's sequence
         self.print_colored("Enter the sequence (space-separated colors):", Fore.CYAN)
-        player_sequence = input().lower().split()
+        player_sequence = (yield from self.get_input(prompt_id="simon_says", shown=sequence)).lower().split()
         
         return player_sequence == sequence
     # Removed duplicated choose_color_theme method. The version at line 999 is kept.
     def show_progress_visualization(self):
         """Show a visual representation of the player's progress"""
         self.clear_screen()
-        self.print_colored("=== YOUR JOURNEY SO FAR ===", 
-                          self.colors[self.player["color_theme"]]["title"])
+        with self.renderer.frame():
+            self.print_colored("=== YOUR JOURNEY SO FAR ===", 
+                              self.colors[self.player["color_theme"]]["title"])
         
-        # Create a progress bar for tower climbing
-        progress = self.player["max_level"] / self.tower_height
-        bar_length = 40
-        filled_length = int(bar_length * progress)
-        bar = '█' * filled_length + '░' * (bar_length - filled_length)
+            # Create a progress bar for tower climbing
+            progress = self.player["max_level"] / self.tower_height
+            bar_length = 40
+            filled_length = int(bar_length * progress)
+            bar = '█' * filled_length + '░' * (bar_length - filled_length)
         
-        self.print_colored(f"Tower Progress: {self.player['max_level']}/{self.tower_height}", 
-                          self.colors[self.player["color_theme"]]["highlight"])
-        self.print_colored(f"[{bar}] {progress:.1%}", 
-                          self.colors[self.player["color_theme"]]["info"])
+            self.print_colored(f"Tower Progress: {self.player['max_level']}/{self.tower_height}", 
+                              self.colors[self.player["color_theme"]]["highlight"])
+            self.print_colored(f"[{bar}] {progress:.1%}", 
+                              self.colors[self.player["color_theme"]]["info"])
         
-        # Show challenge statistics
-        if self.stats["challenges_completed"] > 0:
-            total_challenges = self.stats["challenges_completed"] + self.stats["challenges_failed"]
-            success_rate = self.stats["challenges_completed"] / total_challenges if total_challenges > 0 else 0
+            # Show challenge statistics
+            if self.stats["challenges_completed"] > 0:
+                total_challenges = self.stats["challenges_completed"] + self.stats["challenges_failed"]
+                success_rate = self.stats["challenges_completed"] / total_challenges if total_challenges > 0 else 0
             
-            self.print_colored("\n=== CHALLENGE STATISTICS ===", 
-                              self.colors[self.player["color_theme"]]["title"])
-            self.print_colored(f"Challenges Completed: {self.stats['challenges_completed']}", 
-                              self.colors[self.player["color_theme"]]["success"])
-            self.print_colored(f"Challenges Failed: {self.stats['challenges_failed']}", 
-                              self.colors[self.player["color_theme"]]["failure"])
-            self.print_colored(f"Success Rate: {success_rate:.1%}", 
-                              self.colors[self.player["color_theme"]]["info"])
+                self.print_colored("\n=== CHALLENGE STATISTICS ===", 
+                                  self.colors[self.player["color_theme"]]["title"])
+                self.print_colored(f"Challenges Completed: {self.stats['challenges_completed']}", 
+                                  self.colors[self.player["color_theme"]]["success"])
+                self.print_colored(f"Challenges Failed: {self.stats['challenges_failed']}", 
+                                  self.colors[self.player["color_theme"]]["failure"])
+                self.print_colored(f"Success Rate: {success_rate:.1%}", 
+                                  self.colors[self.player["color_theme"]]["info"])
             
-            # Challenge type breakdown
-            self.print_colored("\nChallenge Types:", 
+                # Challenge type breakdown
+                self.print_colored("\nChallenge Types:", 
+                                  self.colors[self.player["color_theme"]]["highlight"])
+                self.print_colored(f"Luck: {self.stats['luck_challenges']}", 
+                                  self.colors[self.player["color_theme"]]["luck"])
+                self.print_colored(f"Skill: {self.stats['skill_challenges']}", 
+                                  self.colors[self.player["color_theme"]]["skill"])
+                self.print_colored(f"Mixed: {self.stats['mixed_challenges']}", 
+                                  self.colors[self.player["color_theme"]]["mixed"])
+                self.print_colored(f"Legendary: {self.stats['legendary_challenges']}", 
+                                  self.colors[self.player["color_theme"]]["legendary"])
+            
+            # Show special discoveries
+            self.print_colored("\n=== SPECIAL DISCOVERIES ===", 
+                              self.colors[self.player["color_theme"]]["title"])
+            self.print_colored(f"Hidden Floors Found: {len(self.player['hidden_floors_found'])}/{self.tower_height//7}", 
                               self.colors[self.player["color_theme"]]["highlight"])
-            self.print_colored(f"Luck: {self.stats['luck_challenges']}", 
-                              self.colors[self.player["color_theme"]]["luck"])
-            self.print_colored(f"Skill: {self.stats['skill_challenges']}", 
-                              self.colors[self.player["color_theme"]]["skill"])
-            self.print_colored(f"Mixed: {self.stats['mixed_challenges']}", 
-                              self.colors[self.player["color_theme"]]["mixed"])
-            self.print_colored(f"Legendary: {self.stats['legendary_challenges']}", 
-                              self.colors[self.player["color_theme"]]["legendary"])
-            
-        # Show special discoveries
-        self.print_colored("\n=== SPECIAL DISCOVERIES ===", 
-                          self.colors[self.player["color_theme"]]["title"])
-        self.print_colored(f"Hidden Floors Found: {len(self.player['hidden_floors_found'])}/{self.tower_height//7}", 
-                          self.colors[self.player["color_theme"]]["highlight"])
-        self.print_colored(f"Bosses Defeated: {len(self.player['bosses_defeated'])}/{self.tower_height//10}", 
-                          self.colors[self.player["color_theme"]]["warning"])
-        self.print_colored(f"Companions Met: {self.stats['companions_met']}", 
-                          self.colors[self.player["color_theme"]]["info"])
-        self.print_colored(f"Rewards Found: {self.stats['rewards_found']}", 
-                          self.colors[self.player["color_theme"]]["success"])
-        
-        # Mini-game statistics
-        if self.stats["mini_games_played"] > 0:
-            mini_game_win_rate = self.stats["mini_games_won"] / self.stats["mini_games_played"]
-            self.print_colored(f"Mini-Games Played: {self.stats['mini_games_played']}", 
+            self.print_colored(f"Bosses Defeated: {len(self.player['bosses_defeated'])}/{self.tower_height//10}", 
+                              self.colors[self.player["color_theme"]]["warning"])
+            self.print_colored(f"Companions Met: {self.stats['companions_met']}", 
                               self.colors[self.player["color_theme"]]["info"])
-            self.print_colored(f"Mini-Games Won: {self.stats['mini_games_won']}", 
+            self.print_colored(f"Rewards Found: {self.stats['rewards_found']}", 
                               self.colors[self.player["color_theme"]]["success"])
-            self.print_colored(f"Mini-Game Win Rate: {mini_game_win_rate:.1%}", 
-                              self.colors[self.player["color_theme"]]["highlight"])
+        
+            # Mini-game statistics
+            if self.stats["mini_games_played"] > 0:
+                mini_game_win_rate = self.stats["mini_games_won"] / self.stats["mini_games_played"]
+                self.print_colored(f"Mini-Games Played: {self.stats['mini_games_played']}", 
+                                  self.colors[self.player["color_theme"]]["info"])
+                self.print_colored(f"Mini-Games Won: {self.stats['mini_games_won']}", 
+                                  self.colors[self.player["color_theme"]]["success"])
+                self.print_colored(f"Mini-Game Win Rate: {mini_game_win_rate:.1%}", 
+                                  self.colors[self.player["color_theme"]]["highlight"])
             
-        input("\nPress Enter to continue...")
+        yield from self.get_input("\nPress Enter to continue...")
     def load_config(self):
-        """Load game configuration from file"""
-        try:
-            with open("tower_config.json", "r") as f:
-                config = json.load(f)
-                return config
-        except FileNotFoundError:
-            # Create default config if not found
-            default_config = {
-                "game_settings": {
-                    "tower_height": 100,
-                    "auto_save": True,
-                    "sound_effects": True,
-                    "default_color_theme": "default",
-                    "animation_speed": 0.03,
-                    "difficulty": "normal"
-                },
-                "challenge_settings": {
-                    "luck_challenge_weight": 1.0,
-                    "skill_challenge_weight": 1.0,
-                    "mixed_challenge_weight": 1.0,
-                    "legendary_challenge_weight": 0.5,
-                    "boss_frequency": 10,
-                    "hidden_floor_frequency": 7,
-                    "mini_game_chance": 0.15
-                },
-                "reward_settings": {
-                    "basic_reward_chance": 0.3,
-                    "advanced_reward_threshold": 20,
-                    "legendary_reward_threshold": 40,
-                    "boss_reward_guaranteed": True
-                },
-                "companion_settings": {
-                    "max_companions": 3,
-                    "encounter_chance": 0.1
-                },
-                "environment_settings": {
-                    "weather_change_frequency": 3,
-                    "day_night_cycle_frequency": 5
-                }
-            }
-            
-            with open("tower_config.json", "w") as f:
-                json.dump(default_config, f, indent=2)
-                
-            return default_config
+        """Load game configuration (read-only, cached until tower_config.json changes)"""
+        return self.config_store.get()
             
     def save_config(self, config):
         """Save game configuration to file"""
-        with open("tower_config.json", "w") as f:
-            json.dump(config, f, indent=2)
+        self.config_store.save(config)
+        self.sound.enabled = config["game_settings"]["sound_effects"]
             
     def play_sound(self, sound_type):
-        """Play a sound effect if enabled"""
-        config = self.load_config()
-        if config["game_settings"]["sound_effects"]:
-            if sound_type == "achievement":
-                print("\a")  # Terminal bell
-                time.sleep(0.2)
-                print("\a")  # Double bell for achievements
-            elif sound_type == "success":
-                print("\a")  # Terminal bell
-            elif sound_type == "failure":
-                time.sleep(0.1)
-                print("\a")
-                time.sleep(0.1)
-                print("\a")
-            elif sound_type == "boss":
-                for _ in range(3):
-                    print("\a")
-                    time.sleep(0.2)
+        """Play a sound effect if enabled, without waiting for it"""
+        self.sound.play(sound_type)
                     
     def auto_save(self):
-        """Automatically save the game if enabled"""
+        """Automatically save the game if enabled and anything changed since the last save"""
+        if not self.unsaved_changes:
+            return
         config = self.load_config()
         if config["game_settings"]["auto_save"]:
-            self.save_game(silent=True)
+            save_text = self.serialize_save()
+            if save_text != self.saved_snapshot:
+                self.queue_save(save_text)
+            self.unsaved_changes = False
             
     def edit_settings(self):
         """Edit game settings"""
-        config = self.load_config()
+        config = thaw_config(self.load_config())
         
         while True:
             self.clear_screen()
@@ -2275,7 +2990,7 @@ class TowerOfChance:
             self.print_colored("9. Return without Saving", 
                               self.colors[self.player["color_theme"]]["failure"])
             
-            choice = input("\nEnter your choice (1-9): ")
+            choice = yield from self.get_input("\nEnter your choice (1-9): ", "settings_menu", [str(i) for i in range(1, 10)])
             
             if choice == "1":
                 config["game_settings"]["auto_save"] = not config["game_settings"]["auto_save"]
@@ -2283,17 +2998,18 @@ class TowerOfChance:
                 config["game_settings"]["sound_effects"] = not config["game_settings"]["sound_effects"]
             elif choice == "3":
                 try:
-                    speed = float(input("Enter animation speed (0.01-0.1, lower is faster): "))
+                    speed = float((yield from self.get_input("Enter animation speed (0.01-0.1, lower is faster): ", "animation_speed",
+                                                             low=0.01, high=0.1)))
                     if 0.01 <= speed <= 0.1:
                         config["game_settings"]["animation_speed"] = speed
                     else:
                         self.print_colored("Invalid speed! Must be between 0.01 and 0.1.", 
                                           self.colors[self.player["color_theme"]]["failure"])
-                        input("Press Enter to continue...")
+                        yield from self.get_input("Press Enter to continue...")
                 except ValueError:
                     self.print_colored("Invalid input! Please enter a number.", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             elif choice == "4":
                 difficulties = ["easy", "normal", "hard"]
                 self.print_colored("\nSelect difficulty:", 
@@ -2302,7 +3018,8 @@ class TowerOfChance:
                     self.print_colored(f"{i+1}. {diff.capitalize()}", 
                                       self.colors[self.player["color_theme"]]["info"])
                     
-                diff_choice = input("\nEnter your choice (1-3): ")
+                diff_choice = yield from self.get_input("\nEnter your choice (1-3): ", "difficulty", ["1", "2", "3"],
+                                                        difficulties=difficulties)
                 try:
                     diff_idx = int(diff_choice) - 1
                     if 0 <= diff_idx < len(difficulties):
@@ -2310,66 +3027,67 @@ class TowerOfChance:
                     else:
                         self.print_colored("Invalid choice!", 
                                           self.colors[self.player["color_theme"]]["failure"])
-                        input("Press Enter to continue...")
+                        yield from self.get_input("Press Enter to continue...")
                 except ValueError:
                     self.print_colored("Invalid input! Please enter a number.", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             elif choice == "5":
                 try:
-                    chance = float(input("Enter mini-game chance (0.0-1.0): "))
+                    chance = float((yield from self.get_input("Enter mini-game chance (0.0-1.0): ", "mini_game_chance", low=0.0, high=1.0)))
                     if 0.0 <= chance <= 1.0:
                         config["challenge_settings"]["mini_game_chance"] = chance
                     else:
                         self.print_colored("Invalid chance! Must be between 0.0 and 1.0.", 
                                           self.colors[self.player["color_theme"]]["failure"])
-                        input("Press Enter to continue...")
+                        yield from self.get_input("Press Enter to continue...")
                 except ValueError:
                     self.print_colored("Invalid input! Please enter a number.", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             elif choice == "6":
                 try:
-                    frequency = int(input("Enter boss frequency (floors between bosses): "))
+                    frequency = int((yield from self.get_input("Enter boss frequency (floors between bosses): ", "boss_frequency", low=1)))
                     if frequency > 0:
                         config["challenge_settings"]["boss_frequency"] = frequency
                     else:
                         self.print_colored("Invalid frequency! Must be greater than 0.", 
                                           self.colors[self.player["color_theme"]]["failure"])
-                        input("Press Enter to continue...")
+                        yield from self.get_input("Press Enter to continue...")
                 except ValueError:
                     self.print_colored("Invalid input! Please enter a number.", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             elif choice == "7":
                 try:
-                    frequency = int(input("Enter hidden floor frequency (floors between hidden floors): "))
+                    frequency = int((yield from self.get_input("Enter hidden floor frequency (floors between hidden floors): ",
+                                                               "hidden_floor_frequency", low=1)))
                     if frequency > 0:
                         config["challenge_settings"]["hidden_floor_frequency"] = frequency
                     else:
                         self.print_colored("Invalid frequency! Must be greater than 0.", 
                                           self.colors[self.player["color_theme"]]["failure"])
-                        input("Press Enter to continue...")
+                        yield from self.get_input("Press Enter to continue...")
                 except ValueError:
                     self.print_colored("Invalid input! Please enter a number.", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             elif choice == "8":
                 self.save_config(config)
                 self.print_colored("Settings saved successfully!", 
                                   self.colors[self.player["color_theme"]]["success"])
                 self.play_sound("success")
-                time.sleep(1)
+                self.pause(1)
                 break
             elif choice == "9":
                 self.print_colored("Settings not saved.", 
                                   self.colors[self.player["color_theme"]]["warning"])
-                time.sleep(1)
+                self.pause(1)
                 break
             else:
                 self.print_colored("Invalid choice!", 
                                   self.colors[self.player["color_theme"]]["failure"])
-                input("Press Enter to continue...")
+                yield from self.get_input("Press Enter to continue...")
                 
     def challenge_editor(self):
         """Edit challenges"""
@@ -2391,22 +3109,24 @@ class TowerOfChance:
         self.print_colored(f"{len(challenge_types)+1}. Return to Main Menu", 
                           self.colors[self.player["color_theme"]]["warning"])
         
-        choice = input("\nEnter your choice: ")
+        choice = yield from self.get_input("\nEnter your choice: ", "challenge_editor",
+                                           [str(i + 1) for i in range(len(challenge_types) + 1)],
+                                           challenge_types=challenge_types, back=str(len(challenge_types) + 1))
         try:
             choice_idx = int(choice) - 1
             if 0 <= choice_idx < len(challenge_types):
                 selected_type = challenge_types[choice_idx]
-                self.edit_challenge_type(challenges, selected_type)
+                yield from self.edit_challenge_type(challenges, selected_type)
             elif choice_idx == len(challenge_types):
                 return
             else:
                 self.print_colored("Invalid choice!", 
                                   self.colors[self.player["color_theme"]]["failure"])
-                input("Press Enter to continue...")
+                yield from self.get_input("Press Enter to continue...")
         except ValueError:
             self.print_colored("Invalid input! Please enter a number.", 
                               self.colors[self.player["color_theme"]]["failure"])
-            input("Press Enter to continue...")
+            yield from self.get_input("Press Enter to continue...")
             
     def edit_challenge_type(self, challenges, challenge_type):
         """Edit challenges of a specific type"""
@@ -2425,15 +3145,18 @@ class TowerOfChance:
             self.print_colored(f"{len(challenges[challenge_type])+2}. Save and Return", 
                               self.colors[self.player["color_theme"]]["warning"])
             
-            choice = input("\nEnter your choice: ")
+            count = len(challenges[challenge_type])
+            choice = yield from self.get_input("\nEnter your choice: ", "challenge_type_editor",
+                                               [str(i + 1) for i in range(count + 2)],
+                                               challenge_type=challenge_type, add=str(count + 1), back=str(count + 2))
             try:
                 choice_idx = int(choice) - 1
                 if 0 <= choice_idx < len(challenges[challenge_type]):
                     # Edit existing challenge
-                    self.edit_challenge(challenges, challenge_type, choice_idx)
+                    yield from self.edit_challenge(challenges, challenge_type, choice_idx)
                 elif choice_idx == len(challenges[challenge_type]):
                     # Add new challenge
-                    self.add_challenge(challenges, challenge_type)
+                    yield from self.add_challenge(challenges, challenge_type)
                 elif choice_idx == len(challenges[challenge_type]) + 1:
                     # Save and return
                     self.save_challenges(challenges)
@@ -2441,11 +3164,11 @@ class TowerOfChance:
                 else:
                     self.print_colored("Invalid choice!", 
                                       self.colors[self.player["color_theme"]]["failure"])
-                    input("Press Enter to continue...")
+                    yield from self.get_input("Press Enter to continue...")
             except ValueError:
                 self.print_colored("Invalid input! Please enter a number.", 
                                   self.colors[self.player["color_theme"]]["failure"])
-                input("Press Enter to continue...")
+                yield from self.get_input("Press Enter to continue...")
                 
     def edit_challenge(self, challenges, challenge_type, challenge_idx):
         """Edit a specific challenge"""
@@ -2458,21 +3181,24 @@ class TowerOfChance:
         # Edit name
         self.print_colored(f"Current name: {challenge['name']}", 
                           self.colors[self.player["color_theme"]]["info"])
-        new_name = input("Enter new name (leave blank to keep current): ")
+        new_name = yield from self.get_input("Enter new name (leave blank to keep current): ", "challenge_name",
+                                             current=challenge['name'])
         if new_name:
             challenge['name'] = new_name
             
         # Edit description
         self.print_colored(f"Current description: {challenge['description']}", 
                           self.colors[self.player["color_theme"]]["info"])
-        new_desc = input("Enter new description (leave blank to keep current): ")
+        new_desc = yield from self.get_input("Enter new description (leave blank to keep current): ", "challenge_description",
+                                             current=challenge['description'])
         if new_desc:
             challenge['description'] = new_desc
             
         # Edit difficulty
         self.print_colored(f"Current difficulty: {challenge['difficulty']}", 
                           self.colors[self.player["color_theme"]]["info"])
-        new_diff = input("Enter new difficulty (1-15, leave blank to keep current): ")
+        new_diff = yield from self.get_input("Enter new difficulty (1-15, leave blank to keep current): ", "challenge_difficulty",
+                                             current=challenge['difficulty'], low=1, high=15)
         if new_diff:
             try:
                 diff = int(new_diff)
@@ -2489,7 +3215,7 @@ class TowerOfChance:
         challenges[challenge_type][challenge_idx] = challenge
         self.print_colored("Challenge updated successfully!", 
                           self.colors[self.player["color_theme"]]["success"])
-        input("Press Enter to continue...")
+        yield from self.get_input("Press Enter to continue...")
         
     def add_challenge(self, challenges, challenge_type):
         """Add a new challenge"""
@@ -2498,21 +3224,21 @@ class TowerOfChance:
                           self.colors[self.player["color_theme"]]["title"])
         
         # Get challenge details
-        name = input("Enter challenge name: ")
+        name = yield from self.get_input("Enter challenge name: ", "challenge_name")
         if not name:
             self.print_colored("Challenge name cannot be empty!", 
                               self.colors[self.player["color_theme"]]["failure"])
-            input("Press Enter to continue...")
+            yield from self.get_input("Press Enter to continue...")
             return
             
-        description = input("Enter challenge description: ")
+        description = yield from self.get_input("Enter challenge description: ", "challenge_description")
         if not description:
             self.print_colored("Challenge description cannot be empty!", 
                               self.colors[self.player["color_theme"]]["failure"])
-            input("Press Enter to continue...")
+            yield from self.get_input("Press Enter to continue...")
             return
             
-        difficulty = input("Enter challenge difficulty (1-15): ")
+        difficulty = yield from self.get_input("Enter challenge difficulty (1-15): ", "challenge_difficulty", low=1, high=15)
         try:
             diff = int(difficulty)
             if 1 <= diff <= 15:
@@ -2527,20 +3253,20 @@ class TowerOfChance:
                 challenges[challenge_type].append(new_challenge)
                 self.print_colored("Challenge added successfully!", 
                                   self.colors[self.player["color_theme"]]["success"])
-                input("Press Enter to continue...")
+                yield from self.get_input("Press Enter to continue...")
             else:
                 self.print_colored("Invalid difficulty! Must be between 1 and 15.", 
                                   self.colors[self.player["color_theme"]]["failure"])
-                input("Press Enter to continue...")
+                yield from self.get_input("Press Enter to continue...")
         except ValueError:
             self.print_colored("Invalid input! Please enter a number for difficulty.", 
                               self.colors[self.player["color_theme"]]["failure"])
-            input("Press Enter to continue...")
+            yield from self.get_input("Press Enter to continue...")
             
     def save_challenges(self, challenges):
         """Save challenges to file"""
-        with open("challenges.json", "w") as f:
-            json.dump(challenges, f, indent=2)
+        # Other games may be loading the file right now
+        write_json_file("challenges.json", challenges)
             
         self.print_colored("Challenges saved successfully!", 
                           self.colors[self.player["color_theme"]]["success"])
@@ -2548,8 +3274,34 @@ class TowerOfChance:
         
         # Reload challenges
         self.challenges = challenges
+        self.challenge_catalog = ChallengeCatalog(challenges)
     # Removed duplicated start_game method. The version at line 1016 is kept.
 
+def main():
+    parser = argparse.ArgumentParser(description="Climb the Tower of Chance")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--jsonl", action="store_true",
+                        help="play through JSON lines on stdin and stdout, for programs driving the game")
+    args = parser.parse_args()
+
+    if not args.jsonl:
+        TowerOfChance(seed=args.seed).start_game()
+        return
+
+    # colorama wraps sys.stdout to rewrite escape sequences; JSON lines have none
+    port = JsonLinesPort(sys.stdin, sys.__stdout__)
+    # Without the editors a driver can't turn sound back on and ring bells into the stream
+    game = TowerOfChance(seed=args.seed, input_port=port, output_port=port, editors=False)
+    game.clock.mode = "instant"
+    game.sound.enabled = False
+    try:
+        game.start_game()
+    except EOFError:
+        pass
+    finally:
+        port.send_text()
+        sys.__stdout__.flush()
+
+
 if __name__ == "__main__":
-    game = TowerOfChance()
-    game.start_game()
+    main()
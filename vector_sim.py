@@ -0,0 +1,545 @@
+"""
+Vectorized Monte Carlo climb simulator for Tower of Chance
+
+Advances a whole population of climbers one floor attempt at a time with
+NumPy arrays, following the same rules as TowerOfChance.climb_floor and
+run_challenge: companion encounters, boss and hidden floors, mini-games,
+branching paths, weather and time of day, buffs, debuffs, rewards and
+achievement bonuses.
+
+Prompts that depend on the player (riddles, memory tests, path choices...)
+are resolved by a policy instead of a DecisionProvider; see DEFAULT_POLICY.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batch simulation
+    np = None
+
+from tower_of_chance import (CHARACTER_CLASSES, COMPANIONS, LEGENDARY_FLOOR, challenge_type_samplers,
+                             get_reward_bonus, get_reward_pool)
+from headless import HeadlessTowerOfChance
+
+SKILLS = ["luck", "strength", "agility", "wisdom"]
+
+# Challenge types that buffs, debuffs and companions can target
+EFFECT_TYPES = ["luck", "skill", "mixed", "all"]
+ALL_EFFECTS = EFFECT_TYPES.index("all")
+
+# Longest buff or debuff lasts 6 floors; effects are kept in a ring of this size
+EFFECT_RING = 8
+
+# Success formulas, one per challenge handled by name in the run_*_challenge
+# methods plus the fallback formula of each challenge family
+KINDS = [
+    "coin_flip", "lucky_draw", "roll_of_fate", "luck",
+    "quick_reflexes", "memory_test", "riddle_master", "skill",
+    "treasure_hunt", "dragons_gambit", "leap_of_faith", "mixed",
+    "phoenix_rebirth", "titans_challenge", "cosmic_harmony", "ultimate_ascension", "legendary"
+]
+KIND_INDEX = {kind: i for i, kind in enumerate(KINDS)}
+
+NAMED_KINDS = {
+    "luck": {"Coin Flip": "coin_flip", "Lucky Draw": "lucky_draw", "Roll of Fate": "roll_of_fate"},
+    "skill": {"Quick Reflexes": "quick_reflexes", "Memory Test": "memory_test", "Riddle Master": "riddle_master"},
+    "mixed": {"Treasure Hunt": "treasure_hunt", "Dragon's Gambit": "dragons_gambit", "Leap of Faith": "leap_of_faith"},
+    "legendary": {"Phoenix Rebirth": "phoenix_rebirth", "Titan's Challenge": "titans_challenge",
+                  "Cosmic Harmony": "cosmic_harmony", "Ultimate Ascension": "ultimate_ascension"}
+}
+
+# Kinds each family can produce, padded to the same width
+FAMILY_WIDTH = 5
+FAMILY_KINDS = {
+    family: ([KIND_INDEX[k] for k in names.values()] + [KIND_INDEX[family]] * FAMILY_WIDTH)[:FAMILY_WIDTH]
+    for family, names in NAMED_KINDS.items()
+}
+
+DEFAULT_POLICY = {
+    # Chance of answering a riddle, memory test or treasure clue correctly
+    "answer_accuracy": 0.5,
+    # Seconds taken to react in Quick Reflexes
+    "reaction_time": 0.4,
+    "mini_game_win_rate": 0.4,
+    "explore_hidden": 1.0,
+    "accept_companion": 1.0,
+    # Relative weights for the standard, treacherous, safe and special paths
+    "path_weights": (1.0, 1.0, 1.0, 0.0)
+}
+
+
+def challenge_family(challenge_type):
+    """Which run_*_challenge method handles a challenge type"""
+    # run_challenge sends any unknown type to run_mixed_challenge
+    return challenge_type if challenge_type in NAMED_KINDS else "mixed"
+
+
+def challenge_kind(challenge_type, challenge):
+    """Index into KINDS of the success formula used for a challenge"""
+    family = challenge_family(challenge_type)
+    return KIND_INDEX[NAMED_KINDS[family].get(challenge["name"], family)]
+
+
+def _chance(x, low=0.0, high=1.0):
+    return np.clip(x, low, high)
+
+
+def _luck_chance(luck, modifier):
+    return _chance(0.5 + (luck - 1 + modifier) * 0.05, 0.1, 0.9)
+
+
+def _ultimate_ascension(luck, strength, agility, wisdom, modifier, policy):
+    # At least three of the four trials must pass
+    trials = [1 - _chance(0.5 - skill * 0.04 - modifier * 0.05, 0.1, 0.9)
+              for skill in (luck, strength, wisdom, agility)]
+    all_four = trials[0] * trials[1] * trials[2] * trials[3]
+    three = sum((1 - trials[i]) * np.prod([trials[j] for j in range(4) if j != i], axis=0)
+                for i in range(4))
+    return all_four + three
+
+
+# Success chance of each kind as a function of (luck, strength, agility, wisdom, modifier, policy).
+# Luck challenges can also be won outright by guessing the coin, card or die.
+FORMULAS = {
+    "coin_flip": lambda l, s, a, w, m, p: 1 / 2 + 1 / 2 * _luck_chance(l, m),
+    "lucky_draw": lambda l, s, a, w, m, p: 1 / 8 + 7 / 8 * _luck_chance(l, m),
+    "roll_of_fate": lambda l, s, a, w, m, p: 1 / 6 + 5 / 6 * _luck_chance(l, m),
+    "luck": lambda l, s, a, w, m, p: _luck_chance(l, m),
+    "quick_reflexes": lambda l, s, a, w, m, p: (p["reaction_time"] < 0.5 + a * 0.1 + m * 0.1).astype(float),
+    "memory_test": lambda l, s, a, w, m, p: np.full(l.shape, p["answer_accuracy"]),
+    "riddle_master": lambda l, s, a, w, m, p: np.full(l.shape, p["answer_accuracy"]),
+    "skill": lambda l, s, a, w, m, p: _chance(0.5 + m * 0.1),
+    "treasure_hunt": lambda l, s, a, w, m, p: p["answer_accuracy"] * (1 / 3 + 2 / 3 * _chance(0.33 + l * 0.1 + m * 0.05)),
+    "dragons_gambit": lambda l, s, a, w, m, p: (_chance(0.4 + w * 0.1 + m * 0.05)
+                                                + _chance(0.4 + a * 0.1 + m * 0.05)) / 2,
+    "leap_of_faith": lambda l, s, a, w, m, p: _chance(0.5 + s * 0.15 + m * 0.05),
+    "mixed": lambda l, s, a, w, m, p: _chance(0.5 + m * 0.1),
+    "phoenix_rebirth": lambda l, s, a, w, m, p: _chance(0.3 + (l + s + a + w) * 0.02 + m * 0.05, 0.1, 0.9),
+    "titans_challenge": lambda l, s, a, w, m, p: (_chance(0.3 + s * 0.05 + m * 0.05)
+                                                  + _chance(0.3 + w * 0.05 + m * 0.05)
+                                                  + _chance(0.3 + l * 0.05 + m * 0.05)) / 3,
+    "cosmic_harmony": lambda l, s, a, w, m, p: _chance(0.2 + (l + s + a + w) * 0.015 + m * 0.05, 0.1, 0.9),
+    "ultimate_ascension": _ultimate_ascension,
+    "legendary": lambda l, s, a, w, m, p: _chance(0.2 + (l + s + a + w) * 0.01 + m * 0.05, 0.1, 0.9)
+}
+
+
+def success_probability(kinds, skills, modifier, policy=None):
+    """Chance of passing a challenge of each kind, for arrays of climbers.
+
+    `skills` has one row per climber with columns in SKILLS order and
+    `modifier` is the total challenge modifier applied by run_challenge.
+    """
+    policy = dict(DEFAULT_POLICY, **(policy or {}))
+    kinds = np.asarray(kinds)
+    skills = np.asarray(skills, dtype=float).reshape(-1, len(SKILLS))
+    modifier = np.broadcast_to(np.asarray(modifier, dtype=float), kinds.shape)
+
+    chances = np.zeros(kinds.shape)
+    for kind in np.unique(kinds):
+        rows = np.flatnonzero(kinds == kind)
+        luck, strength, agility, wisdom = skills[rows].T
+        chances[rows] = FORMULAS[KINDS[kind]](luck, strength, agility, wisdom, modifier[rows], policy)
+    return chances
+
+
+class ClimbSimulator:
+    """Simulates many independent climbs at once"""
+
+    def __init__(self, game=None, policy=None, seed=None):
+        if np is None:
+            raise ImportError("NumPy is required for vectorized simulation (pip install numpy)")
+
+        # Weather depends on the session seed, so the game shares it
+        self.game = game or HeadlessTowerOfChance(seed=seed)
+        self.policy = dict(DEFAULT_POLICY, **(policy or {}))
+        self.rng = np.random.default_rng(seed)
+
+        self.config = config = self.game.load_config()
+        self.tower_height = self.game.tower_height
+        self.boss_frequency = config["challenge_settings"]["boss_frequency"]
+        self.hidden_floor_frequency = config["challenge_settings"]["hidden_floor_frequency"]
+        self.checkpoint_frequency = config["challenge_settings"]["checkpoint_frequency"]
+        self.encounter_chance = config["companion_settings"]["encounter_chance"]
+        self.max_companions = config["companion_settings"]["max_companions"]
+
+        self._build_tables()
+
+    def _build_tables(self):
+        """Precompute everything that depends only on the floor or challenge type"""
+        game = self.game
+        height = self.tower_height
+        self.types = list(game.challenges.keys())
+        type_index = {t: i for i, t in enumerate(self.types)}
+
+        # Weather and time of day only depend on the floor
+        self.environment = np.array([[game.environment.modifier(level, challenge_type) for challenge_type in self.types]
+                                     for level in range(height + 2)], dtype=np.int64)
+
+        # Buff/debuff slot and companion bonus for each challenge type
+        self.effect_slot = np.array([EFFECT_TYPES.index(t) if t in EFFECT_TYPES else -1
+                                     for t in self.types])
+        self.companion_bonus = np.array([[c["modifier"] if c["type"] in ("all", t) else 0
+                                          for c in COMPANIONS] for t in self.types])
+
+        # Kind distribution of suitable challenges (difficulty <= level // 5 + 1), per type and floor.
+        # Each family only uses a handful of kinds, so the tables index into FAMILY_KINDS.
+        self.type_kinds = np.array([FAMILY_KINDS[challenge_family(t)] for t in self.types])
+        self.kind_cdf = np.zeros((len(self.types), height + 2, FAMILY_WIDTH))
+        for t, challenge_type in enumerate(self.types):
+            for level in range(height + 2):
+                suitable = game.challenge_catalog.suitable(challenge_type, level // 5 + 1)
+                self.kind_cdf[t, level] = self._family_cdf(challenge_type, suitable)
+
+        # Boss stages draw from the full skill, luck and mixed lists
+        self.boss_stages = [(np.array(FAMILY_KINDS[stage_type]),
+                             self._family_cdf(stage_type, game.challenges[stage_type]))
+                            for stage_type in ("skill", "luck", "mixed")]
+
+        # Challenge types offered before and after the legendary floors open up
+        # Weighted type choice before and after the legendary floors open up,
+        # as (type index, alias probability, alias column) arrays plus the odds of each type
+        self.type_samplers = []
+        self.type_probs = np.zeros((2, len(self.types)))
+        for opened, sampler in enumerate(challenge_type_samplers(self.types, self.config["challenge_settings"])):
+            types = np.array([type_index[t] for t in sampler.items])
+            self.type_samplers.append((types, np.array(sampler.prob), np.array(sampler.alias)))
+            self.type_probs[opened, types] = sampler.probabilities
+        self.path_types = np.array([type_index[t] for t in ("luck", "skill", "mixed")])
+        self.legendary_type = type_index.get("legendary", -1)
+        self.luck_type = type_index["luck"]
+
+        # Skill bonuses of every reward, by reward tier
+        pools = [get_reward_pool(1), get_reward_pool(20), get_reward_pool(40)]
+        self.reward_sizes = np.array([len(pool) for pool in pools])
+        self.reward_bonus = np.zeros((3, self.reward_sizes.max(), len(SKILLS)), dtype=np.int64)
+        for tier, pool in enumerate(pools):
+            for r, reward in enumerate(pool):
+                for skill, bonus in get_reward_bonus(reward).items():
+                    self.reward_bonus[tier, r, SKILLS.index(skill)] = bonus
+
+        # Achievement thresholds, in a fixed column order
+        achievements = game.achievement_engine.definitions
+
+        def thresholds(category):
+            return np.sort([a["threshold"] for a in achievements.get(category, [])])
+
+        self.level_thresholds = thresholds("level")
+        self.boss_thresholds = thresholds("boss")
+        self.hidden_thresholds = thresholds("hidden")
+        self.skill_thresholds = np.array([a["threshold"] for a in achievements.get("skill", [])])
+        self.skill_columns = np.array([SKILLS.index(a["skill"]) for a in achievements.get("skill", [])], dtype=np.int64)
+
+    @staticmethod
+    def _family_cdf(challenge_type, challenges):
+        kinds = FAMILY_KINDS[challenge_family(challenge_type)]
+        counts = np.array([sum(challenge_kind(challenge_type, c) == kind for c in challenges)
+                           for kind in kinds], dtype=float)
+        return np.cumsum(counts) / counts.sum()
+
+    # --- Random helpers ---
+
+    def _chance(self, n, p):
+        return self.rng.random(n) < p
+
+    def _pick(self, cdf_rows):
+        """Sample one index per row of a table of cumulative probabilities"""
+        u = self.rng.random(len(cdf_rows))
+        return np.minimum((u[:, None] >= cdf_rows).sum(axis=1), cdf_rows.shape[1] - 1)
+
+    def _draw_types(self, sampler, n):
+        """n draws from an alias-method type sampler"""
+        types, prob, alias = sampler
+        column = self.rng.integers(0, len(types), n)
+        return types[np.where(self.rng.random(n) < prob[column], column, alias[column])]
+
+    # --- State updates ---
+
+    def _raise_random_skill(self, rows):
+        if len(rows):
+            self.skills[rows, self.rng.integers(0, len(SKILLS), len(rows))] += 1
+
+    def _add_effect(self, rows, slot, modifier, duration):
+        """Add a buff or debuff that applies to the next `duration` challenges"""
+        for k in range(int(np.max(duration, initial=0))):
+            active = k < duration
+            r = rows[active]
+            position = (self.effect_pointer[r] + k) % EFFECT_RING
+            self.effects[r, np.broadcast_to(slot, rows.shape)[active], position] += \
+                np.broadcast_to(modifier, rows.shape)[active]
+
+    def _apply_effects(self, rows, type_idx):
+        """Total buff/debuff modifier for this challenge, then tick every effect down"""
+        position = self.effect_pointer[rows]
+        slot = self.effect_slot[type_idx]
+        modifier = self.effects[rows, ALL_EFFECTS, position].astype(np.int64)
+        typed = slot >= 0
+        modifier[typed] += self.effects[rows[typed], slot[typed], position[typed]]
+        self.effects[rows, :, position] = 0
+        self.effect_pointer[rows] = (position + 1) % EFFECT_RING
+        return modifier
+
+    def _encounter_companion(self, rows):
+        """Offer each climber a random companion they do not have yet"""
+        available = ~self.companions[rows]
+        keys = self.rng.random(available.shape) * available
+        choice = keys.argmax(axis=1)
+        joins = available.any(axis=1) & self._chance(len(rows), self.policy["accept_companion"])
+        self.companions[rows[joins], choice[joins]] = True
+
+    def _give_reward(self, rows, levels):
+        tier = np.where(levels >= 40, 2, np.where(levels >= 20, 1, 0))
+        reward = (self.rng.random(len(rows)) * self.reward_sizes[tier]).astype(np.int64)
+        self.skills[rows] += self.reward_bonus[tier, reward]
+
+    def _grant_bonuses(self, rows, counts):
+        """Each new achievement grants a random skill point"""
+        for k in range(int(counts.max(initial=0))):
+            self._raise_random_skill(rows[counts > k])
+
+    def _check_achievements(self, rows):
+        # Floors, bosses and hidden floors only ever go up, so the number of
+        # thresholds crossed is enough to know which achievements are new.
+        # (The game never checks companion achievements during a climb.)
+        for value, thresholds, unlocked in ((self.level, self.level_thresholds, self.level_unlocked),
+                                            (self.bosses, self.boss_thresholds, self.boss_unlocked),
+                                            (self.hidden, self.hidden_thresholds, self.hidden_unlocked)):
+            crossed = np.searchsorted(thresholds, value[rows], side="right")
+            self._grant_bonuses(rows, crossed - unlocked[rows])
+            unlocked[rows] = crossed
+
+        new = (self.skills[rows][:, self.skill_columns] >= self.skill_thresholds) & ~self.earned_skill[rows]
+        if new.any():
+            changed = np.flatnonzero(new.any(axis=1))
+            self.earned_skill[rows[changed]] |= new[changed]
+            self._grant_bonuses(rows[changed], new[changed].sum(axis=1))
+
+    def _count(self, stat, rows):
+        self.stats[stat] += np.bincount(self.climber_class[rows], minlength=len(self.classes))
+
+    # --- Floor types ---
+
+    def _run_boss(self, rows):
+        """Three stages at modifier 0; every stage must be passed"""
+        self._count("bosses_faced", rows)
+        success = np.ones(len(rows), dtype=bool)
+        skills = self.skills[rows]
+        for kinds, cdf in self.boss_stages:
+            kinds = kinds[self._pick(np.broadcast_to(cdf, (len(rows), FAMILY_WIDTH)))]
+            success &= self._chance(len(rows), success_probability(kinds, skills, 0, self.policy))
+
+        won = rows[success]
+        self.bosses[won] += 1
+        self._give_reward(won, self.level[won])
+        self._add_effect(won[self._chance(len(won), 0.7)], ALL_EFFECTS, 2, 5)
+        lost = rows[~success]
+        self._add_effect(lost, ALL_EFFECTS, -1, 3)
+        return success
+
+    def _run_hidden(self, rows):
+        """Hidden floors always succeed and always reward"""
+        self._count("hidden_floors", rows)
+        self.hidden[rows] += 1
+        self._give_reward(rows, self.level[rows])
+
+        blessed = rows[self._chance(len(rows), 0.5)]
+        self._add_effect(blessed, self.rng.integers(0, len(EFFECT_TYPES), len(blessed)), 2,
+                         self.rng.integers(3, 7, len(blessed)))
+
+        lonely = rows[self._chance(len(rows), 0.3) & (self.companions[rows].sum(axis=1) < 3)]
+        self._encounter_companion(lonely)
+        return np.ones(len(rows), dtype=bool)
+
+    def _choose_paths(self, rows):
+        """Branching path on checkpoint floors: forced type, difficulty and reward chance"""
+        n = len(rows)
+        forced = np.full(n, -1)
+        difficulty = np.zeros(n, dtype=np.int64)
+        reward_chance = np.full(n, 0.3)
+
+        branching = self.level[rows] % self.checkpoint_frequency == 0
+        if not branching.any():
+            return forced, difficulty, reward_chance
+
+        b = np.flatnonzero(branching)
+        rb = rows[b]
+        weights = np.broadcast_to(np.asarray(self.policy["path_weights"], dtype=float), (len(b), 4)).copy()
+        weights[:, 3] *= self._chance(len(b), 0.3)  # the special path only appears sometimes
+        path = self._pick(np.cumsum(weights, axis=1) / weights.sum(axis=1, keepdims=True))
+        special = self.rng.integers(0, 3, len(b))
+
+        # Standard, treacherous and safe paths each roll a random basic type
+        forced[b] = self.path_types[self.rng.integers(0, 3, len(b))]
+        difficulty[b] = np.array([0, 2, -1, 0])[path]
+        reward_chance[b] = np.array([0.3, 0.6, 0.1, 0.0])[path]
+
+        portal = path == 3
+        portal_kind = special[portal]
+        forced[b[portal]] = np.where(portal_kind == 0, self.legendary_type,
+                                     np.where(portal_kind == 2, self.luck_type, forced[b[portal]]))
+        difficulty[b[portal]] = np.array([1, 0, 0])[portal_kind]
+        reward_chance[b[portal]] = np.array([0.5, 0.2, 0.4])[portal_kind]
+
+        # Companion's Trail and Ancient Shrine side effects
+        trail = rb[portal][(portal_kind == 1) & self._chance(len(portal_kind), 0.8)]
+        self._encounter_companion(trail)
+        shrine = rb[portal][portal_kind == 2]
+        blessed = shrine[self._chance(len(shrine), 0.6)]
+        self._add_effect(blessed, self.rng.integers(0, 4, len(blessed)),
+                         self.rng.integers(1, 3, len(blessed)), self.rng.integers(2, 6, len(blessed)))
+        cursed = shrine[self._chance(len(shrine), 0.3)]
+        self._add_effect(cursed, self.rng.integers(0, 4, len(cursed)),
+                         -self.rng.integers(1, 3, len(cursed)), self.rng.integers(1, 4, len(cursed)))
+        return forced, difficulty, reward_chance
+
+    def _run_challenge(self, rows):
+        n = len(rows)
+
+        # Mini-games happen before the challenge and only affect skills
+        played = rows[self._chance(n, 0.15)]
+        self._count("mini_games_played", played)
+        won = played[self._chance(len(played), self.policy["mini_game_win_rate"])]
+        self._count("mini_games_won", won)
+        self._raise_random_skill(won)
+
+        forced, difficulty, reward_chance = self._choose_paths(rows)
+
+        levels = self.level[rows]
+        low, high = (self._draw_types(sampler, n) for sampler in self.type_samplers)
+        type_idx = np.where(forced >= 0, forced, np.where(levels >= LEGENDARY_FLOOR, high, low))
+        for t, challenge_type in enumerate(self.types):
+            stat = f"{challenge_type}_challenges"
+            if stat in self.stats:
+                self._count(stat, rows[type_idx == t])
+
+        kinds = self.type_kinds[type_idx, self._pick(self.kind_cdf[type_idx, levels])]
+        modifier = (self.environment[levels, type_idx]
+                    + self._apply_effects(rows, type_idx)
+                    + (self.companions[rows] * self.companion_bonus[type_idx]).sum(axis=1)
+                    + difficulty)
+        success = self._chance(n, success_probability(kinds, self.skills[rows], modifier, self.policy))
+
+        # Phoenix Rebirth raises a skill when it succeeds
+        self._raise_random_skill(rows[success & (kinds == KIND_INDEX["phoenix_rebirth"])])
+
+        # Success: reward and Victory Surge buff. Failure: Setback debuff
+        # Rewards are rolled after the level has gone up
+        passed = rows[success]
+        rewarded = passed[self._chance(len(passed), reward_chance[success])]
+        self._give_reward(rewarded, self.level[rewarded] + 1)
+        # Like the game, only rewards for regular floors count as found
+        self._count("rewards_found", rewarded)
+        surge = passed[self._chance(len(passed), 0.2)]
+        self._add_effect(surge, self.rng.integers(0, 4, len(surge)), 1, self.rng.integers(1, 4, len(surge)))
+
+        failed = rows[~success]
+        setback = failed[self._chance(len(failed), 0.3)]
+        self._add_effect(setback, self.rng.integers(0, 4, len(setback)), -1, self.rng.integers(1, 3, len(setback)))
+        return success
+
+    # --- Driving the population ---
+
+    def _reset(self, classes, climbers_per_class):
+        self.classes = classes
+        # One count for every class, or a count per class
+        self.climber_class = np.repeat(np.arange(len(classes)), climbers_per_class)
+        n = len(self.climber_class)
+
+        # Class skills plus the three free points from character creation
+        base = np.array([[c["skills"][s] for s in SKILLS] for c in classes], dtype=np.int64)
+        self.skills = base[self.climber_class]
+        for _ in range(3):
+            self._raise_random_skill(np.arange(n))
+
+        self.level = np.ones(n, dtype=np.int64)
+        self.attempts = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.companions = np.zeros((n, len(COMPANIONS)), dtype=bool)
+        self.effects = np.zeros((n, len(EFFECT_TYPES), EFFECT_RING), dtype=np.int64)
+        self.effect_pointer = np.zeros(n, dtype=np.int64)
+        self.bosses = np.zeros(n, dtype=np.int64)
+        self.hidden = np.zeros(n, dtype=np.int64)
+        self.level_unlocked = np.zeros(n, dtype=np.int64)
+        self.boss_unlocked = np.zeros(n, dtype=np.int64)
+        self.hidden_unlocked = np.zeros(n, dtype=np.int64)
+        self.earned_skill = np.zeros((n, len(self.skill_thresholds)), dtype=bool)
+
+        self.stats = {stat: np.zeros(len(classes), dtype=np.int64)
+                      for stat in self.game.stats}
+        self.floor_attempts = np.zeros((len(classes), self.tower_height + 2), dtype=np.int64)
+        self.floor_passes = np.zeros((len(classes), self.tower_height + 2), dtype=np.int64)
+
+    def step(self):
+        """Every unfinished climber attempts their next floor"""
+        rows = np.flatnonzero(~self.done)
+        n = len(rows)
+
+        # Companion encounter on the way up (climb_floor)
+        meets = rows[self._chance(n, self.encounter_chance)
+                     & (self.companions[rows].sum(axis=1) < self.max_companions)]
+        self._count("companions_met", meets)
+        self._encounter_companion(meets)
+
+        levels = self.level[rows]
+        success = np.zeros(n, dtype=bool)
+
+        boss = levels % self.boss_frequency == 0
+        success[boss] = self._run_boss(rows[boss])
+
+        candidates = np.flatnonzero(~boss & (levels % self.hidden_floor_frequency == 0))
+        wisdom = self.skills[rows[candidates], SKILLS.index("wisdom")]
+        found = candidates[self._chance(len(candidates), 0.2 + wisdom * 0.05)
+                           & self._chance(len(candidates), self.policy["explore_hidden"])]
+        success[found] = self._run_hidden(rows[found])
+
+        normal = ~boss
+        normal[found] = False
+        success[normal] = self._run_challenge(rows[normal])
+
+        # Bookkeeping shared by every floor type
+        classes = self.climber_class[rows]
+        cells = classes * self.floor_attempts.shape[1] + levels
+        self.floor_attempts += np.bincount(cells, minlength=self.floor_attempts.size).reshape(self.floor_attempts.shape)
+        self.floor_passes += np.bincount(cells[success], minlength=self.floor_passes.size).reshape(self.floor_passes.shape)
+        self._count("challenges_completed", rows[success])
+        self._count("challenges_failed", rows[~success])
+
+        self.level[rows[success]] += 1
+        self.attempts[rows] += 1
+        # Floors, bosses, hidden floors and rewards only change on a cleared
+        # floor, which is also the only time the game checks achievements
+        self._check_achievements(rows[success])
+        self.done[rows] = self.level[rows] >= self.tower_height
+        return n
+
+    def run(self, climbers_per_class=1000, classes=None, max_attempts=2000):
+        """Simulate full climbs for every character class and summarize them per class
+
+        `climbers_per_class` is either one count for every class or a list
+        with a count per class.
+        """
+        classes = classes or CHARACTER_CLASSES
+        self._reset(classes, climbers_per_class)
+
+        for _ in range(max_attempts):
+            if not self.step():
+                break
+
+        completed = self.level >= self.tower_height
+        results = {}
+        for c, char_class in enumerate(classes):
+            mine = self.climber_class == c
+            finished = mine & completed
+            attempts = self.floor_attempts[c, 1:self.tower_height]
+            passes = self.floor_passes[c, 1:self.tower_height]
+            results[char_class["name"]] = {
+                "climbers": int(mine.sum()),
+                "completed": int(finished.sum()),
+                "completion_rate": float(finished.sum() / max(1, mine.sum())),
+                "mean_attempts": float(self.attempts[finished].mean()) if finished.any() else None,
+                "floor_attempts": attempts,
+                "floor_passes": passes,
+                # Success rate on floors 1..tower_height-1
+                "floor_success_rate": np.divide(passes, attempts, out=np.zeros(len(attempts)),
+                                                where=attempts > 0),
+                "stats": {stat: int(values[c]) for stat, values in self.stats.items()}
+            }
+        return results